@@ -53,6 +53,10 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'league.middleware.PublishedPagesMiddleware',
+    'league.middleware.MediaFilesMiddleware',
+    'league.middleware.ResponseOptimizationMiddleware',
+    'league.middleware.PublicCacheMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -66,12 +70,20 @@ ROOT_URLCONF = 'goma_efootball.urls'
 # ========================
 # TEMPLATES
 # ========================
+# En production, les templates compilés restent en mémoire (chargés par `manage.py warmup`)
+_template_loaders = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if not DEBUG:
+    _template_loaders = [('django.template.loaders.cached.Loader', _template_loaders)]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': _template_loaders,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -95,6 +107,8 @@ if os.environ.get('PYTHONANYWHERE_SITE'):
     # PyMySQL comme remplacement de mysqlclient
     import pymysql
     pymysql.install_as_MySQLdb()
+    # MySQL n'a pas de contrainte unique partielle : jobs.enqueue dédoublonne sous verrou
+    SILENCED_SYSTEM_CHECKS = ['models.W036']
 
     DATABASES = {
         'default': {
@@ -107,6 +121,8 @@ if os.environ.get('PYTHONANYWHERE_SITE'):
                 'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
                 'charset': 'utf8mb4',
             },
+            'CONN_MAX_AGE': int(os.environ.get('CONN_MAX_AGE', '600')),
+            'CONN_HEALTH_CHECKS': True,
         }
     }
 elif os.environ.get('DATABASE_URL'):
@@ -123,9 +139,143 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # Connexions persistantes : les PRAGMA ne sont appliqués qu'une fois
+            'CONN_MAX_AGE': int(os.environ.get('CONN_MAX_AGE', '600')),
+            # Base de test sur disque : les tests de concurrence (threads)
+            # ont besoin des verrous de fichier, pas d'une base en mémoire
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
+        }
+    }
+
+# Réplique en lecture (optionnelle)
+# PythonAnywhere : MYSQL_REPLICA_HOST
+# Render : DATABASE_REPLICA_URL
+# Local : SQLITE_REPLICA=1 (db.replica.sqlite3, synchronisée par `manage.py sync_replica`)
+if os.environ.get('PYTHONANYWHERE_SITE') and os.environ.get('MYSQL_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.environ.get('MYSQL_REPLICA_HOST'),
+    }
+elif os.environ.get('DATABASE_REPLICA_URL'):
+    import dj_database_url
+    DATABASES['replica'] = dj_database_url.config(
+        env='DATABASE_REPLICA_URL',
+        conn_max_age=600,
+        conn_health_checks=True,
+    )
+elif (
+    os.environ.get('SQLITE_REPLICA', '').lower() in ('true', '1', 'yes')
+    and DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3'
+):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.replica.sqlite3',
+    }
+
+if 'replica' in DATABASES:
+    # En test, la réplique pointe sur la base de test principale
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+    DATABASE_ROUTERS = ['league.routers.ReplicaRouter']
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('django.contrib.auth.middleware.AuthenticationMiddleware') + 1,
+        'league.middleware.ReplicaRoutingMiddleware',
+    )
+
+# Durée (secondes) pendant laquelle une session lit sur la base principale après une écriture
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', '10'))
+
+# ========================
+# CACHE
+# ========================
+# Partagé par tous les processus (workers gunicorn, run_worker) : la version
+# des données, les verrous de remplissage et les compteurs de league.cache
+# n'ont de sens que si chaque processus lit les mêmes valeurs.
+# REDIS_URL : Redis ; sinon table `league_cache` de la base principale
+# (créée par migrate). Un cache propre au processus est refusé hors DEBUG
+# (league.checks).
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'league_cache',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
         }
     }
 
+# SQLite : PRAGMA appliqués à chaque connexion (league.signals.configure_sqlite_connection)
+SQLITE_TUNING = os.environ.get('SQLITE_TUNING', 'True').lower() in ('true', '1', 'yes')
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,        # ms
+    'cache_size': -20000,        # 20 Mo
+    'mmap_size': 134217728,      # 128 Mo
+    'temp_store': 'MEMORY',
+}
+
+# ========================
+# CACHE HTTP DES PAGES PUBLIQUES
+# ========================
+# Visiteurs anonymes uniquement (league.middleware.PublicCacheMiddleware)
+PUBLIC_CACHE_MAX_AGE = int(os.environ.get('PUBLIC_CACHE_MAX_AGE', '60'))
+PUBLIC_CACHE_STALE_WHILE_REVALIDATE = int(
+    os.environ.get('PUBLIC_CACHE_STALE_WHILE_REVALIDATE', '300')
+)
+
+# Minification HTML et compression gzip/brotli (league.middleware.ResponseOptimizationMiddleware)
+RESPONSE_COMPRESSION_MIN_LENGTH = 200
+COMPRESSED_RESPONSE_CACHE_TIMEOUT = 60 * 10
+
+# Valeurs calculées des vues (league.cache.get_or_refresh) : après une modification,
+# la valeur précédente est servie au plus CACHE_MAX_STALE secondes pendant le recalcul
+CACHE_MAX_STALE = int(os.environ.get('CACHE_MAX_STALE', '30'))
+CACHE_ENTRY_TIMEOUT = 60 * 10       # secondes, recalcul même sans modification
+CACHE_LOCK_TIMEOUT = 10             # secondes avant de reprendre un calcul abandonné
+CACHE_LOCK_POLL_INTERVAL = 0.05     # secondes entre deux lectures en attendant un calcul
+CACHE_STATS_FLUSH_INTERVAL = 5      # secondes entre deux envois des compteurs au cache partagé
+
+# Pré-rendu statique du site public (league.publishing, commande publish_static)
+PUBLISH_STATIC_PAGES = os.environ.get('PUBLISH_STATIC_PAGES', 'False').lower() in ('true', '1', 'yes')
+PUBLISH_ROOT = BASE_DIR / 'published'
+# Hôte utilisé pour rendre les pages (doit figurer dans ALLOWED_HOSTS)
+PUBLISH_HOST = os.environ.get('PUBLISH_HOST', ALLOWED_HOSTS[0].strip().lstrip('.'))
+
+# ========================
+# TÂCHES DE FOND
+# ========================
+# Exécutées par `manage.py run_worker` ; désactivé : exécutées dans la requête
+LEAGUE_ASYNC_JOBS = os.environ.get('LEAGUE_ASYNC_JOBS', 'False').lower() in ('true', '1', 'yes')
+JOB_MAX_ATTEMPTS = 3
+JOB_RETRY_DELAY = 30            # secondes, doublé à chaque nouvel essai
+JOB_TIMEOUT = 60 * 30           # secondes avant de reprendre une tâche « en cours » abandonnée
+JOB_RETENTION_DAYS = 7
+JOB_POLL_INTERVAL = float(os.environ.get('JOB_POLL_INTERVAL', '1'))
+
+# Synchronisation différentielle (league.changes, api/changes/)
+CHANGELOG_RETENTION_DAYS = 30
+CHANGELOG_MAX_ROWS = 500           # au-delà, le client se resynchronise complètement
+CHANGELOG_SETTLE_SECONDS = 5       # délai après lequel un trou dans le journal est ignoré
+
+# Taille maximale (pixels) des logos d'équipe après traitement
+LOGO_MAX_SIZE = 512
+LOGO_PROCESSING_THREADS = 4
+
+# Classement Elo (league.ratings)
+ELO_INITIAL_RATING = 1500
+ELO_K = 20
+ELO_HOME_ADVANTAGE = 0          # points Elo ajoutés à l'équipe à domicile
+
+# Import des équipes par CSV (league.importing)
+TEAM_IMPORT_MAX_ROWS = 1000
+TEAM_IMPORT_MAX_LOGO_BYTES = 5 * 1024 * 1024
+
 # ========================
 # VALIDATION MOT DE PASSE
 # ========================
@@ -148,14 +298,15 @@ USE_TZ = True
 # FICHIERS STATIQUES
 # ========================
 STATIC_URL = '/static/'
-STATIC_ROOT = BASE_DIR / 'staticfiles'
+STATIC_ROOT = Path(os.environ.get('STATIC_ROOT', BASE_DIR / 'staticfiles'))
 
 _static_dir = BASE_DIR / 'static'
 STATICFILES_DIRS = [_static_dir] if _static_dir.is_dir() else []
 
 STORAGES = {
     "default": {
-        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        # Noms dérivés du contenu, sans doublon (league.storage)
+        "BACKEND": "league.storage.HashedMediaStorage",
     },
     "staticfiles": {
         "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
@@ -168,6 +319,11 @@ STORAGES = {
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Fichiers média servis par l'application (league.middleware.MediaFilesMiddleware) :
+# noms à empreinte en cache « immutable », anciens noms MEDIA_CACHE_MAX_AGE secondes
+SERVE_MEDIA = os.environ.get('SERVE_MEDIA', 'True').lower() in ('true', '1', 'yes')
+MEDIA_CACHE_MAX_AGE = int(os.environ.get('MEDIA_CACHE_MAX_AGE', '3600'))
+
 # ========================
 # CONFIGURATION LOGIN
 # ========================
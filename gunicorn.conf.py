@@ -0,0 +1,17 @@
+"""
+Configuration gunicorn pour GOMA-Efootball League.
+Chargée automatiquement par `gunicorn goma_efootball.wsgi`.
+"""
+
+
+def post_worker_init(worker):
+    """
+    Appelé dans chaque worker juste après le fork et le chargement de Django.
+    Préchauffe templates, connexions et caches avant la première requête.
+    """
+    from django.core.management import call_command
+
+    try:
+        call_command('warmup', verbosity=0)
+    except Exception as exc:  # le worker doit démarrer même si le préchauffage échoue
+        worker.log.warning("Préchauffage échoué : %s", exc)
@@ -4,7 +4,12 @@ Personnalisation pour GOMA-Efootball League.
 """
 
 from django.contrib import admin
-from .models import Team, Match, Result, Standing, AdminProfile, PlayoffMatch
+from .models import (
+    Team, Match, Result, ResultEvent, Standing, TeamRating, AdminProfile, PlayoffMatch, Job,
+    ChangeLogEntry,
+)
+from .search import search_teams
+from .signals import defer_standings_recalculation
 
 
 @admin.register(Team)
@@ -13,6 +18,20 @@ class TeamAdmin(admin.ModelAdmin):
     list_filter = ['is_active', 'created_at']
     search_fields = ['name', 'player_name', 'gamer_pseudo']
     list_editable = ['is_active']
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Recherche standard (icontains : milieu d'un nom compris), complétée
+        par l'index des préfixes, qui trouve aussi les noms sans accents
+        (utilisée aussi par l'autocomplétion des formulaires admin).
+        """
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term:
+            teams = search_teams(search_term, limit=None, active_only=False)
+            if teams:
+                results = results | queryset.filter(pk__in=[team['id'] for team in teams])
+        return results, may_have_duplicates
 
 
 @admin.register(Match)
@@ -20,6 +39,9 @@ class MatchAdmin(admin.ModelAdmin):
     list_display = ['__str__', 'matchday', 'phase', 'is_played']
     list_filter = ['phase', 'matchday', 'is_played']
     search_fields = ['home_team__name', 'away_team__name']
+    list_select_related = ['home_team', 'away_team']
+    autocomplete_fields = ['home_team', 'away_team']
+    show_full_result_count = False
 
 
 @admin.register(Result)
@@ -27,6 +49,57 @@ class ResultAdmin(admin.ModelAdmin):
     list_display = ['__str__', 'home_score', 'away_score', 'validated', 'validated_by']
     list_filter = ['validated']
     list_editable = ['validated']
+    list_select_related = ['match__home_team', 'match__away_team', 'validated_by']
+    autocomplete_fields = ['match']
+    show_full_result_count = False
+    list_per_page = 100
+
+    def changelist_view(self, request, extra_context=None):
+        """
+        Les modifications en ligne (list_editable) sauvegardent chaque résultat :
+        un seul recalcul du classement pour toute la page.
+        """
+        if request.method == 'POST':
+            with defer_standings_recalculation():
+                return super().changelist_view(request, extra_context)
+        return super().changelist_view(request, extra_context)
+
+
+@admin.register(ResultEvent)
+class ResultEventAdmin(admin.ModelAdmin):
+    """Journal en lecture seule : aucun ajout, modification ni suppression."""
+    list_display = ['id', 'created_at', 'action', 'match_id', 'home_score',
+                    'away_score', 'validated']
+    list_filter = ['action', 'validated']
+    search_fields = ['=match_id']
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ChangeLogEntry)
+class ChangeLogEntryAdmin(admin.ModelAdmin):
+    """Journal de synchronisation en lecture seule."""
+    list_display = ['id', 'created_at', 'action', 'kind', 'object_id']
+    list_filter = ['kind', 'action']
+    search_fields = ['=object_id']
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(Standing)
@@ -34,11 +107,23 @@ class StandingAdmin(admin.ModelAdmin):
     list_display = ['position', 'team', 'played', 'won', 'drawn', 'lost',
                     'goals_for', 'goals_against', 'goal_difference', 'points']
     ordering = ['-points', '-goal_difference']
+    list_select_related = ['team']
+    autocomplete_fields = ['team']
+    show_full_result_count = False
+
+
+@admin.register(TeamRating)
+class TeamRatingAdmin(admin.ModelAdmin):
+    list_display = ['team', 'rating', 'matches', 'updated_at']
+    list_select_related = ['team']
+    autocomplete_fields = ['team']
+    show_full_result_count = False
 
 
 @admin.register(AdminProfile)
 class AdminProfileAdmin(admin.ModelAdmin):
     list_display = ['user', 'must_change_password', 'created_at']
+    list_select_related = ['user']
 
 
 @admin.register(PlayoffMatch)
@@ -46,9 +131,20 @@ class PlayoffMatchAdmin(admin.ModelAdmin):
     list_display = ['round_type', 'home_team', 'away_team', 'home_score',
                     'away_score', 'is_played', 'has_penalties']
     list_filter = ['round_type', 'is_played']
+    list_select_related = ['home_team', 'away_team']
+    autocomplete_fields = ['home_team', 'away_team', 'penalty_winner']
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'attempts', 'created_at', 'started_at', 'duration_ms']
+    list_filter = ['status', 'name']
+    readonly_fields = ['dedup_key', 'created_at', 'started_at', 'finished_at',
+                       'duration_ms', 'last_error']
+    show_full_result_count = False
 
 
 # Personnaliser le titre de l'admin
 admin.site.site_header = "GOMA-Efootball League - Administration"
 admin.site.site_title = "GOMA-Efootball"
-admin.site.index_title = "Gestion de la compétition"
\ No newline at end of file
+admin.site.index_title = "Gestion de la compétition"
@@ -13,6 +13,7 @@ class LeagueConfig(AppConfig):
     def ready(self):
         """
         Méthode appelée quand l'application est prête.
-        Importe les signals pour les activer.
+        Importe les signals et les vérifications pour les activer.
         """
+        import league.checks  # noqa: F401
         import league.signals  # noqa: F401
\ No newline at end of file
@@ -0,0 +1,269 @@
+"""
+Cache applicatif pour GOMA-Efootball League.
+Gère la version des données de la ligue, utilisée pour construire
+les clés de cache : toute modification d'une équipe, d'un match
+ou d'un résultat change la version et invalide les entrées dérivées,
+dans tous les processus à condition que le cache soit partagé.
+
+get_or_refresh() ajoute un remplissage unique : après une modification,
+une seule requête recalcule une valeur pendant que les autres reçoivent
+la précédente (au plus CACHE_MAX_STALE secondes), avec des compteurs
+par nom consultables via `manage.py cache_stats`.
+
+Versions, verrous et compteurs ne valent pour tous les processus
+(workers gunicorn, run_worker) que si le cache par défaut est partagé :
+Redis ou DatabaseCache, voir settings.CACHES et league.checks.
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from .routers import primary_reads
+
+logger = logging.getLogger(__name__)
+
+DATA_VERSION_KEY = 'league:data_version'
+
+# Compteurs de get_or_refresh, par nom
+STAT_COUNTERS = ('hits', 'stale', 'collapsed', 'misses', 'refreshes', 'errors')
+STAT_NAMES_KEY = 'league:swr:names'
+
+
+def _initial_version():
+    """
+    Version initiale basée sur l'horloge (en millisecondes).
+    Si la clé est évincée du cache, la nouvelle version reste
+    supérieure à toutes les précédentes : aucune vieille entrée n'est reprise.
+    """
+    return int(time.time() * 1000)
+
+
+def get_version(key=DATA_VERSION_KEY):
+    """
+    Retourne la valeur courante d'un compteur de version.
+    Le compteur est stocké dans le cache par défaut : il n'est commun aux
+    workers et à run_worker que si ce cache est partagé (settings.CACHES).
+    """
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key=DATA_VERSION_KEY):
+    """Incrémente un compteur de version après une modification."""
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Clé absente (cache vidé ou redémarré) : repartir de l'horloge
+        version = _initial_version()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+def get_data_version():
+    """Retourne la version courante des données de la ligue."""
+    return get_version(DATA_VERSION_KEY)
+
+
+def bump_data_version():
+    """
+    Incrémente la version des données après une modification et note
+    l'heure du changement : get_or_refresh en déduit depuis quand
+    les entrées de la version précédente sont périmées.
+    """
+    version = bump_version(DATA_VERSION_KEY)
+    cache.set(_changed_at_key(version), time.time(), settings.CACHE_MAX_STALE + 60)
+    return version
+
+
+def _changed_at_key(version):
+    return f'{DATA_VERSION_KEY}:{version}:changed_at'
+
+
+def _stale_since(version):
+    """Heure à laquelle les entrées de `version` sont devenues périmées (None : inconnue)."""
+    return cache.get(_changed_at_key(version + 1))
+
+
+def versioned_key(name, *parts):
+    """Construit une clé de cache liée à la version des données."""
+    suffix = ':'.join(str(part) for part in parts)
+    key = f'league:{name}:v{get_data_version()}'
+    return f'{key}:{suffix}' if suffix else key
+
+
+def _entry_key(name, parts):
+    suffix = ':'.join(str(part) for part in parts)
+    key = f'league:swr:{name}'
+    return f'{key}:{suffix}' if suffix else key
+
+
+def _stat_key(name, counter):
+    return f'league:swr:stats:{name}:{counter}'
+
+
+# Compteurs du processus pas encore ajoutés aux compteurs partagés
+_pending_counts = {}
+_pending_lock = threading.Lock()
+_last_flush = 0.0
+
+
+def _count(name, counter):
+    """
+    Incrémente un compteur de get_or_refresh. Les compteurs sont regroupés
+    dans le processus et envoyés au cache toutes les CACHE_STATS_FLUSH_INTERVAL
+    secondes : une lecture servie depuis le cache n'y écrit pas.
+    """
+    with _pending_lock:
+        _pending_counts[(name, counter)] = _pending_counts.get((name, counter), 0) + 1
+        due = time.monotonic() - _last_flush >= settings.CACHE_STATS_FLUSH_INTERVAL
+    if due:
+        flush_cache_stats()
+
+
+def flush_cache_stats():
+    """Ajoute aux compteurs partagés ceux accumulés par le processus."""
+    global _last_flush
+    with _pending_lock:
+        pending = dict(_pending_counts)
+        _pending_counts.clear()
+        _last_flush = time.monotonic()
+    if not pending:
+        return
+
+    names = cache.get(STAT_NAMES_KEY) or []
+    new_names = {name for name, _counter in pending} - set(names)
+    if new_names:
+        cache.set(STAT_NAMES_KEY, sorted({*names, *new_names}), timeout=None)
+    for (name, counter), delta in pending.items():
+        key = _stat_key(name, counter)
+        if cache.add(key, delta, timeout=None):
+            continue
+        try:
+            cache.incr(key, delta)
+        except ValueError:  # évincé entre-temps
+            cache.set(key, delta, timeout=None)
+
+
+def cache_stats():
+    """Compteurs de get_or_refresh, tous processus confondus : {nom: {compteur: valeur}}."""
+    flush_cache_stats()
+    names = cache.get(STAT_NAMES_KEY) or []
+    keys = {_stat_key(name, counter): (name, counter) for name in names for counter in STAT_COUNTERS}
+    values = cache.get_many(keys)
+    stats = {name: dict.fromkeys(STAT_COUNTERS, 0) for name in names}
+    for key, (name, counter) in keys.items():
+        stats[name][counter] = values.get(key, 0)
+    return stats
+
+
+def reset_cache_stats():
+    """Remet les compteurs de get_or_refresh à zéro."""
+    flush_cache_stats()
+    names = cache.get(STAT_NAMES_KEY) or []
+    cache.delete_many([_stat_key(name, counter) for name in names for counter in STAT_COUNTERS])
+
+
+def _fill(key, lock_key, version, compute, timeout):
+    """
+    Calcule la valeur, l'enregistre avec sa version et libère le verrou.
+    Le calcul lit la base principale : une réplique en retard donnerait
+    des données antérieures à `version`, gardées CACHE_ENTRY_TIMEOUT secondes.
+    """
+    try:
+        with primary_reads():
+            value = compute()
+        cache.set(key, (version, value), timeout)
+        return value
+    finally:
+        cache.delete(lock_key)
+
+
+def _refresh_in_background(name, key, lock_key, version, compute, timeout):
+    def run():
+        try:
+            _fill(key, lock_key, version, compute, timeout)
+            _count(name, 'refreshes')
+        except Exception:
+            _count(name, 'errors')
+            logger.exception("Échec du rafraîchissement en arrière-plan de %s", key)
+        finally:
+            # Connexions propres à ce thread, jamais rendues au serveur sinon
+            connections.close_all()
+
+    threading.Thread(target=run, name=f'cache-refresh:{name}', daemon=True).start()
+
+
+def refresh_value(name, compute, *parts, timeout=None):
+    """
+    Recalcule et enregistre la valeur de get_or_refresh pour la version
+    courante, sans attendre qu'une requête la demande (tâches de fond).
+    """
+    if timeout is None:
+        timeout = settings.CACHE_ENTRY_TIMEOUT
+    version = get_data_version()
+    with primary_reads():
+        value = compute()
+    cache.set(_entry_key(name, parts), (version, value), timeout)
+    _count(name, 'refreshes')
+    return value
+
+
+def get_or_refresh(name, compute, *parts, timeout=None):
+    """
+    Retourne compute() pour la version courante des données, avec un seul
+    calcul à la fois par clé.
+    - Entrée de la version courante : renvoyée directement.
+    - Entrée d'une version précédente, périmée depuis au plus
+      CACHE_MAX_STALE secondes : renvoyée telle quelle ; la première requête
+      lance le recalcul dans un thread, les suivantes ne recalculent rien.
+    - Sans entrée utilisable : la première requête calcule, les autres
+      attendent son résultat (au plus CACHE_LOCK_TIMEOUT secondes,
+      puis calculent elles-mêmes).
+    """
+    if timeout is None:
+        timeout = settings.CACHE_ENTRY_TIMEOUT
+    version = get_data_version()
+    key = _entry_key(name, parts)
+    entry = cache.get(key)
+    if entry is not None and entry[0] >= version:
+        _count(name, 'hits')
+        return entry[1]
+
+    stale = False
+    if entry is not None:
+        stale_since = _stale_since(entry[0])
+        stale = stale_since is not None and time.time() - stale_since <= settings.CACHE_MAX_STALE
+    lock_key = f'{key}:lock:v{version}'
+    if cache.add(lock_key, 1, settings.CACHE_LOCK_TIMEOUT):
+        if stale:
+            _count(name, 'stale')
+            _refresh_in_background(name, key, lock_key, version, compute, timeout)
+            return entry[1]
+        _count(name, 'misses')
+        return _fill(key, lock_key, version, compute, timeout)
+
+    # Une autre requête recalcule déjà cette valeur
+    if stale:
+        _count(name, 'collapsed')
+        return entry[1]
+    deadline = time.monotonic() + settings.CACHE_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(settings.CACHE_LOCK_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None and entry[0] >= version:
+            _count(name, 'collapsed')
+            return entry[1]
+        if cache.get(lock_key) is None:
+            # Calcul abandonné (erreur) : ne pas attendre jusqu'au bout
+            break
+    # Valeur non enregistrée : la lecture peut rester sur la réplique
+    _count(name, 'misses')
+    return compute()
@@ -0,0 +1,169 @@
+"""
+Génération du calendrier de GOMA-Efootball League.
+Championnat aller-retour par la méthode du cercle, utilisé par
+la vue generate_calendar (via la file de tâches) et seed_league,
+et extension incrémentale pour les équipes ajoutées ou désactivées.
+"""
+
+import random
+
+from django.db import transaction
+
+from .changes import notify_bulk_change
+from .models import Match, Result, Standing, Team
+from .publishing import all_pages
+from .signals import defer_standings_recalculation
+
+
+def round_robin(teams):
+    """
+    Calendrier aller (méthode du cercle) : liste de (journée, domicile, extérieur).
+    Avec un nombre impair d'équipes, une équipe est exemptée à chaque journée.
+    """
+    teams = list(teams)
+    if len(teams) % 2 != 0:
+        teams.append(None)
+    num_teams = len(teams)
+
+    fixtures = []
+    schedule = list(teams)
+    for matchday in range(1, num_teams):
+        for i in range(num_teams // 2):
+            home = schedule[i]
+            away = schedule[num_teams - 1 - i]
+            if home is not None and away is not None:
+                fixtures.append((matchday, home, away))
+        schedule = [schedule[0]] + [schedule[-1]] + schedule[1:-1]
+    return fixtures
+
+
+def generate_calendar(shuffle=True):
+    """
+    Remplace le calendrier par un championnat aller-retour des équipes actives
+    et réinitialise le classement. Retourne le nombre de matchs créés.
+    """
+    teams = list(Team.objects.filter(is_active=True))
+    if len(teams) < 2:
+        return 0
+    if shuffle:
+        random.shuffle(teams)
+
+    with transaction.atomic(), defer_standings_recalculation():
+        Result.objects.all().delete()
+        Match.objects.all().delete()
+
+        aller = round_robin(teams)
+        matches = [
+            Match(home_team=home, away_team=away, matchday=matchday, phase='aller')
+            for matchday, home, away in aller
+        ]
+        matches += [
+            Match(home_team=away, away_team=home, matchday=matchday, phase='retour')
+            for matchday, home, away in aller
+        ]
+        # bulk_create ne déclenche pas les signals : invalidation faite ici
+        Match.objects.bulk_create(matches)
+
+        Standing.objects.all().delete()
+        Standing.objects.bulk_create([Standing(team=team) for team in teams])
+        # Tout le calendrier change : les clients se resynchronisent
+        notify_bulk_change(Match, None, all_pages())
+    return len(matches)
+
+
+def _first_free_matchday(occupied, home_id, away_id):
+    """Première journée où aucune des deux équipes ne joue."""
+    busy = occupied.get(home_id, set()) | occupied.get(away_id, set())
+    matchday = 1
+    while matchday in busy:
+        matchday += 1
+    return matchday
+
+
+def extend_calendar():
+    """
+    Met à jour le calendrier sans toucher aux matchs joués (ceux qui ont
+    un résultat, validé ou non, même si is_played n'a pas été coché) :
+    retire les autres matchs des équipes désactivées, puis ajoute
+    les rencontres manquantes (aller et retour) entre équipes actives,
+    chacune dans la première journée de sa phase où les deux équipes sont libres.
+    Retourne les statistiques du changement.
+    """
+    active_ids = set(Team.objects.filter(is_active=True).values_list('pk', flat=True))
+
+    with transaction.atomic(), defer_standings_recalculation():
+        withdrawn = list(
+            Match.objects.filter(is_played=False, result__isnull=True)
+            .exclude(home_team_id__in=active_ids, away_team_id__in=active_ids)
+            .values_list('pk', flat=True)
+        )
+        if withdrawn:
+            Match.objects.filter(pk__in=withdrawn).delete()
+
+        existing = set()
+        occupied = {'aller': {}, 'retour': {}}
+        max_matchday = {'aller': 0, 'retour': 0}
+        home_counts = {}
+        for home_id, away_id, phase, matchday in Match.objects.values_list(
+            'home_team_id', 'away_team_id', 'phase', 'matchday'
+        ):
+            existing.add((home_id, away_id, phase))
+            for team_id in (home_id, away_id):
+                occupied[phase].setdefault(team_id, set()).add(matchday)
+            max_matchday[phase] = max(max_matchday[phase], matchday)
+            home_counts[home_id] = home_counts.get(home_id, 0) + 1
+
+        def plan(home_id, away_id, phase):
+            matchday = _first_free_matchday(occupied[phase], home_id, away_id)
+            for team_id in (home_id, away_id):
+                occupied[phase].setdefault(team_id, set()).add(matchday)
+            home_counts[home_id] = home_counts.get(home_id, 0) + 1
+            existing.add((home_id, away_id, phase))
+            return Match(home_team_id=home_id, away_team_id=away_id, matchday=matchday, phase=phase)
+
+        new_matches = []
+        ordered = sorted(active_ids)
+        for i, first in enumerate(ordered):
+            for second in ordered[i + 1:]:
+                pair = [
+                    (home, away, phase)
+                    for home, away in ((first, second), (second, first))
+                    for phase in ('aller', 'retour')
+                    if (home, away, phase) in existing
+                ]
+                if len(pair) >= 2:
+                    continue
+                if not pair:
+                    # Nouvelle rencontre : recevoir à l'aller l'équipe qui reçoit le moins
+                    if home_counts.get(first, 0) <= home_counts.get(second, 0):
+                        home, away = first, second
+                    else:
+                        home, away = second, first
+                    new_matches.append(plan(home, away, 'aller'))
+                    new_matches.append(plan(away, home, 'retour'))
+                else:
+                    # Une seule manche existe : ajouter la manche inverse
+                    home, away, phase = pair[0]
+                    new_matches.append(plan(away, home, 'retour' if phase == 'aller' else 'aller'))
+
+        # bulk_create ne déclenche pas les signals : invalidation faite ici
+        Match.objects.bulk_create(new_matches)
+
+        for team_id in active_ids:
+            Standing.objects.get_or_create(team_id=team_id)
+        Standing.objects.exclude(team_id__in=active_ids).delete()
+
+        if new_matches or withdrawn:
+            # Bases sans RETURNING (MySQL) : identifiants inconnus, resynchronisation
+            ids = [match.pk for match in new_matches]
+            notify_bulk_change(Match, None if None in ids else ids, all_pages())
+
+    new_matchdays = 0
+    for phase, previous in max_matchday.items():
+        last = max([previous] + [m.matchday for m in new_matches if m.phase == phase])
+        new_matchdays += last - previous
+    return {
+        'added': len(new_matches),
+        'withdrawn': len(withdrawn),
+        'new_matchdays': new_matchdays,
+    }
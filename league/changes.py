@@ -0,0 +1,244 @@
+"""
+Synchronisation différentielle pour GOMA-Efootball League.
+Chaque modification d'équipe, de match, de résultat, de match de phase
+finale ou de ligne de classement ajoute une ligne au journal
+(ChangeLogEntry) dans la même transaction. Un client qui connaît la
+version N appelle api/changes/?since=N et ne reçoit que les lignes
+modifiées depuis ; s'il est trop en retard (journal purgé, modification
+en masse, trop de lignes), il est renvoyé vers une resynchronisation complète.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min
+from django.urls import reverse
+from django.utils import timezone
+
+from .cache import bump_data_version
+from .models import ChangeLogEntry, Match, PlayoffMatch, Result, Standing, Team
+from .publishing import schedule_publish
+
+# Modèle -> type dans le journal
+KINDS = {
+    Team: 'team',
+    Match: 'match',
+    Result: 'result',
+    PlayoffMatch: 'playoff',
+    Standing: 'standing',
+}
+
+# Type -> clé de la réponse JSON
+SECTIONS = {
+    'team': 'teams',
+    'match': 'matches',
+    'result': 'results',
+    'playoff': 'playoffs',
+    'standing': 'standings',
+}
+
+
+def record_change(instance, action='save'):
+    """Ajoute au journal la modification d'un objet suivi."""
+    ChangeLogEntry.objects.create(kind=KINDS[type(instance)], object_id=instance.pk, action=action)
+
+
+def record_changes(model, ids, action='save'):
+    """Ajoute au journal plusieurs objets modifiés en masse (bulk_create, update...)."""
+    ChangeLogEntry.objects.bulk_create(
+        ChangeLogEntry(kind=KINDS[model], object_id=pk, action=action) for pk in ids
+    )
+
+
+def record_reset():
+    """Modification trop large pour être détaillée : les clients se resynchronisent."""
+    ChangeLogEntry.objects.create(kind='reset', action='reset')
+
+
+def notify_bulk_change(model, ids, pages=()):
+    """
+    Invalidations d'une modification en masse (bulk_create, bulk_update,
+    update), qui ne déclenche pas les signals : journal des modifications,
+    version des données à la validation et pages publiées à régénérer.
+    `ids` à None (identifiants inconnus ou modification trop large) : les
+    clients se resynchronisent. À appeler dans la transaction de la modification.
+    """
+    if ids is None:
+        record_reset()
+    else:
+        record_changes(model, ids)
+    transaction.on_commit(bump_data_version)
+    if settings.PUBLISH_STATIC_PAGES and pages:
+        schedule_publish(pages)
+
+
+def purge_change_log():
+    """Supprime les lignes plus anciennes que CHANGELOG_RETENTION_DAYS."""
+    limit = timezone.now() - timedelta(days=settings.CHANGELOG_RETENTION_DAYS)
+    deleted, _ = ChangeLogEntry.objects.filter(created_at__lt=limit).delete()
+    return deleted
+
+
+def _settled_entries(since):
+    """
+    Lignes postérieures à `since`, sans dépasser un trou récent : sous
+    PostgreSQL, une transaction plus ancienne peut encore valider un
+    identifiant plus petit. Un trou plus vieux que CHANGELOG_SETTLE_SECONDS
+    vient d'une transaction annulée ou d'une purge et est ignoré.
+    """
+    settle_limit = timezone.now() - timedelta(seconds=settings.CHANGELOG_SETTLE_SECONDS)
+    entries = ChangeLogEntry.objects.filter(pk__gt=since).order_by('pk').values_list(
+        'pk', 'kind', 'object_id', 'action', 'created_at'
+    )
+    expected = since + 1
+    for entry in entries.iterator(chunk_size=1000):
+        if entry[0] != expected and entry[4] > settle_limit:
+            return
+        yield entry
+        expected = entry[0] + 1
+
+
+def _teams(ids):
+    storage = Team._meta.get_field('logo').storage
+    return [
+        {
+            'id': pk, 'name': name, 'player_name': player_name, 'gamer_pseudo': gamer_pseudo,
+            'is_active': is_active, 'logo': storage.url(logo) if logo else None,
+        }
+        for pk, name, player_name, gamer_pseudo, is_active, logo in Team.objects.filter(
+            pk__in=ids
+        ).values_list('pk', 'name', 'player_name', 'gamer_pseudo', 'is_active', 'logo')
+    ]
+
+
+def _matches(ids):
+    return [
+        {
+            'id': pk, 'home': home_id, 'away': away_id, 'matchday': matchday,
+            'phase': phase, 'date': date_played, 'is_played': is_played,
+        }
+        for pk, home_id, away_id, matchday, phase, date_played, is_played in Match.objects.filter(
+            pk__in=ids
+        ).values_list('pk', 'home_team_id', 'away_team_id', 'matchday', 'phase', 'date_played', 'is_played')
+    ]
+
+
+def _results(ids):
+    # Seuls les résultats validés sont publics
+    return [
+        {'id': pk, 'match': match_id, 'score': [home_score, away_score]}
+        for pk, match_id, home_score, away_score in Result.objects.filter(
+            pk__in=ids, validated=True
+        ).values_list('pk', 'match_id', 'home_score', 'away_score')
+    ]
+
+
+def _playoffs(ids):
+    return [
+        {
+            'id': pk, 'round': round_type, 'home': home_id, 'away': away_id,
+            'score': [home_score, away_score] if is_played else None,
+            'penalty_winner': penalty_winner_id if has_penalties else None,
+        }
+        for pk, round_type, home_id, away_id, home_score, away_score, is_played,
+        has_penalties, penalty_winner_id in PlayoffMatch.objects.filter(pk__in=ids).values_list(
+            'pk', 'round_type', 'home_team_id', 'away_team_id', 'home_score', 'away_score',
+            'is_played', 'has_penalties', 'penalty_winner_id',
+        )
+    ]
+
+
+def _standings(ids):
+    return [
+        {
+            'id': pk, 'team': team_id, 'position': position, 'played': played, 'won': won,
+            'drawn': drawn, 'lost': lost, 'goals_for': goals_for, 'goals_against': goals_against,
+            'goal_difference': goal_difference, 'points': points,
+        }
+        for pk, team_id, position, played, won, drawn, lost, goals_for, goals_against,
+        goal_difference, points in Standing.objects.filter(pk__in=ids).values_list(
+            'pk', 'team_id', 'position', 'played', 'won', 'drawn', 'lost',
+            'goals_for', 'goals_against', 'goal_difference', 'points',
+        )
+    ]
+
+
+# Type -> lecture de l'état actuel des objets (une requête par type)
+SERIALIZERS = {
+    'team': _teams,
+    'match': _matches,
+    'result': _results,
+    'playoff': _playoffs,
+    'standing': _standings,
+}
+
+
+def settled_version():
+    """
+    Version de reprise après une resynchronisation : la dernière ligne plus
+    ancienne que CHANGELOG_SETTLE_SECONDS, déjà validée à coup sûr.
+    Les modifications plus récentes seront renvoyées au client (sans effet
+    si l'instantané les contenait déjà).
+    """
+    settle_limit = timezone.now() - timedelta(seconds=settings.CHANGELOG_SETTLE_SECONDS)
+    return ChangeLogEntry.objects.filter(created_at__lte=settle_limit).aggregate(
+        version=Max('pk')
+    )['version'] or 0
+
+
+def resync():
+    """Réponse de resynchronisation : recharger l'instantané complet puis reprendre à `version`."""
+    return {'version': settled_version(), 'resync': True, 'snapshot': reverse('league:api_snapshot')}
+
+
+def changes_since(since):
+    """
+    Modifications depuis la version `since` : état actuel des objets
+    modifiés (une requête par type) et identifiants des objets supprimés.
+    Les objets modifiés plusieurs fois ne sont envoyés qu'une fois.
+    """
+    if since is None:
+        return resync()
+
+    bounds = ChangeLogEntry.objects.aggregate(first=Min('pk'), last=Max('pk'))
+    last = bounds['last'] or 0
+    if since == last:
+        return {'version': since, 'resync': False, 'changes': {}, 'deleted': {}}
+    if bounds['first'] is None or since > last or since < bounds['first'] - 1:
+        # Journal vide, version inconnue (base réinitialisée ou négative)
+        # ou lignes purgées depuis
+        return resync()
+
+    latest = {}
+    version = since
+    for pk, kind, object_id, action, _created_at in _settled_entries(since):
+        if kind == 'reset':
+            return resync()
+        # Seule la dernière action sur chaque objet compte
+        latest[(kind, object_id)] = action
+        version = pk
+        if len(latest) > settings.CHANGELOG_MAX_ROWS:
+            return resync()
+
+    saved = {}
+    deleted = {}
+    for (kind, object_id), action in latest.items():
+        target = saved if action == 'save' else deleted
+        target.setdefault(kind, []).append(object_id)
+
+    changes = {}
+    for kind, ids in saved.items():
+        rows = SERIALIZERS[kind](ids)
+        changes[SECTIONS[kind]] = rows
+        # Absents : supprimés depuis (suppression pas encore dans le journal)
+        # ou résultats dévalidés, dans les deux cas retirés côté client
+        missing = set(ids) - {row['id'] for row in rows}
+        deleted.setdefault(kind, []).extend(sorted(missing))
+
+    return {
+        'version': version,
+        'resync': False,
+        'changes': changes,
+        'deleted': {SECTIONS[kind]: ids for kind, ids in deleted.items() if ids},
+    }
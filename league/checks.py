@@ -0,0 +1,31 @@
+"""
+Vérifications Django (manage.py check) propres à GOMA-Efootball League.
+"""
+
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Caches dont chaque processus a sa propre copie
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Versions des données, verrous de remplissage et index de recherche
+    reposent sur le cache par défaut : propre à chaque processus, un worker
+    ne verrait pas les modifications faites par un autre.
+    """
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if settings.DEBUG or backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Error(
+            f"Le cache par défaut ({backend}) n'est pas partagé entre les processus.",
+            hint="Configurer REDIS_URL ou un cache en base (DatabaseCache), voir settings.CACHES.",
+            id='league.E001',
+        )
+    ]
@@ -0,0 +1,122 @@
+"""
+Optimisation des réponses pour GOMA-Efootball League.
+Minification du HTML rendu et compression gzip/brotli,
+avec mise en cache des octets compressés des pages publiques.
+"""
+
+import hashlib
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:  # brotli est optionnel : gzip seul
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('text/html', 'application/json')
+
+# Blocs dont les espaces sont significatifs
+_PROTECTED = re.compile(
+    r'(<(pre|textarea|script|style)\b.*?</\2\s*>)',
+    re.IGNORECASE | re.DOTALL,
+)
+# Commentaires HTML, sauf commentaires conditionnels
+_COMMENT = re.compile(r'<!--(?!\[if).*?-->', re.DOTALL)
+_WHITESPACE = re.compile(r'\s+')
+_ACCEPT_ENCODING_ITEM = re.compile(r'^\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$')
+
+
+def minify_html(html):
+    """
+    Supprime commentaires et espaces superflus du HTML.
+    Chaque suite d'espaces devient un seul espace : le rendu est identique.
+    """
+    parts = _PROTECTED.split(html)
+    minified = []
+    # split() avec deux groupes : texte, bloc protégé, nom de balise, texte...
+    for i in range(0, len(parts), 3):
+        text = _COMMENT.sub('', parts[i])
+        minified.append(_WHITESPACE.sub(' ', text))
+        if i + 1 < len(parts):
+            minified.append(parts[i + 1])
+    return ''.join(minified).strip()
+
+
+def choose_encoding(accept_encoding, allow_brotli=True):
+    """Choisit 'br' ou 'gzip' selon l'en-tête Accept-Encoding (None si aucun)."""
+    accepted = {}
+    for item in accept_encoding.lower().split(','):
+        match = _ACCEPT_ENCODING_ITEM.match(item)
+        if not match:
+            continue
+        try:
+            quality = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+        accepted[match.group(1)] = quality
+
+    def allowed(encoding):
+        return accepted.get(encoding, accepted.get('*', 0)) > 0
+
+    if brotli is not None and allow_brotli and allowed('br'):
+        return 'br'
+    if allowed('gzip'):
+        return 'gzip'
+    return None
+
+
+def _compress(content, encoding, padding):
+    if encoding == 'br':
+        return brotli.compress(content, mode=brotli.MODE_TEXT, quality=5)
+    # Remplissage aléatoire contre BREACH pour les réponses personnelles
+    return compress_string(content, max_random_bytes=100 if padding else None)
+
+
+def optimize_content(content, charset, is_html, encoding, shared=False):
+    """
+    Minifie (HTML) puis compresse le contenu d'une réponse.
+    Pour une réponse partagée (page publique anonyme), le résultat est mis
+    en cache sous l'empreinte du contenu d'origine : minification et
+    compression ne sont faites qu'une fois par version de page.
+    """
+    key = None
+    if shared:
+        digest = hashlib.sha1(content).hexdigest()
+        key = f'league:optimized:{encoding or "identity"}:{digest}'
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    if is_html:
+        content = minify_html(content.decode(charset)).encode(charset)
+    if encoding:
+        content = _compress(content, encoding, padding=not shared)
+
+    if key is not None:
+        cache.set(key, content, settings.COMPRESSED_RESPONSE_CACHE_TIMEOUT)
+    return content
+
+
+def optimize_stream(chunks, charset, is_html, encoding, shared=False):
+    """
+    Version en flux d'optimize_content : chaque morceau est minifié puis
+    compressé et envoyé aussitôt (vidage du compresseur après chaque morceau),
+    le premier octet part sans attendre la fin de la page. Pas de cache.
+    Les morceaux doivent s'arrêter entre deux balises (blocs de template rendus).
+    """
+    if is_html:
+        chunks = (minify_html(chunk.decode(charset)).encode(charset) for chunk in chunks)
+    if encoding == 'br':
+        compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=5)
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+    elif encoding:
+        yield from compress_sequence(chunks, max_random_bytes=None if shared else 100)
+    else:
+        yield from chunks
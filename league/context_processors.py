@@ -3,6 +3,7 @@ Context processors personnalisés.
 Injecte des variables dans TOUS les templates automatiquement.
 """
 
+from .cache import get_or_refresh
 from .models import Team, Match, Result
 
 
@@ -13,8 +14,14 @@ def league_context(request):
     context = {
         'league_name': 'GOMA-Efootball League',
         'whatsapp_link': 'https://chat.whatsapp.com/VOTRE_LIEN_ICI',
+    }
+    context.update(get_or_refresh('league_counts', _league_counts))
+    return context
+
+
+def _league_counts():
+    return {
         'total_teams': Team.objects.filter(is_active=True).count(),
         'total_matches': Match.objects.count(),
         'matches_played': Match.objects.filter(is_played=True).count(),
-    }
-    return context
\ No newline at end of file
+    }
\ No newline at end of file
@@ -6,7 +6,7 @@ Utilise Django Forms et crispy-forms pour le rendu Bootstrap 5.
 from django import forms
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import PasswordChangeForm
-from .models import Team, Result, PlayoffMatch
+from .models import Team, Match, Result, PlayoffMatch
 
 
 class TeamForm(forms.ModelForm):
@@ -47,6 +47,35 @@ class TeamForm(forms.ModelForm):
         return name
 
 
+class TeamImportForm(forms.Form):
+    """
+    Formulaire d'import en masse des équipes (CSV + archive de logos).
+    """
+    csv_file = forms.FileField(
+        label="Fichier CSV des équipes",
+        help_text="Colonnes : name, player_name, gamer_pseudo, contact, logo (séparateur , ou ;)",
+        widget=forms.FileInput(attrs={
+            'class': 'form-control',
+            'accept': '.csv,text/csv'
+        })
+    )
+    logos = forms.FileField(
+        required=False,
+        label="Archive zip des logos (optionnel)",
+        widget=forms.FileInput(attrs={
+            'class': 'form-control',
+            'accept': '.zip,application/zip'
+        })
+    )
+    dry_run = forms.BooleanField(
+        required=False,
+        label="Vérifier seulement (aucune équipe créée)",
+        widget=forms.CheckboxInput(attrs={
+            'class': 'form-check-input'
+        })
+    )
+
+
 class ResultForm(forms.ModelForm):
     """
     Formulaire pour enregistrer le résultat d'un match.
@@ -70,6 +99,50 @@ class ResultForm(forms.ModelForm):
         }
 
 
+class BulkValidateResultsForm(forms.Form):
+    """
+    Formulaire de validation groupée des résultats en attente.
+    Soit une sélection de résultats, soit une journée entière.
+    """
+    result_ids = forms.TypedMultipleChoiceField(
+        required=False,
+        coerce=int,
+        widget=forms.MultipleHiddenInput
+    )
+    matchday = forms.IntegerField(
+        required=False,
+        min_value=1,
+        label="Journée",
+        widget=forms.NumberInput(attrs={
+            'class': 'form-control form-control-sm',
+            'placeholder': 'N°'
+        })
+    )
+    phase = forms.ChoiceField(
+        required=False,
+        choices=[('', 'Toutes phases')] + Match.PHASE_CHOICES,
+        label="Phase",
+        widget=forms.Select(attrs={
+            'class': 'form-select form-select-sm'
+        })
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Les identifiants sont libres : seuls les résultats en attente seront modifiés
+        if self.is_bound:
+            self.fields['result_ids'].choices = [
+                (value, value) for value in self.data.getlist('result_ids')
+            ]
+
+    def clean(self):
+        """Vérifie qu'une sélection ou une journée est fournie."""
+        cleaned_data = super().clean()
+        if not cleaned_data.get('result_ids') and not cleaned_data.get('matchday'):
+            raise forms.ValidationError("Sélectionnez des résultats ou une journée.")
+        return cleaned_data
+
+
 class PlayoffResultForm(forms.ModelForm):
     """
     Formulaire pour les résultats de phase finale.
@@ -199,6 +272,21 @@ class GenerateCalendarForm(forms.Form):
     """
     Formulaire de confirmation pour générer le calendrier.
     """
+    MODE_FULL = 'full'
+    MODE_INCREMENTAL = 'incremental'
+
+    mode = forms.ChoiceField(
+        choices=[
+            (MODE_FULL, "Régénérer tout le calendrier (supprime matchs et résultats)"),
+            (MODE_INCREMENTAL, "Mettre à jour : ajouter les équipes nouvelles, "
+                               "retirer les équipes désactivées, conserver les matchs joués"),
+        ],
+        initial=MODE_FULL,
+        label="Mode",
+        widget=forms.RadioSelect(attrs={
+            'class': 'form-check-input'
+        })
+    )
     confirm = forms.BooleanField(
         required=True,
         label="Je confirme vouloir générer le calendrier",
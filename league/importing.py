@@ -0,0 +1,262 @@
+"""
+Import en masse des équipes pour GOMA-Efootball League.
+Un fichier CSV (une équipe par ligne) et une archive zip de logos
+optionnelle : toutes les lignes, logos compris (mêmes contrôles que
+TeamForm), sont validées avant la moindre écriture, puis équipes et
+classements sont créés en deux requêtes bulk_create (sans les signals
+d'une création une à une) et les logos sont traités en parallèle en tâche de fond.
+"""
+
+import csv
+import io
+import zipfile
+import zlib
+from dataclasses import dataclass, field
+from pathlib import PurePosixPath
+
+from django import forms
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils.text import slugify
+
+from .changes import notify_bulk_change, record_changes
+from .jobs import enqueue
+from .logos import delete_if_orphaned
+from .models import Standing, Team
+from .publishing import all_pages
+from .search import bump_teams_version
+
+REQUIRED_COLUMNS = ('name', 'player_name', 'gamer_pseudo')
+OPTIONAL_COLUMNS = ('contact', 'logo')
+
+# En-têtes français acceptés
+COLUMN_ALIASES = {
+    'nom': 'name',
+    'equipe': 'name',
+    'équipe': 'name',
+    'joueur': 'player_name',
+    'pseudo': 'gamer_pseudo',
+    'telephone': 'contact',
+    'téléphone': 'contact',
+}
+LOGO_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp')
+# Erreurs de lecture d'un fichier de l'archive (corrompu, chiffré, compression inconnue)
+ARCHIVE_READ_ERRORS = (zipfile.BadZipFile, RuntimeError, NotImplementedError, EOFError, OSError, zlib.error)
+
+
+@dataclass
+class ImportReport:
+    """Résultat d'un import : équipes créées ou erreurs par ligne."""
+    teams: list = field(default_factory=list)
+    errors: list = field(default_factory=list)
+    logos: int = 0
+    dry_run: bool = False
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def error(self, line, message):
+        self.errors.append((line, message))
+
+
+def _decode(data):
+    if isinstance(data, str):
+        return data
+    try:
+        return data.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        # Export Excel en Windows-1252
+        return data.decode('cp1252', errors='replace')
+
+
+def _read_rows(text):
+    """Lit le CSV (séparateur , ou ; détecté) en dictionnaires aux en-têtes normalisés."""
+    sample = text[:4096]
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.reader(io.StringIO(text), dialect)
+    header = next(reader, None) or []
+    columns = [COLUMN_ALIASES.get(name.strip().lower(), name.strip().lower()) for name in header]
+    rows = []
+    for line, values in enumerate(reader, start=2):
+        if not any(value.strip() for value in values):
+            continue
+        rows.append((line, dict(zip(columns, (value.strip() for value in values)))))
+    return columns, rows
+
+
+def _logo_index(archive):
+    """Images de l'archive indexées par nom de fichier et par slug (sans dossier)."""
+    index = {}
+    for info in archive.infolist():
+        path = PurePosixPath(info.filename)
+        if info.is_dir() or path.name.startswith('.') or path.suffix.lower() not in LOGO_EXTENSIONS:
+            continue
+        index.setdefault(path.name.lower(), info)
+        index.setdefault(slugify(path.stem), info)
+    return index
+
+
+def _read_logo(archive, info):
+    """Contenu d'un logo de l'archive, lu sans dépasser TEAM_IMPORT_MAX_LOGO_BYTES (None si plus gros)."""
+    limit = settings.TEAM_IMPORT_MAX_LOGO_BYTES
+    if info.file_size > limit:
+        return None
+    with archive.open(info) as handle:
+        data = handle.read(limit + 1)
+    return data if len(data) <= limit else None
+
+
+def _logo_error(archive, info):
+    """Mêmes contrôles que le champ logo de TeamForm : taille, puis image lisible par Pillow."""
+    try:
+        data = _read_logo(archive, info)
+    except ARCHIVE_READ_ERRORS:
+        return f"logo « {info.filename} » illisible dans l'archive"
+    if data is None:
+        return f"logo « {info.filename} » trop volumineux"
+    try:
+        forms.ImageField().clean(SimpleUploadedFile(PurePosixPath(info.filename).name, data))
+    except ValidationError as exc:
+        return f"logo « {info.filename} » invalide : {' '.join(exc.messages)}"
+    return None
+
+
+def import_teams(csv_data, logos_zip=None, dry_run=False):
+    """
+    Importe les équipes du CSV (octets ou texte) et leurs logos (fichier zip).
+    Colonnes : name, player_name, gamer_pseudo, contact (optionnel),
+    logo (optionnel : fichier de l'archive ; sinon le logo dont le nom
+    correspond au nom de l'équipe). Rien n'est écrit si une ligne est invalide.
+    """
+    report = ImportReport(dry_run=dry_run)
+    columns, rows = _read_rows(_decode(csv_data))
+
+    missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+    if missing:
+        report.error(1, f"Colonnes manquantes : {', '.join(missing)}")
+        return report
+    if len(rows) > settings.TEAM_IMPORT_MAX_ROWS:
+        report.error(1, f"Trop de lignes ({len(rows)}, maximum {settings.TEAM_IMPORT_MAX_ROWS}).")
+        return report
+
+    archive = None
+    logos = {}
+    if logos_zip is not None:
+        try:
+            archive = zipfile.ZipFile(logos_zip)
+        except zipfile.BadZipFile:
+            report.error(0, "L'archive des logos n'est pas un fichier zip valide.")
+            return report
+        logos = _logo_index(archive)
+
+    max_lengths = {
+        name: Team._meta.get_field(name).max_length
+        for name in REQUIRED_COLUMNS + ('contact',)
+    }
+    existing = {name.casefold() for name in Team.objects.values_list('name', flat=True)}
+    logo_errors = {}
+    seen = {}
+    teams = []
+    team_logos = []
+    for line, row in rows:
+        values = {name: row.get(name, '') for name in REQUIRED_COLUMNS + OPTIONAL_COLUMNS}
+        row_errors = []
+        for name in REQUIRED_COLUMNS:
+            if not values[name]:
+                row_errors.append(f"'{name}' est obligatoire")
+        for name, max_length in max_lengths.items():
+            if len(values[name]) > max_length:
+                row_errors.append(f"'{name}' dépasse {max_length} caractères")
+        # Mêmes règles que TeamForm
+        key = values['name'].casefold()
+        if values['name'] and len(values['name']) < 2:
+            row_errors.append("le nom doit contenir au moins 2 caractères")
+        if key in existing:
+            row_errors.append(f"l'équipe « {values['name']} » existe déjà")
+        elif key and key in seen:
+            row_errors.append(f"nom en double avec la ligne {seen[key]}")
+        if key:
+            seen.setdefault(key, line)
+
+        logo = None
+        if values['logo'] and archive is None:
+            row_errors.append("logo indiqué sans archive de logos")
+        elif archive is not None:
+            if values['logo']:
+                logo = logos.get(PurePosixPath(values['logo']).name.lower())
+            else:
+                logo = logos.get(slugify(values['name']))
+            if values['logo'] and logo is None:
+                row_errors.append(f"logo « {values['logo']} » absent de l'archive")
+            elif logo is not None:
+                if logo.filename not in logo_errors:
+                    logo_errors[logo.filename] = _logo_error(archive, logo)
+                if logo_errors[logo.filename]:
+                    row_errors.append(logo_errors[logo.filename])
+
+        if row_errors:
+            report.error(line, ' ; '.join(row_errors))
+            continue
+        teams.append(Team(
+            name=values['name'],
+            player_name=values['player_name'],
+            gamer_pseudo=values['gamer_pseudo'],
+            contact=values['contact'],
+        ))
+        team_logos.append(logo)
+
+    if report.errors or dry_run:
+        report.teams = teams
+        report.logos = sum(1 for logo in team_logos if logo is not None)
+        return report
+
+    saved_logos = []
+    try:
+        # Fichiers écrits avant la transaction : supprimés si elle échoue
+        for team, logo in zip(teams, team_logos):
+            if logo is not None:
+                extension = PurePosixPath(logo.filename).suffix.lower()
+                name = default_storage.save(
+                    f"teams/{slugify(team.name) or 'logo'}{extension}",
+                    ContentFile(_read_logo(archive, logo)),
+                )
+                team.logo = name
+                saved_logos.append(name)
+
+        with transaction.atomic():
+            # bulk_create ne déclenche pas create_standing_for_new_team ni les invalidations
+            Team.objects.bulk_create(teams)
+            if any(team.pk is None for team in teams):
+                # Bases sans RETURNING (MySQL) : relire les identifiants
+                ids = dict(Team.objects.filter(
+                    name__in=[team.name for team in teams]
+                ).values_list('name', 'pk'))
+                for team in teams:
+                    team.pk = ids[team.name]
+            standings = Standing.objects.bulk_create([Standing(team=team) for team in teams])
+            record_changes(Team, [team.pk for team in teams])
+            standing_ids = [standing.pk for standing in standings]
+            notify_bulk_change(Standing, None if None in standing_ids else standing_ids, all_pages())
+            transaction.on_commit(bump_teams_version)
+            logo_team_ids = [team.pk for team in teams if team.logo]
+            if logo_team_ids:
+                # Après validation : les threads de traitement lisent les équipes créées
+                transaction.on_commit(
+                    lambda: enqueue('process_team_logos', team_ids=logo_team_ids)
+                )
+    except Exception:
+        for name in saved_logos:
+            delete_if_orphaned(name)
+        raise
+
+    report.teams = teams
+    report.logos = len(saved_logos)
+    return report
@@ -0,0 +1,194 @@
+"""
+File de tâches de fond pour GOMA-Efootball League.
+Les traitements lourds déclenchés par l'admin sont enregistrés en base
+et exécutés un par un par `manage.py run_worker` : la requête admin
+répond immédiatement. Une tâche identique déjà en attente n'est pas
+dupliquée, une tâche en échec est réessayée avec un délai croissant.
+Sans LEAGUE_ASYNC_JOBS, les tâches sont exécutées immédiatement.
+"""
+
+import hashlib
+import json
+import logging
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Avg, Count, F, Max, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .locking import database_lock
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Nom de tâche -> fonction exécutée (chemin importé à l'exécution)
+TASKS = {
+    'recompute_standings': 'league.signals.recalculate_all_standings',
+    'rebuild_ratings': 'league.ratings.rebuild_ratings',
+    'generate_calendar': 'league.calendars.generate_calendar',
+    'extend_calendar': 'league.calendars.extend_calendar',
+    'process_team_logo': 'league.logos.process_team_logo',
+    'process_team_logos': 'league.logos.process_team_logos',
+    'publish_pages': 'league.publishing.publish',
+    'compute_playoff_odds': 'league.simulation.compute_playoff_odds',
+}
+
+
+def _dedup_key(name, kwargs):
+    payload = json.dumps([name, kwargs], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def run_task(name, **kwargs):
+    """Exécute directement une tâche enregistrée."""
+    return import_string(TASKS[name])(**kwargs)
+
+
+def enqueue(name, **kwargs):
+    """
+    Ajoute une tâche à la file, ou l'exécute tout de suite si la file
+    est désactivée (retourne alors None).
+    Une tâche identique (même nom, mêmes paramètres) déjà en attente est réutilisée :
+    la contrainte unique sur (dedup_key, en attente) départage deux ajouts simultanés.
+    """
+    if name not in TASKS:
+        raise ValueError(f"Tâche inconnue : {name}")
+    if not settings.LEAGUE_ASYNC_JOBS:
+        run_task(name, **kwargs)
+        return None
+
+    key = _dedup_key(name, kwargs)
+    for _attempt in range(3):
+        job = Job.objects.filter(dedup_key=key, status='pending').first()
+        if job is not None:
+            return job
+        try:
+            return _create_job(name, kwargs, key)
+        except IntegrityError:
+            # Ajoutée entre-temps par une autre requête : la réutiliser
+            continue
+    return _create_job(name, kwargs, key)
+
+
+def _create_job(name, kwargs, key):
+    with transaction.atomic():
+        if not connection.features.supports_partial_indexes:
+            # Sans contrainte partielle (MySQL) : vérifier et créer sous verrou
+            with database_lock('league-jobs', Job):
+                job = Job.objects.filter(dedup_key=key, status='pending').first()
+                if job is not None:
+                    return job
+        return Job.objects.create(
+            name=name,
+            kwargs=kwargs,
+            dedup_key=key,
+            max_attempts=settings.JOB_MAX_ATTEMPTS,
+            run_after=timezone.now(),
+        )
+
+
+def claim_next_job():
+    """
+    Réserve la prochaine tâche prête. La réservation est un UPDATE conditionnel
+    sur le statut : deux workers ne peuvent pas prendre la même tâche.
+    """
+    now = timezone.now()
+    candidates = (
+        Job.objects.filter(status='pending', run_after__lte=now)
+        .order_by('run_after', 'pk')
+        .values_list('pk', flat=True)[:10]
+    )
+    for pk in candidates:
+        claimed = Job.objects.filter(pk=pk, status='pending').update(
+            status='running',
+            started_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def run_job(job):
+    """Exécute une tâche réservée et enregistre sa durée ou son erreur."""
+    started = time.perf_counter()
+    try:
+        with transaction.atomic():
+            run_task(job.name, **job.kwargs)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            # Nouvel essai après 1, 2, 4... fois JOB_RETRY_DELAY
+            delay = settings.JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+            job.status = 'pending'
+            job.run_after = timezone.now() + timedelta(seconds=delay)
+        else:
+            job.status = 'failed'
+        logger.exception("Tâche %s #%s en échec (essai %s/%s)",
+                         job.name, job.pk, job.attempts, job.max_attempts)
+    else:
+        job.status = 'done'
+        job.last_error = ''
+
+    job.finished_at = timezone.now()
+    job.duration_ms = (time.perf_counter() - started) * 1000
+    fields = ['status', 'run_after', 'finished_at', 'duration_ms', 'last_error']
+    try:
+        with transaction.atomic():
+            job.save(update_fields=fields)
+    except IntegrityError:
+        # Une tâche identique attend déjà : elle remplace ce nouvel essai
+        job.status = 'failed'
+        job.save(update_fields=fields)
+    return job
+
+
+def requeue_stale_jobs():
+    """
+    Remet en attente les tâches restées « en cours » après l'arrêt brutal d'un worker,
+    sauf si une tâche identique attend déjà (la tâche abandonnée est alors en échec).
+    """
+    limit = timezone.now() - timedelta(seconds=settings.JOB_TIMEOUT)
+    requeued = 0
+    for pk in Job.objects.filter(status='running', started_at__lt=limit).values_list('pk', flat=True):
+        try:
+            with transaction.atomic():
+                requeued += Job.objects.filter(pk=pk, status='running').update(status='pending')
+        except IntegrityError:
+            Job.objects.filter(pk=pk, status='running').update(status='failed')
+    return requeued
+
+
+def purge_finished_jobs():
+    """Supprime les tâches terminées plus anciennes que JOB_RETENTION_DAYS."""
+    limit = timezone.now() - timedelta(days=settings.JOB_RETENTION_DAYS)
+    deleted, _ = Job.objects.filter(status='done', finished_at__lt=limit).delete()
+    return deleted
+
+
+def job_stats(since=None):
+    """
+    Métriques par tâche : nombre exécuté, échecs, en attente,
+    durée moyenne et maximale, attente moyenne avant exécution (ms).
+    """
+    jobs = Job.objects.all()
+    if since is not None:
+        jobs = jobs.filter(created_at__gte=since)
+    rows = jobs.values('name').annotate(
+        done=Count('pk', filter=Q(status='done')),
+        failed=Count('pk', filter=Q(status='failed')),
+        pending=Count('pk', filter=Q(status='pending')),
+        avg_ms=Avg('duration_ms', filter=Q(status='done')),
+        max_ms=Max('duration_ms', filter=Q(status='done')),
+        avg_wait=Avg(F('started_at') - F('created_at'), filter=Q(status='done')),
+    ).order_by('name')
+    stats = []
+    for row in rows:
+        wait = row.pop('avg_wait')
+        row['avg_wait_ms'] = wait.total_seconds() * 1000 if wait is not None else None
+        stats.append(row)
+    return stats
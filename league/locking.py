@@ -0,0 +1,101 @@
+"""
+Sérialisation des recalculs pour GOMA-Efootball League.
+Deux admins qui enregistrent un résultat en même temps ne doivent pas
+recalculer le classement en parallèle : le dernier à écrire pourrait
+enregistrer des chiffres calculés avant le résultat de l'autre.
+Un verrou de base de données (valable entre processus) sérialise les
+recalculs, et un regroupement par processus évite de recalculer une
+fois par demande quand plusieurs arrivent pendant un recalcul.
+"""
+
+import threading
+import zlib
+from contextlib import contextmanager
+
+from django.db import IntegrityError, connection, transaction
+
+from .models import DatabaseLock
+
+
+def _lock_key(name):
+    # pg_advisory_xact_lock attend un bigint : crc32 du nom
+    return zlib.crc32(name.encode())
+
+
+@contextmanager
+def database_lock(name, model):
+    """
+    Verrou exclusif tenu jusqu'à la fin de la transaction en cours
+    (à utiliser dans transaction.atomic()). Les données lues après
+    l'acquisition incluent tout ce que le détenteur précédent a validé.
+    PostgreSQL : verrou consultatif ; SQLite : prise immédiate du verrou
+    d'écriture (UPDATE sans ligne) sur la table de `model` ; autres bases :
+    SELECT ... FOR UPDATE sur la ligne DatabaseLock du verrou, quelle que
+    soit la taille de la table de `model`.
+    """
+    if not connection.in_atomic_block:
+        raise RuntimeError("database_lock() doit être utilisé dans une transaction.")
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [_lock_key(name)])
+        elif connection.vendor == 'sqlite':
+            # Sans cela, une transaction SQLite ne prend le verrou d'écriture
+            # qu'à sa première écriture, après avoir lu des données périmées
+            table = connection.ops.quote_name(model._meta.db_table)
+            cursor.execute(f'UPDATE {table} SET id = id WHERE 0 = 1')
+        else:
+            _lock_row(name)
+    yield
+
+
+def _lock_row(name):
+    """Verrouille la ligne DatabaseLock `name`, créée au premier usage."""
+    row = DatabaseLock.objects.select_for_update().filter(name=name)
+    if row.values_list('pk', flat=True).first() is not None:
+        return
+    try:
+        with transaction.atomic():
+            # Une insertion verrouille aussi la ligne créée
+            DatabaseLock.objects.create(name=name)
+    except IntegrityError:
+        # Créée entre-temps par une autre transaction : attendre son verrou
+        list(row.values_list('pk', flat=True))
+
+
+class Coalescer:
+    """
+    Regroupe les demandes d'un même traitement dans un processus.
+    Une demande est satisfaite par toute exécution qui a commencé après elle :
+    pendant un recalcul, les demandes suivantes attendent puis ne lancent
+    qu'un seul recalcul pour elles toutes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._turn = threading.Lock()
+        self.requested = 0
+        self.started = 0
+        self.completed = 0
+        self.runs = 0
+
+    def run(self, func):
+        """Exécute `func` sauf si une exécution postérieure à la demande a déjà abouti."""
+        with self._lock:
+            self.requested += 1
+            ticket = self.requested
+
+        with self._turn:
+            if self.completed >= ticket:
+                return False
+            with self._lock:
+                # Toutes les demandes enregistrées jusqu'ici seront couvertes
+                self.started = self.requested
+            func()
+            self.completed = self.started
+            self.runs += 1
+        return True
+
+    def stats(self):
+        """Demandes reçues et exécutions réelles depuis le démarrage du processus."""
+        return {'requested': self.requested, 'runs': self.runs}
@@ -0,0 +1,100 @@
+"""
+Traitement des logos d'équipe pour GOMA-Efootball League.
+Les logos envoyés sont réduits à LOGO_MAX_SIZE pixels et recompressés
+en tâche de fond (voir league.jobs), hors de la requête d'envoi.
+Un fichier remplacé n'est supprimé que si plus aucune équipe ne l'utilise,
+après l'invalidation des caches et des pages qui pointaient vers lui.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from PIL import Image, ImageOps
+
+from .changes import notify_bulk_change
+from .models import Team
+from .publishing import pages_for
+
+
+def process_team_logo(team_id):
+    """
+    Réduit le logo d'une équipe s'il dépasse LOGO_MAX_SIZE.
+    Retourne True si le fichier a été réécrit.
+    """
+    team = Team.objects.filter(pk=team_id).first()
+    if team is None or not team.logo:
+        return False
+
+    with team.logo.open('rb') as handle:
+        image = Image.open(handle)
+        image_format = image.format or 'PNG'
+        image.load()
+
+    size = settings.LOGO_MAX_SIZE
+    if max(image.size) <= size:
+        return False
+
+    # Appliquer l'orientation EXIF avant de perdre les métadonnées
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((size, size), Image.LANCZOS)
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, optimize=True)
+
+    storage = team.logo.storage
+    name = team.logo.name
+    # Nouveau contenu, nouveau nom (league.storage) : l'original peut servir à une autre équipe
+    saved_name = storage.save(name, ContentFile(buffer.getvalue()))
+    if saved_name != name:
+        replace_logo(team, name, saved_name, storage)
+    return True
+
+
+def replace_logo(team, old_name, new_name, storage=None):
+    """
+    Fait pointer l'équipe vers son nouveau fichier de logo. L'URL du logo
+    change : caches et pages publiées sont invalidés, et l'ancien fichier
+    n'est supprimé qu'après la validation (plus aucune page ne le référence).
+    """
+    with transaction.atomic():
+        # update() : pas de recalcul du classement, invalidation faite ici
+        Team.objects.filter(pk=team.pk).update(logo=new_name)
+        notify_bulk_change(Team, [team.pk], pages_for(team))
+        transaction.on_commit(lambda: delete_if_orphaned(old_name, storage))
+
+
+def delete_if_orphaned(name, storage=None):
+    """
+    Supprime un logo qu'aucune équipe n'utilise plus (un même fichier
+    peut servir à plusieurs équipes). Retourne True si le fichier a été supprimé.
+    """
+    if not name or Team.objects.filter(logo=name).exists():
+        return False
+    storage = storage or default_storage
+    if not storage.exists(name):
+        return False
+    storage.delete(name)
+    return True
+
+
+def _process_in_thread(team_id):
+    try:
+        return process_team_logo(team_id)
+    finally:
+        # Chaque thread a sa propre connexion : la fermer en sortant
+        connection.close()
+
+
+def process_team_logos(team_ids):
+    """
+    Traite plusieurs logos en parallèle (Pillow libère le GIL pendant
+    le décodage et le redimensionnement). Retourne le nombre de logos réécrits.
+    """
+    with ThreadPoolExecutor(max_workers=settings.LOGO_PROCESSING_THREADS) as pool:
+        return sum(pool.map(_process_in_thread, team_ids))
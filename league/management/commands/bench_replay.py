@@ -0,0 +1,104 @@
+"""
+Commande Django de benchmark du rejeu du journal des résultats.
+Écrit un journal synthétique (enregistrements, corrections, suppressions)
+puis mesure la reconstruction du classement : état actuel, à une date,
+à un événement, et repli seul en mémoire.
+Tout est fait dans une transaction annulée : la base n'est pas modifiée.
+"""
+
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from league.calendars import round_robin
+from league.models import ResultEvent, Team
+from league.replay import fold_events, iter_events, standings_as_of
+
+
+class Command(BaseCommand):
+    help = 'Mesure le rejeu du journal des résultats (100 000 événements par défaut)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=100_000, help="Nombre d'événements")
+        parser.add_argument('--teams', type=int, default=20, help="Nombre d'équipes")
+        parser.add_argument('--repeat', type=int, default=5, help='Répétitions par mesure')
+        parser.add_argument('--seed', type=int, default=42, help='Graine aléatoire')
+
+    def handle(self, *args, **options):
+        self.repeat = max(1, options['repeat'])
+        num_events = options['events']
+        rng = random.Random(options['seed'])
+
+        with transaction.atomic():
+            teams = Team.objects.bulk_create([
+                Team(name=f"Bench {i:03d}", player_name='bench', gamer_pseudo='bench')
+                for i in range(options['teams'])
+            ])
+            aller = round_robin([team.pk for team in teams])
+            fixtures = [(home, away) for _day, home, away in aller]
+            fixtures += [(away, home) for home, away in fixtures]
+
+            # Identifiants de match fictifs au-delà des matchs réels
+            base_match_id = 10 ** 9
+            start = timezone.now() - timedelta(minutes=num_events)
+            started = time.perf_counter()
+            ResultEvent.objects.bulk_create(
+                (self._event(rng, fixtures, base_match_id, start, i) for i in range(num_events)),
+                batch_size=5000,
+            )
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{num_events} événements écrits en {elapsed:.2f} s "
+                f"({num_events / elapsed:,.0f} /s), {len(fixtures)} matchs"
+            )
+
+            first_id = (
+                ResultEvent.objects.filter(match_id__gte=base_match_id)
+                .order_by('id').values_list('id', flat=True).first()
+            )
+            middle = start + timedelta(minutes=num_events // 2)
+            events = list(iter_events())
+
+            self._measure("Rejeu complet (base + repli + tri)", lambda: standings_as_of())
+            self._measure("Rejeu à mi-parcours (date)", lambda: standings_as_of(at=middle))
+            self._measure(
+                "Rejeu à mi-parcours (événement)",
+                lambda: standings_as_of(event_id=first_id + num_events // 2),
+            )
+            self._measure("Lecture seule du journal", lambda: sum(1 for _ in iter_events()))
+            self._measure("Repli seul en mémoire", lambda: fold_events(events), count=len(events))
+
+            transaction.set_rollback(True)
+
+    def _event(self, rng, fixtures, base_match_id, start, index):
+        """Enregistrement (85 %), dévalidation (5 %) ou suppression (10 %) d'un résultat."""
+        match_index = rng.randrange(len(fixtures))
+        home_id, away_id = fixtures[match_index]
+        roll = rng.random()
+        return ResultEvent(
+            match_id=base_match_id + match_index,
+            home_team_id=home_id,
+            away_team_id=away_id,
+            action='delete' if roll < 0.10 else 'save',
+            home_score=rng.randint(0, 5),
+            away_score=rng.randint(0, 5),
+            validated=roll >= 0.15,
+            created_at=start + timedelta(minutes=index),
+        )
+
+    def _measure(self, label, func, count=None):
+        timings = []
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        median = statistics.median(timings)
+        line = f"{label:<36} médiane {median * 1000:8.1f} ms  min {min(timings) * 1000:8.1f} ms"
+        if count:
+            line += f"  ({count / median:,.0f} événements/s)"
+        self.stdout.write(line)
@@ -0,0 +1,150 @@
+"""
+Commande Django de benchmark de concurrence SQLite.
+Des lecteurs interrogent les pages publiques pendant que des admins
+enregistrent des résultats, d'abord avec les réglages SQLite d'origine,
+puis avec les PRAGMA de production (WAL, busy_timeout...).
+Chaque passe utilise une base temporaire : la base réelle n'est pas modifiée.
+"""
+
+import random
+import tempfile
+import threading
+import time
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections
+from django.test import Client
+from django.urls import reverse
+
+from league.models import Match
+
+READ_URLS = [
+    ('league:home', {}),
+    ('league:standings', {}),
+    ('league:match_list', {}),
+    ('league:result_list', {}),
+    ('league:api_standings', {}),
+]
+
+
+def percentile(values, pct):
+    """Percentile simple (méthode du rang le plus proche)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = 'Mesure erreurs de verrou et latence p99 de SQLite sous écritures concurrentes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--teams', type=int, default=20, help="Nombre d'équipes")
+        parser.add_argument('--readers', type=int, default=8, help='Threads lecteurs')
+        parser.add_argument('--writers', type=int, default=2, help='Threads admins')
+        parser.add_argument('--duration', type=float, default=10, help='Durée par passe (s)')
+
+    def handle(self, *args, **options):
+        db_settings = connections.settings['default']
+        if db_settings['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError("Ce benchmark ne concerne que SQLite.")
+
+        original_name = db_settings['NAME']
+        original_tuning = settings.SQLITE_TUNING
+        reports = {}
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                for label, tuned in (('avant', False), ('après', True)):
+                    connections.close_all()
+                    db_settings['NAME'] = str(Path(tmp) / f'bench_{int(tuned)}.sqlite3')
+                    settings.SQLITE_TUNING = tuned
+                    self._prepare(options['teams'])
+                    reports[label] = self._run(options)
+                    connections.close_all()
+        finally:
+            db_settings['NAME'] = original_name
+            settings.SQLITE_TUNING = original_tuning
+
+        for label, report in reports.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n=== {label} ==="))
+            for kind in ('lectures', 'écritures'):
+                stats = report[kind]
+                self.stdout.write(
+                    f"{kind:<10} {stats['count']:>6} req  "
+                    f"p50 {percentile(stats['latencies'], 50):7.1f} ms  "
+                    f"p99 {percentile(stats['latencies'], 99):7.1f} ms  "
+                    f"verrous {stats['locked']:>4}  autres erreurs {stats['errors']:>4}"
+                )
+
+    def _prepare(self, num_teams):
+        """Crée le schéma, la ligue de démonstration et un compte admin."""
+        call_command('migrate', verbosity=0, interactive=False)
+        call_command('seed_league', teams=num_teams, played=0.3, seed=1, stdout=StringIO())
+        User.objects.create_user(username='bench_admin', password='bench', is_staff=True)
+
+    def _run(self, options):
+        """Lance lecteurs et admins en parallèle pendant la durée demandée."""
+        report = {
+            kind: {'count': 0, 'latencies': [], 'locked': 0, 'errors': 0}
+            for kind in ('lectures', 'écritures')
+        }
+        lock = threading.Lock()
+        deadline = time.perf_counter() + options['duration']
+        match_ids = list(Match.objects.filter(is_played=False).values_list('pk', flat=True))
+        admin = User.objects.get(username='bench_admin')
+
+        def record(kind, started, error=None):
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                stats = report[kind]
+                stats['count'] += 1
+                stats['latencies'].append(elapsed)
+                if error is not None:
+                    if 'locked' in str(error):
+                        stats['locked'] += 1
+                    else:
+                        stats['errors'] += 1
+
+        def reader():
+            client = Client(HTTP_HOST='localhost')
+            try:
+                while time.perf_counter() < deadline:
+                    name, kwargs = random.choice(READ_URLS)
+                    started = time.perf_counter()
+                    try:
+                        client.get(reverse(name, kwargs=kwargs))
+                        record('lectures', started)
+                    except OperationalError as exc:
+                        record('lectures', started, exc)
+            finally:
+                connections.close_all()
+
+        def writer():
+            client = Client(HTTP_HOST='localhost')
+            client.force_login(admin)
+            try:
+                while time.perf_counter() < deadline:
+                    url = reverse('league:add_result', args=[random.choice(match_ids)])
+                    data = {'home_score': random.randint(0, 5), 'away_score': random.randint(0, 5)}
+                    started = time.perf_counter()
+                    try:
+                        client.post(url, data)
+                        record('écritures', started)
+                    except OperationalError as exc:
+                        record('écritures', started, exc)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=reader) for _ in range(options['readers'])]
+        threads += [threading.Thread(target=writer) for _ in range(options['writers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return report
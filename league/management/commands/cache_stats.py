@@ -0,0 +1,44 @@
+"""
+Commande Django d'observation du cache des vues (league.cache.get_or_refresh).
+Affiche, par valeur mise en cache, les lectures servies directement,
+les valeurs périmées servies pendant un recalcul, les requêtes regroupées
+derrière un calcul en cours et les calculs effectués.
+"""
+
+from django.core.management.base import BaseCommand
+
+from league.cache import cache_stats, reset_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Affiche les compteurs du cache des vues (remplissage unique)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Remettre les compteurs à zéro après affichage',
+        )
+
+    def handle(self, *args, **options):
+        stats = cache_stats()
+        if not stats:
+            self.stdout.write("Aucune valeur mise en cache pour l'instant.")
+        else:
+            self.stdout.write(
+                f"{'nom':<16}{'directs':>9}{'périmés':>9}{'regroupés':>11}"
+                f"{'calculs':>9}{'arrière-plan':>14}{'erreurs':>9}{'évités':>9}"
+            )
+            for name, counters in stats.items():
+                served = sum(counters[counter] for counter in ('hits', 'stale', 'collapsed', 'misses'))
+                # Part des lectures qui n'ont pas recalculé la valeur dans la requête
+                avoided = (served - counters['misses']) / served * 100 if served else 0
+                self.stdout.write(
+                    f"{name:<16}{counters['hits']:>9}{counters['stale']:>9}{counters['collapsed']:>11}"
+                    f"{counters['misses']:>9}{counters['refreshes']:>14}{counters['errors']:>9}"
+                    f"{avoided:>8.1f}%"
+                )
+
+        if options['reset']:
+            reset_cache_stats()
+            self.stdout.write(self.style.SUCCESS("✅ Compteurs remis à zéro."))
@@ -0,0 +1,71 @@
+"""
+Commande Django de maintenance des logos.
+Renomme les logos enregistrés avant le stockage à empreinte
+(league.storage) et supprime les fichiers qu'aucune équipe n'utilise.
+"""
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from league.logos import replace_logo
+from league.models import Team
+from league.storage import is_hashed_name
+
+LOGO_DIRECTORY = 'teams'
+
+
+class Command(BaseCommand):
+    help = 'Passe les logos sous des noms à empreinte et supprime les fichiers orphelins'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Afficher les opérations sans rien modifier',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        renamed = self._rename_logos(dry_run)
+        removed = self._remove_orphans(dry_run)
+        prefix = "🔎 (simulation) " if dry_run else "✅ "
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{renamed} logo(s) renommé(s), {removed} fichier(s) orphelin(s) supprimé(s)."
+        ))
+
+    def _rename_logos(self, dry_run):
+        renamed = 0
+        teams = Team.objects.exclude(logo='').exclude(logo__isnull=True).only('pk', 'logo')
+        for team in teams.iterator():
+            old_name = team.logo.name
+            if is_hashed_name(old_name):
+                continue
+            if not default_storage.exists(old_name):
+                self.stdout.write(self.style.WARNING(f"Fichier manquant pour {team.pk} : {old_name}"))
+                continue
+            renamed += 1
+            if dry_run:
+                self.stdout.write(f"  {old_name} -> (empreinte)")
+                continue
+            with default_storage.open(old_name, 'rb') as handle:
+                new_name = default_storage.save(old_name, handle)
+            replace_logo(team, old_name, new_name)
+            self.stdout.write(f"  {old_name} -> {new_name}")
+        return renamed
+
+    def _remove_orphans(self, dry_run):
+        if not (settings.MEDIA_ROOT and default_storage.exists(LOGO_DIRECTORY)):
+            return 0
+        used = set(Team.objects.exclude(logo='').values_list('logo', flat=True))
+        _directories, files = default_storage.listdir(LOGO_DIRECTORY)
+        removed = 0
+        for filename in files:
+            name = f'{LOGO_DIRECTORY}/{filename}'
+            if name in used:
+                continue
+            removed += 1
+            self.stdout.write(f"  orphelin : {name}")
+            if not dry_run:
+                default_storage.delete(name)
+        return removed
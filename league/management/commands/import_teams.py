@@ -0,0 +1,51 @@
+"""
+Commande Django d'import en masse des équipes.
+Même traitement que l'import de l'admin (league.importing) :
+validation complète, bulk_create des équipes et des classements,
+traitement des logos en tâche de fond.
+
+Exemple : python manage.py import_teams equipes.csv --logos logos.zip
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from league.importing import import_teams
+
+
+class Command(BaseCommand):
+    help = "Importe des équipes depuis un fichier CSV (et une archive zip de logos)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', help='Fichier CSV des équipes')
+        parser.add_argument('--logos', help='Archive zip des logos')
+        parser.add_argument('--dry-run', action='store_true', help='Valider sans rien créer')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            with open(options['csv_path'], 'rb') as handle:
+                csv_data = handle.read()
+            logos = open(options['logos'], 'rb') if options['logos'] else None
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        try:
+            report = import_teams(csv_data, logos_zip=logos, dry_run=options['dry_run'])
+        finally:
+            if logos is not None:
+                logos.close()
+        elapsed = time.perf_counter() - started
+
+        if not report.ok:
+            for line, message in report.errors:
+                self.stderr.write(f"Ligne {line} : {message}" if line else message)
+            raise CommandError(f"{len(report.errors)} ligne(s) invalide(s) : aucune équipe importée.")
+
+        if report.dry_run:
+            self.stdout.write(f"Vérification réussie : {len(report.teams)} équipe(s), {report.logos} logo(s).")
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {len(report.teams)} équipe(s) importée(s) avec {report.logos} logo(s) en {elapsed:.2f} s"
+        ))
@@ -0,0 +1,343 @@
+"""
+Commande Django de test de charge de bout en bout.
+Démarre le projet sous gunicorn sur une base de démonstration temporaire,
+rejoue un mélange de trafic réaliste (supporters sur le classement,
+le calendrier et l'API ; admins qui saisissent des résultats) et affiche
+débit et latences p50/p95/p99 par nom d'URL.
+À lancer avant une saison pour dimensionner les workers et repérer les régressions.
+"""
+
+import http.client
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.cookies import SimpleCookie
+from pathlib import Path
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from league.management.commands.bench_sqlite import percentile
+
+# Mélange des supporters : (nom d'URL, chemin, poids)
+FAN_MIX = [
+    ('standings', '/classement/', 35),
+    ('match_list', '/calendrier/', 25),
+    ('api_standings', '/api/standings/', 25),
+    ('home', '/', 10),
+    ('result_list', '/resultats/', 5),
+]
+
+ADMIN_USERNAME = 'loadtest_admin'
+ADMIN_PASSWORD = 'loadtest-password'
+LIST_MATCHES = (
+    "from league.models import Match; "
+    "print(' '.join(str(pk) for pk in Match.objects.values_list('pk', flat=True)))"
+)
+CSRF_INPUT = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+CREATE_ADMIN = f"""
+from django.contrib.auth.models import User
+from league.models import AdminProfile
+user, _ = User.objects.get_or_create(username={ADMIN_USERNAME!r})
+user.is_staff = True
+user.set_password({ADMIN_PASSWORD!r})
+user.save()
+AdminProfile.objects.update_or_create(user=user, defaults={{'must_change_password': False}})
+"""
+
+
+class Session:
+    """Connexion HTTP persistante (keep-alive) avec ses cookies, comme un navigateur."""
+
+    def __init__(self, host, port):
+        self.connection = http.client.HTTPConnection(host, port, timeout=30)
+        self.cookies = {}
+
+    def request(self, method, path, data=None):
+        headers = {'Host': 'localhost'}
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{name}={value}' for name, value in self.cookies.items())
+        body = None
+        if data is not None:
+            body = urlencode(data)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            content = response.read()
+        except (http.client.HTTPException, OSError):
+            # Connexion fermée par le serveur : la rouvrir pour la requête suivante
+            self.connection.close()
+            raise
+        for header in response.headers.get_all('Set-Cookie') or []:
+            cookie = SimpleCookie(header)
+            for name, morsel in cookie.items():
+                self.cookies[name] = morsel.value
+        return response.status, content
+
+    def csrf_token(self, path):
+        status, content = self.request('GET', path)
+        found = CSRF_INPUT.search(content.decode('utf-8', errors='replace'))
+        if status != 200 or not found:
+            raise CommandError(f"Jeton CSRF introuvable sur {path} (HTTP {status}).")
+        return found.group(1)
+
+    def close(self):
+        self.connection.close()
+
+
+class Command(BaseCommand):
+    help = 'Test de charge sous gunicorn : débit et latences p50/p95/p99 par URL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--duration', type=float, default=30, help='Durée de la mesure (s)')
+        parser.add_argument('--warmup', type=float, default=3, help='Durée de chauffe non mesurée (s)')
+        parser.add_argument('--fans', type=int, default=20, help='Supporters simultanés')
+        parser.add_argument('--admins', type=int, default=2, help='Admins simultanés')
+        parser.add_argument('--think', type=float, default=0,
+                            help='Pause moyenne (ms) entre deux requêtes d\'un supporter')
+        parser.add_argument('--admin-think', type=float, default=500,
+                            help='Pause moyenne (ms) entre deux saisies d\'un admin')
+        parser.add_argument('--workers', type=int, default=2, help='Workers gunicorn')
+        parser.add_argument('--threads', type=int, default=4, help='Threads par worker gunicorn')
+        parser.add_argument('--teams', type=int, default=20, help="Nombre d'équipes de la base")
+        parser.add_argument('--played', type=float, default=0.5, help='Part des matchs déjà joués')
+        parser.add_argument('--database-url', default='',
+                            help='Base à utiliser (vidée puis remplie !) ; par défaut SQLite temporaire')
+        parser.add_argument('--output', default='', help='Fichier JSON du rapport (comparaison entre versions)')
+        parser.add_argument('--seed', type=int, default=None, help='Graine aléatoire')
+
+    def handle(self, *args, **options):
+        self.base_dir = Path(settings.BASE_DIR)
+        with tempfile.TemporaryDirectory() as tmp:
+            env = self._environment(options, Path(tmp))
+            self._prepare(env, options)
+            port = self._free_port()
+            server = self._start_gunicorn(env, port, options)
+            try:
+                self._wait_ready(port, server)
+                report = self._run(port, options)
+            finally:
+                server.terminate()
+                try:
+                    server.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    server.kill()
+
+        self._print_report(report, options)
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+            self.stdout.write(f"Rapport écrit dans {options['output']}")
+
+    # --- Préparation ---
+
+    def _environment(self, options, tmp):
+        """Variables d'environnement du serveur : base et fichiers statiques temporaires."""
+        env = dict(os.environ)
+        env['DATABASE_URL'] = options['database_url'] or f'sqlite:///{tmp / "loadtest.sqlite3"}'
+        env['STATIC_ROOT'] = str(tmp / 'staticfiles')
+        env.setdefault('DJANGO_DEBUG', 'False')
+        env['DJANGO_ALLOWED_HOSTS'] = 'localhost,127.0.0.1'
+        env['PYTHONUNBUFFERED'] = '1'
+        return env
+
+    def _manage(self, env, *args):
+        completed = subprocess.run(
+            [sys.executable, 'manage.py', *args],
+            cwd=self.base_dir, env=env, capture_output=True, text=True,
+        )
+        if completed.returncode != 0:
+            raise CommandError(f"manage.py {' '.join(args)} a échoué :\n{completed.stderr[-2000:]}")
+        return completed.stdout
+
+    def _prepare(self, env, options):
+        """Schéma, ligue de démonstration, compte admin et fichiers statiques."""
+        self.stdout.write("Préparation de la base de test...")
+        self._manage(env, 'migrate', '--noinput', '-v', '0')
+        seed_args = ['seed_league', '--flush', '--teams', str(options['teams']),
+                     '--played', str(options['played'])]
+        if options['seed'] is not None:
+            seed_args += ['--seed', str(options['seed'])]
+        self._manage(env, *seed_args)
+        self._manage(env, 'shell', '-c', CREATE_ADMIN)
+        self.match_ids = [int(pk) for pk in self._manage(env, 'shell', '-c', LIST_MATCHES).split()]
+        if env['DJANGO_DEBUG'].lower() not in ('true', '1', 'yes'):
+            self._manage(env, 'collectstatic', '--noinput', '-v', '0')
+
+    @staticmethod
+    def _free_port():
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            return sock.getsockname()[1]
+
+    def _start_gunicorn(self, env, port, options):
+        self.stdout.write(
+            f"Démarrage de gunicorn : {options['workers']} worker(s) × {options['threads']} thread(s)..."
+        )
+        return subprocess.Popen(
+            [
+                sys.executable, '-m', 'gunicorn', 'goma_efootball.wsgi',
+                '--config', str(self.base_dir / 'gunicorn.conf.py'),
+                '--bind', f'127.0.0.1:{port}',
+                '--workers', str(options['workers']),
+                '--threads', str(options['threads']),
+                '--log-level', 'warning',
+            ],
+            cwd=self.base_dir, env=env,
+        )
+
+    def _wait_ready(self, port, server, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f"gunicorn s'est arrêté (code {server.returncode}).")
+            try:
+                session = Session('127.0.0.1', port)
+                status, _ = session.request('GET', '/')
+                session.close()
+                if status < 500:
+                    return
+            except OSError:
+                pass
+            time.sleep(0.2)
+        raise CommandError("gunicorn n'a pas répondu à temps.")
+
+    # --- Charge ---
+
+    def _run(self, port, options):
+        """Supporters et admins en parallèle ; seules les requêtes après la chauffe sont mesurées."""
+        rng = random.Random(options['seed'])
+        names = [name for name, _path, _weight in FAN_MIX]
+        paths = {name: path for name, path, _weight in FAN_MIX}
+        weights = [weight for _name, _path, weight in FAN_MIX]
+        samples = {}
+        lock = threading.Lock()
+        started = time.monotonic()
+        measure_from = started + options['warmup']
+        deadline = measure_from + options['duration']
+
+        def record(name, begin, status):
+            end = time.monotonic()
+            if begin < measure_from:
+                return
+            with lock:
+                stats = samples.setdefault(name, {'latencies': [], 'errors': 0})
+                stats['latencies'].append((end - begin) * 1000)
+                if status is None or status >= 400:
+                    stats['errors'] += 1
+
+        def pause(mean_ms, thread_rng):
+            if mean_ms > 0:
+                time.sleep(thread_rng.expovariate(1000 / mean_ms))
+
+        def fan(thread_seed):
+            thread_rng = random.Random(thread_seed)
+            session = Session('127.0.0.1', port)
+            try:
+                while time.monotonic() < deadline:
+                    name = thread_rng.choices(names, weights)[0]
+                    begin = time.monotonic()
+                    try:
+                        status, _ = session.request('GET', paths[name])
+                    except OSError:
+                        status = None
+                    record(name, begin, status)
+                    pause(options['think'], thread_rng)
+            finally:
+                session.close()
+
+        def admin(thread_seed, match_ids):
+            thread_rng = random.Random(thread_seed)
+            session = Session('127.0.0.1', port)
+            try:
+                token = session.csrf_token('/login/')
+                status, _ = session.request('POST', '/login/', {
+                    'csrfmiddlewaretoken': token,
+                    'username': ADMIN_USERNAME,
+                    'password': ADMIN_PASSWORD,
+                })
+                if status != 302:
+                    raise CommandError(f"Connexion admin refusée (HTTP {status}).")
+                while time.monotonic() < deadline:
+                    path = f'/admin-panel/match/{thread_rng.choice(match_ids)}/resultat/'
+                    begin = time.monotonic()
+                    try:
+                        # Comme un admin : ouvrir le formulaire puis l'envoyer
+                        token = session.cookies.get('csrftoken') or session.csrf_token(path)
+                        status, _ = session.request('POST', path, {
+                            'csrfmiddlewaretoken': token,
+                            'home_score': thread_rng.randint(0, 5),
+                            'away_score': thread_rng.randint(0, 5),
+                        })
+                        # Succès : redirection vers le calendrier
+                        status = 200 if status == 302 else status or 500
+                    except OSError:
+                        status = None
+                    record('add_result', begin, status)
+                    pause(options['admin_think'], thread_rng)
+            finally:
+                session.close()
+
+        match_ids = self.match_ids
+        threads = [threading.Thread(target=fan, args=(rng.random(),)) for _ in range(options['fans'])]
+        threads += [
+            threading.Thread(target=admin, args=(rng.random(), match_ids))
+            for _ in range(options['admins'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        report = {
+            'config': {key: options[key] for key in (
+                'duration', 'fans', 'admins', 'think', 'workers', 'threads', 'teams', 'played',
+            )},
+            'urls': {},
+        }
+        total = 0
+        for name, stats in sorted(samples.items()):
+            latencies = stats['latencies']
+            total += len(latencies)
+            report['urls'][name] = {
+                'requests': len(latencies),
+                'errors': stats['errors'],
+                'rps': round(len(latencies) / options['duration'], 1),
+                'p50': round(percentile(latencies, 50), 1),
+                'p95': round(percentile(latencies, 95), 1),
+                'p99': round(percentile(latencies, 99), 1),
+            }
+        report['total'] = {
+            'requests': total,
+            'errors': sum(stats['errors'] for stats in samples.values()),
+            'rps': round(total / options['duration'], 1),
+        }
+        return report
+
+    # --- Rapport ---
+
+    def _print_report(self, report, options):
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"\n=== {options['fans']} supporters, {options['admins']} admins, "
+            f"{options['duration']:.0f} s, gunicorn {options['workers']}×{options['threads']} ==="
+        ))
+        self.stdout.write(f"{'URL':<16} {'req':>7} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'erreurs':>8}")
+        for name, stats in report['urls'].items():
+            self.stdout.write(
+                f"{name:<16} {stats['requests']:>7} {stats['rps']:>8.1f} "
+                f"{stats['p50']:>6.1f}ms {stats['p95']:>6.1f}ms {stats['p99']:>6.1f}ms {stats['errors']:>8}"
+            )
+        total = report['total']
+        style = self.style.SUCCESS if not total['errors'] else self.style.WARNING
+        self.stdout.write(style(
+            f"Total : {total['requests']} requêtes, {total['rps']:.1f} req/s, {total['errors']} erreur(s)"
+        ))
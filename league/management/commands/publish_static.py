@@ -0,0 +1,45 @@
+"""
+Commande Django de pré-rendu complet du site public.
+Écrit toutes les pages publiques et l'API JSON dans PUBLISH_ROOT.
+À lancer après un déploiement ; ensuite, les signaux ne régénèrent
+que les pages touchées par chaque modification.
+"""
+
+import shutil
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from league.publishing import all_pages, publish
+
+
+class Command(BaseCommand):
+    help = 'Pré-rend toutes les pages publiques dans PUBLISH_ROOT'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--clean',
+            action='store_true',
+            help='Supprimer les pages publiées avant de tout régénérer',
+        )
+
+    def handle(self, *args, **options):
+        root = Path(settings.PUBLISH_ROOT)
+        if options['clean'] and root.exists():
+            shutil.rmtree(root)
+            self.stdout.write(f"🧹 {root} vidé")
+
+        started = time.perf_counter()
+        urls = all_pages()
+        written = publish(urls)
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {written}/{len(urls)} pages publiées dans {root} en {elapsed:.1f} s"
+        ))
+        if not settings.PUBLISH_STATIC_PAGES:
+            self.stdout.write(self.style.WARNING(
+                "⚠️ PUBLISH_STATIC_PAGES est désactivé : les pages ne sont ni servies ni mises à jour"
+            ))
@@ -0,0 +1,23 @@
+"""
+Commande Django de reconstruction du classement Elo.
+Rejoue tous les résultats validés dans l'ordre chronologique
+(à lancer après la migration qui crée TeamRating ou un changement de ELO_K).
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from league.ratings import rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = 'Reconstruit le classement Elo à partir de tous les résultats validés'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        teams = rebuild_ratings()
+        elapsed = (time.perf_counter() - started) * 1000
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Elo reconstruit : {teams} équipe(s) classée(s) en {elapsed:.0f} ms"
+        ))
@@ -0,0 +1,93 @@
+"""
+Commande Django du worker de tâches de fond.
+Exécute une par une les tâches de league.jobs (recalcul du classement,
+calendrier, logos, publication) enregistrées par l'admin.
+Un seul worker suffit ; plusieurs peuvent tourner sans prendre la même tâche.
+"""
+
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from league.changes import purge_change_log
+from league.jobs import (
+    claim_next_job, job_stats, purge_finished_jobs, requeue_stale_jobs, run_job,
+)
+
+# Maintenance (tâches abandonnées, purge) toutes les N secondes
+MAINTENANCE_INTERVAL = 60
+
+
+class Command(BaseCommand):
+    help = 'Exécute les tâches de fond de la ligue'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help="S'arrêter quand la file est vide",
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Afficher les métriques des tâches et quitter',
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self._print_stats()
+            return
+
+        self.running = True
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        self.stdout.write("👷 Worker démarré")
+        last_maintenance = 0
+        processed = 0
+        while self.running:
+            if time.monotonic() - last_maintenance > MAINTENANCE_INTERVAL:
+                requeued = requeue_stale_jobs()
+                if requeued:
+                    self.stdout.write(self.style.WARNING(f"⚠️ {requeued} tâche(s) abandonnée(s) reprise(s)"))
+                purge_finished_jobs()
+                purge_change_log()
+                last_maintenance = time.monotonic()
+
+            close_old_connections()
+            job = claim_next_job()
+            if job is None:
+                if options['burst']:
+                    break
+                time.sleep(settings.JOB_POLL_INTERVAL)
+                continue
+
+            job = run_job(job)
+            processed += 1
+            style = self.style.SUCCESS if job.status == 'done' else self.style.ERROR
+            self.stdout.write(style(
+                f"{job.name} #{job.pk} : {job.get_status_display()} en {job.duration_ms:.0f} ms"
+            ))
+
+        self.stdout.write(f"Worker arrêté ({processed} tâche(s) exécutée(s))")
+
+    def _stop(self, signum, frame):
+        """Termine la tâche en cours puis s'arrête."""
+        self.running = False
+
+    def _print_stats(self):
+        def ms(value):
+            return f"{value:.0f}" if value is not None else "-"
+
+        self.stdout.write(
+            f"{'Tâche':<22}{'OK':>6}{'Échecs':>8}{'Attente':>9}"
+            f"{'Moy. ms':>10}{'Max ms':>10}{'Délai ms':>10}"
+        )
+        for row in job_stats():
+            self.stdout.write(
+                f"{row['name']:<22}{row['done']:>6}{row['failed']:>8}{row['pending']:>9}"
+                f"{ms(row['avg_ms']):>10}{ms(row['max_ms']):>10}{ms(row['avg_wait_ms']):>10}"
+            )
@@ -0,0 +1,95 @@
+"""
+Commande Django de programmation des dates de match.
+Attribue un créneau (Match.date_played) à chaque match non joué
+selon les soirées et heures disponibles (voir league.scheduling).
+
+Exemple : python manage.py schedule_matches --start 2026-11-02 \\
+    --days mon,wed,fri --slots 18:00,19:00,20:00 --min-rest 1
+"""
+
+import time
+from datetime import date, datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from league.scheduling import WEEKDAYS, SchedulingError, schedule_matches
+
+
+class Command(BaseCommand):
+    help = 'Programme les dates des matchs non joués'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='Première soirée (AAAA-MM-JJ, défaut : demain)')
+        parser.add_argument('--end', help='Dernière soirée possible (AAAA-MM-JJ)')
+        parser.add_argument(
+            '--days',
+            default='mon,tue,wed,thu,fri,sat,sun',
+            help='Jours de jeu (ex : mon,wed,fri)',
+        )
+        parser.add_argument(
+            '--slots',
+            default='18:00,19:00,20:00,21:00',
+            help='Heures des créneaux de chaque soirée',
+        )
+        parser.add_argument(
+            '--min-rest',
+            type=int,
+            default=0,
+            help="Jours de repos minimum entre deux matchs d'une équipe",
+        )
+        parser.add_argument(
+            '--max-streak',
+            type=int,
+            default=2,
+            help='Matchs consécutifs maximum au même lieu (0 : pas de limite)',
+        )
+        parser.add_argument(
+            '--reschedule',
+            action='store_true',
+            help='Reprogrammer aussi les matchs non joués déjà datés',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Calculer sans enregistrer')
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options['start']) if options['start'] else None
+            end = date.fromisoformat(options['end']) if options['end'] else None
+            slot_times = sorted(
+                datetime.strptime(value.strip(), '%H:%M').time()
+                for value in options['slots'].split(',') if value.strip()
+            )
+            weekdays = {WEEKDAYS.index(day.strip().lower()[:3]) for day in options['days'].split(',')}
+        except ValueError as exc:
+            raise CommandError(f"Paramètre invalide : {exc}")
+        if start is None:
+            start = timezone.localdate() + timedelta(days=1)
+
+        started = time.perf_counter()
+        try:
+            stats = schedule_matches(
+                start,
+                slot_times,
+                weekdays=weekdays,
+                end=end,
+                min_rest_days=options['min_rest'],
+                max_venue_streak=options['max_streak'],
+                reschedule=options['reschedule'],
+                dry_run=options['dry_run'],
+            )
+        except SchedulingError as exc:
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - started
+
+        if not stats['scheduled']:
+            self.stdout.write("Aucun match à programmer.")
+            return
+        prefix = "(simulation) " if options['dry_run'] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {prefix}{stats['scheduled']} matchs programmés sur {stats['evenings']} soirées, "
+            f"du {stats['first']:%d/%m/%Y} au {stats['last']:%d/%m/%Y} ({elapsed:.2f} s)"
+        ))
+        if stats['streak_violations']:
+            self.stdout.write(self.style.WARNING(
+                f"⚠️ {stats['streak_violations']} série(s) domicile/extérieur dépassée(s)"
+            ))
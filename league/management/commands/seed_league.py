@@ -0,0 +1,100 @@
+"""
+Commande Django pour remplir la base avec une ligue de démonstration.
+Utilisée par les benchmarks et les tests de charge.
+"""
+
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from league.calendars import round_robin
+from league.models import Team, Match, Result, ResultEvent, Standing, PlayoffMatch
+from league.ratings import rebuild_ratings
+from league.changes import record_reset
+from league.signals import recalculate_all_standings
+
+
+class Command(BaseCommand):
+    help = 'Crée une ligue de démonstration (équipes, calendrier, résultats)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--teams', type=int, default=20, help="Nombre d'équipes")
+        parser.add_argument(
+            '--played',
+            type=float,
+            default=0.5,
+            help='Part des matchs déjà joués (0 à 1)',
+        )
+        parser.add_argument('--seed', type=int, default=None, help='Graine aléatoire')
+        parser.add_argument(
+            '--flush',
+            action='store_true',
+            help='Supprimer les données de la ligue existantes',
+        )
+
+    def handle(self, *args, **options):
+        num_teams = options['teams']
+        if num_teams < 2:
+            raise CommandError("Il faut au moins 2 équipes.")
+
+        rng = random.Random(options['seed'])
+
+        with transaction.atomic():
+            if options['flush']:
+                PlayoffMatch.objects.all().delete()
+                Result.objects.all().delete()
+                Match.objects.all().delete()
+                ResultEvent.objects.all().delete()
+                Standing.objects.all().delete()
+                Team.objects.all().delete()
+            elif Team.objects.exists():
+                raise CommandError("La base contient déjà des équipes (utilisez --flush).")
+
+            teams = Team.objects.bulk_create([
+                Team(
+                    name=f"Équipe {i:03d}",
+                    player_name=f"Joueur {i:03d}",
+                    gamer_pseudo=f"gamer_{i:03d}",
+                )
+                for i in range(1, num_teams + 1)
+            ])
+            Standing.objects.bulk_create([Standing(team=team) for team in teams])
+
+            aller = round_robin(teams)
+            matches = [
+                Match(home_team=home, away_team=away, matchday=day, phase='aller')
+                for day, home, away in aller
+            ] + [
+                Match(home_team=away, away_team=home, matchday=day, phase='retour')
+                for day, home, away in aller
+            ]
+            matches = Match.objects.bulk_create(matches)
+
+            num_played = int(len(matches) * max(0.0, min(options['played'], 1.0)))
+            played = matches[:num_played]
+            for match in played:
+                match.is_played = True
+            Match.objects.bulk_update(played, ['is_played'])
+            results = Result.objects.bulk_create([
+                Result(
+                    match=match,
+                    home_score=rng.randint(0, 5),
+                    away_score=rng.randint(0, 5),
+                    validated=True,
+                )
+                for match in played
+            ])
+            ResultEvent.objects.bulk_create(ResultEvent.from_result(result) for result in results)
+
+            recalculate_all_standings()
+            rebuild_ratings()
+            # Créations en masse non détaillées : les clients se resynchronisent
+            record_reset()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Ligue créée : {num_teams} équipes, {len(matches)} matchs, "
+                f"{num_played} résultats."
+            )
+        )
@@ -0,0 +1,175 @@
+"""
+Commande Django de test de charge du recalcul du classement.
+Plusieurs threads enregistrent et corrigent des résultats en même temps
+(comme plusieurs admins), puis le classement enregistré est comparé
+à un recalcul complet : aucune mise à jour ne doit être perdue.
+Le test tourne sur une base de test créée pour l'occasion
+(PostgreSQL, MySQL ou SQLite selon DATABASES) : la base réelle n'est pas modifiée.
+"""
+
+import random
+import tempfile
+import threading
+import time
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+
+from league.models import Match, Result, Standing, Team
+from league.signals import STANDING_FIELDS, standings_coalescer
+from league.tables import build_table
+
+
+def expected_standings():
+    """Classement attendu {team_id: valeurs}, recalculé en mémoire sans verrou."""
+    teams = Team.objects.filter(is_active=True).values_list('pk', 'name')
+    scores = Result.objects.filter(validated=True).values_list(
+        'match__home_team_id', 'match__away_team_id', 'home_score', 'away_score'
+    )
+    return {
+        row.team_id: (row.played, row.won, row.drawn, row.lost, row.goals_for,
+                      row.goals_against, row.goal_difference, row.points)
+        for row in build_table(teams, scores)
+    }
+
+
+class Command(BaseCommand):
+    help = 'Vérifie sous écritures concurrentes que le classement ne perd aucune mise à jour'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--teams', type=int, default=16, help="Nombre d'équipes")
+        parser.add_argument('--threads', type=int, default=8, help='Admins simultanés')
+        parser.add_argument('--writes', type=int, default=40, help='Écritures par thread')
+        parser.add_argument('--corrections', type=float, default=0.3,
+                            help='Part des écritures qui corrigent un résultat existant')
+        parser.add_argument('--seed', type=int, default=None, help='Graine aléatoire')
+
+    def handle(self, *args, **options):
+        db_settings = connections.settings['default']
+        original_test = dict(db_settings.get('TEST') or {})
+        original_async = settings.LEAGUE_ASYNC_JOBS
+        original_publish = settings.PUBLISH_STATIC_PAGES
+        tmp = tempfile.TemporaryDirectory()
+        old_name = None
+        try:
+            if connection.vendor == 'sqlite':
+                # Base de test sur disque : une base en mémoire ne teste pas les verrous
+                db_settings['TEST'] = {**original_test, 'NAME': str(Path(tmp.name) / 'stress.sqlite3')}
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            # Recalculs exécutés dans le thread de l'admin, sans publication
+            settings.LEAGUE_ASYNC_JOBS = False
+            settings.PUBLISH_STATIC_PAGES = False
+
+            call_command('seed_league', teams=options['teams'], played=0.2,
+                         seed=options['seed'] or 1, stdout=StringIO())
+            report = self._run(options)
+            mismatches = self._check()
+        finally:
+            settings.LEAGUE_ASYNC_JOBS = original_async
+            settings.PUBLISH_STATIC_PAGES = original_publish
+            if old_name is not None:
+                connections.close_all()
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+            db_settings['TEST'] = original_test
+            tmp.cleanup()
+
+        self.stdout.write(
+            f"Base : {connection.vendor}, {options['threads']} threads, "
+            f"{report['writes']} écritures en {report['elapsed']:.1f} s "
+            f"({report['writes'] / report['elapsed']:.0f}/s)"
+        )
+        self.stdout.write(
+            f"Recalculs demandés : {report['requested']}, exécutés : {report['runs']} "
+            f"(regroupés : {report['requested'] - report['runs']})"
+        )
+        if report['errors']:
+            self.stdout.write(self.style.WARNING(f"Erreurs de base : {len(report['errors'])}"))
+            for error in report['errors'][:5]:
+                self.stdout.write(f"  {error}")
+        if mismatches:
+            for team, stored, expected in mismatches[:10]:
+                self.stdout.write(f"  {team} : enregistré {stored}, attendu {expected}")
+            raise CommandError(f"❌ {len(mismatches)} ligne(s) de classement incorrecte(s).")
+        if report['errors']:
+            # Un recalcul en échec est une mise à jour perdue, même si un suivant l'a rattrapée
+            raise CommandError("❌ Des écritures ont échoué sur un verrou.")
+        self.stdout.write(self.style.SUCCESS("✅ Aucune mise à jour perdue : classement exact."))
+
+    def _run(self, options):
+        """Lance les admins concurrents ; chacun a ses propres matchs à saisir."""
+        rng = random.Random(options['seed'])
+        match_ids = list(Match.objects.filter(is_played=False).values_list('pk', flat=True))
+        rng.shuffle(match_ids)
+        threads_count = options['threads']
+        shares = [match_ids[index::threads_count] for index in range(threads_count)]
+        errors = []
+        writes = [0]
+        lock = threading.Lock()
+        start_stats = standings_coalescer.stats()
+        start_barrier = threading.Barrier(threads_count)
+
+        def admin(share, thread_seed):
+            thread_rng = random.Random(thread_seed)
+            entered = []
+            try:
+                start_barrier.wait()
+                for _ in range(options['writes']):
+                    score = {'home_score': thread_rng.randint(0, 5), 'away_score': thread_rng.randint(0, 5)}
+                    try:
+                        if entered and (not share or thread_rng.random() < options['corrections']):
+                            result = Result.objects.get(match_id=thread_rng.choice(entered))
+                            result.home_score = score['home_score']
+                            result.away_score = score['away_score']
+                            result.save()
+                        elif share:
+                            match_id = share.pop()
+                            Result.objects.create(match_id=match_id, validated=True, **score)
+                            entered.append(match_id)
+                        else:
+                            break
+                    except OperationalError as exc:
+                        with lock:
+                            errors.append(str(exc))
+                        continue
+                    with lock:
+                        writes[0] += 1
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=admin, args=(share, rng.random()))
+            for share in shares
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        stats = standings_coalescer.stats()
+        return {
+            'writes': writes[0],
+            'elapsed': elapsed,
+            'errors': errors,
+            'requested': stats['requested'] - start_stats['requested'],
+            'runs': stats['runs'] - start_stats['runs'],
+        }
+
+    def _check(self):
+        """Compare chaque ligne Standing au classement recalculé."""
+        expected = expected_standings()
+        mismatches = []
+        standings = Standing.objects.filter(team__is_active=True).select_related('team')
+        for standing in standings:
+            stored = tuple(getattr(standing, name) for name in STANDING_FIELDS[:-1])
+            if stored != expected.get(standing.team_id):
+                mismatches.append((standing.team.name, stored, expected.get(standing.team_id)))
+        positions = sorted(standings.values_list('position', flat=True))
+        if positions != list(range(1, len(positions) + 1)):
+            mismatches.append(('positions', positions, 'de 1 à N sans doublon'))
+        return mismatches
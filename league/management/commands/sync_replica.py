@@ -0,0 +1,58 @@
+"""
+Commande Django pour synchroniser la réplique SQLite locale.
+Copie la base principale vers la réplique avec l'API de sauvegarde SQLite,
+une fois ou en boucle (--watch) pour tester le routeur en local.
+"""
+
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Copie la base SQLite principale vers la réplique locale'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--watch',
+            type=float,
+            default=0,
+            metavar='SECONDES',
+            help='Resynchroniser en boucle à cet intervalle',
+        )
+
+    def handle(self, *args, **options):
+        databases = settings.DATABASES
+        if 'replica' not in databases:
+            raise CommandError("Aucune réplique configurée (SQLITE_REPLICA=1).")
+
+        sqlite_engine = 'django.db.backends.sqlite3'
+        if databases['default']['ENGINE'] != sqlite_engine or databases['replica']['ENGINE'] != sqlite_engine:
+            raise CommandError("La synchronisation locale ne gère que SQLite.")
+
+        source_path = str(databases['default']['NAME'])
+        replica_path = str(databases['replica']['NAME'])
+
+        interval = options['watch']
+        while True:
+            started = time.perf_counter()
+            self._copy(source_path, replica_path)
+            elapsed = (time.perf_counter() - started) * 1000
+            self.stdout.write(
+                self.style.SUCCESS(f"✅ Réplique synchronisée en {elapsed:.1f} ms")
+            )
+            if not interval:
+                break
+            time.sleep(interval)
+
+    def _copy(self, source_path, replica_path):
+        """Copie cohérente, même si la base principale est en cours d'écriture."""
+        source = sqlite3.connect(source_path)
+        replica = sqlite3.connect(replica_path)
+        try:
+            source.backup(replica)
+        finally:
+            replica.close()
+            source.close()
@@ -0,0 +1,89 @@
+"""
+Commande Django de préchauffage après un démarrage à froid.
+Ouvre les connexions aux bases, compile tous les templates,
+initialise la version des données et rend une fois les pages publiques
+pour que la première requête d'un visiteur soit aussi rapide que la centième.
+Appelée par gunicorn.conf.py dans chaque worker.
+"""
+
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.template import engines
+from django.test import Client
+from django.urls import reverse
+
+from league.cache import get_data_version
+
+WARMUP_URLS = [
+    'league:home',
+    'league:standings',
+    'league:ratings',
+    'league:match_list',
+    'league:result_list',
+    'league:playoffs',
+    'league:team_list',
+    'league:rules',
+    'league:api_standings',
+    'league:api_goals_stats',
+]
+
+
+class Command(BaseCommand):
+    help = 'Précharge connexions, templates et caches de la ligue'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--no-pages',
+            action='store_true',
+            help='Ne pas rendre les pages publiques',
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        started = time.perf_counter()
+
+        for alias in connections:
+            connections[alias].ensure_connection()
+        self._log(f"Connexions ouvertes : {', '.join(connections)}")
+
+        compiled = self._compile_templates()
+        self._log(f"Templates compilés : {compiled}")
+
+        self._log(f"Version des données : {get_data_version()}")
+
+        if not options['no_pages']:
+            client = Client(HTTP_HOST=self._host(), raise_request_exception=False)
+            for name in WARMUP_URLS:
+                response = client.get(reverse(name))
+                self._log(f"{name} : {response.status_code}")
+
+        elapsed = (time.perf_counter() - started) * 1000
+        if self.verbosity >= 1:
+            self.stdout.write(self.style.SUCCESS(f"✅ Préchauffage terminé en {elapsed:.0f} ms"))
+
+    def _compile_templates(self):
+        """Charge chaque template de league/templates (mis en cache par le loader cached)."""
+        directory = Path(apps.get_app_config('league').path) / 'templates'
+        engine = engines['django']
+        count = 0
+        for path in sorted(directory.rglob('*.html')):
+            engine.get_template(path.relative_to(directory).as_posix())
+            count += 1
+        return count
+
+    def _host(self):
+        """Premier hôte autorisé utilisable comme en-tête Host."""
+        for host in settings.ALLOWED_HOSTS:
+            host = host.strip().lstrip('.')
+            if host and host != '*':
+                return host
+        return 'localhost'
+
+    def _log(self, message):
+        if self.verbosity >= 2:
+            self.stdout.write(message)
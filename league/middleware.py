@@ -0,0 +1,283 @@
+"""
+Middlewares personnalisés pour GOMA-Efootball League.
+"""
+
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from whitenoise.base import WhiteNoise
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .cache import get_data_version
+from .compression import COMPRESSIBLE_TYPES, choose_encoding, optimize_content, optimize_stream
+from .publishing import PUBLISH_REQUEST_HEADER
+from .routers import RoutingState, routing_state
+from .storage import is_hashed_name
+
+# Pages publiques en lecture seule
+PUBLIC_URL_NAMES = {
+    'home', 'team_list', 'team_detail', 'match_list',
+    'result_list', 'standings', 'ratings', 'playoffs', 'rules',
+}
+
+# Pages publiques pouvant être partagées par un cache (nginx, CDN)
+PROXY_CACHEABLE_URL_NAMES = {
+    'home', 'standings', 'ratings', 'match_list', 'result_list', 'playoffs', 'team_detail',
+}
+
+# Clé de session : lectures sur la base principale jusqu'à ce timestamp
+PRIMARY_PIN_SESSION_KEY = '_league_primary_until'
+
+
+def is_public_read(request):
+    """Vérifie si la requête est une lecture d'une page publique ou de l'API."""
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    match = request.resolver_match
+    if match is None or match.app_name != 'league':
+        return False
+    return match.url_name in PUBLIC_URL_NAMES or match.url_name.startswith('api_')
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Autorise les lectures sur la réplique pour les pages publiques et l'API.
+    Après une écriture, la session reste sur la base principale
+    pendant REPLICA_PIN_SECONDS pour relire ses propres écritures.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RoutingState()
+        token = routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            routing_state.reset(token)
+
+        if state.wrote and hasattr(request, 'session'):
+            request.session[PRIMARY_PIN_SESSION_KEY] = time.time() + settings.REPLICA_PIN_SECONDS
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = routing_state.get()
+        if state is None or not is_public_read(request):
+            return None
+        if PUBLISH_REQUEST_HEADER in request.META:
+            return None  # la réplique peut ne pas avoir encore reçu l'écriture
+
+        # Ne pas ouvrir de session pour un visiteur anonyme sans cookie
+        if settings.SESSION_COOKIE_NAME in request.COOKIES:
+            pinned_until = request.session.get(PRIMARY_PIN_SESSION_KEY, 0)
+            if pinned_until > time.time():
+                return None
+
+        state.use_replica = True
+        return None
+
+
+class PublicCacheMiddleware:
+    """
+    Rend les pages publiques cachables par un reverse proxy pour les visiteurs anonymes.
+    Sans cookie de session ni de messages, la requête ne lit jamais la session :
+    la réponse ne porte pas `Vary: Cookie` et reçoit un Cache-Control public
+    ainsi que des Surrogate-Key liées à la version des données.
+    Le proxy doit contourner son cache dès qu'un cookie de session est présent.
+    Doit être placé avant SessionMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.league_proxy_cacheable = False
+        response = self.get_response(request)
+
+        if (
+            request.league_proxy_cacheable
+            and response.status_code == 200
+            and not response.cookies
+        ):
+            patch_cache_control(
+                response,
+                public=True,
+                max_age=settings.PUBLIC_CACHE_MAX_AGE,
+                stale_while_revalidate=settings.PUBLIC_CACHE_STALE_WHILE_REVALIDATE,
+            )
+            response['Surrogate-Key'] = ' '.join(self._surrogate_keys(request))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self._is_anonymous_public_read(request):
+            return None
+
+        # Court-circuiter les lectures de session de l'auth et des messages
+        request.user = AnonymousUser()
+        request._messages = CookieStorage(request)
+        request.league_proxy_cacheable = True
+        return None
+
+    def _is_anonymous_public_read(self, request):
+        if not is_public_read(request):
+            return False
+        url_name = request.resolver_match.url_name
+        if url_name not in PROXY_CACHEABLE_URL_NAMES and not url_name.startswith('api_'):
+            return False
+        cookies = request.COOKIES
+        return settings.SESSION_COOKIE_NAME not in cookies and CookieStorage.cookie_name not in cookies
+
+    def _surrogate_keys(self, request):
+        match = request.resolver_match
+        keys = ['league', f'league-v{get_data_version()}', match.url_name]
+        if match.url_name == 'team_detail':
+            keys.append(f"team-{match.kwargs['pk']}")
+        return keys
+
+
+class PublishedPagesMiddleware:
+    """
+    Sert les pages pré-rendues (league.publishing) aux visiteurs anonymes,
+    avant toute vue et sans accès à la base. WhiteNoise choisit la variante
+    .br ou .gz selon Accept-Encoding et gère ETag et Last-Modified.
+    Sans fichier publié, la requête suit le chemin normal.
+    Actif seulement si PUBLISH_STATIC_PAGES ; à placer juste après WhiteNoise.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PUBLISH_STATIC_PAGES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        # autorefresh : les pages régénérées sont prises en compte sans redémarrage
+        self.files = WhiteNoise(
+            None,
+            autorefresh=True,
+            max_age=settings.PUBLIC_CACHE_MAX_AGE,
+        )
+        self.files.add_files(str(settings.PUBLISH_ROOT), prefix='/')
+
+    def __call__(self, request):
+        static_file = self._find(request)
+        if static_file is not None:
+            return WhiteNoiseMiddleware.serve(static_file, request)
+        return self.get_response(request)
+
+    def _find(self, request):
+        if request.method not in ('GET', 'HEAD') or request.META.get('QUERY_STRING'):
+            return None
+        if PUBLISH_REQUEST_HEADER in request.META:
+            return None
+        cookies = request.COOKIES
+        if settings.SESSION_COOKIE_NAME in cookies or CookieStorage.cookie_name in cookies:
+            return None
+        path = request.path_info
+        if not path.endswith('/'):
+            return None
+        for name in ('index.html', 'index.json'):
+            static_file = self.files.find_file(path + name)
+            if static_file is not None:
+                return static_file
+        return None
+
+
+class MediaFilesMiddleware:
+    """
+    Sert les fichiers média (logos) avec WhiteNoise, sans serveur web séparé.
+    Les fichiers nommés par l'empreinte de leur contenu (league.storage)
+    ne changent jamais : Cache-Control « immutable » d'un an, les navigateurs
+    ne les redemandent plus. Les anciens noms gardent MEDIA_CACHE_MAX_AGE.
+    Actif seulement si SERVE_MEDIA ; à placer juste après WhiteNoise.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SERVE_MEDIA:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        # autorefresh : les logos envoyés après le démarrage sont trouvés
+        self.files = WhiteNoise(
+            None,
+            autorefresh=True,
+            max_age=settings.MEDIA_CACHE_MAX_AGE,
+            immutable_file_test=lambda path, url: is_hashed_name(url),
+        )
+        self.files.add_files(str(settings.MEDIA_ROOT), prefix=settings.MEDIA_URL)
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD') and request.path_info.startswith(settings.MEDIA_URL):
+            static_file = self.files.find_file(request.path_info)
+            if static_file is not None:
+                return WhiteNoiseMiddleware.serve(static_file, request)
+        return self.get_response(request)
+
+
+class ResponseOptimizationMiddleware:
+    """
+    Minifie le HTML et compresse HTML et JSON (brotli ou gzip)
+    selon Accept-Encoding. Les octets des pages publiques partagées
+    sont mis en cache pour ne pas recompresser à chaque requête.
+    Doit être placé avant PublicCacheMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        content_type = response.get('Content-Type', '').split(';')[0].strip()
+        if (
+            response.status_code != 200
+            or response.has_header('Content-Encoding')
+            or content_type not in COMPRESSIBLE_TYPES
+        ):
+            return response
+
+        if response.streaming:
+            return self._optimize_stream(request, response, content_type)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        shared = getattr(request, 'league_proxy_cacheable', False)
+        encoding = None
+        if len(response.content) >= settings.RESPONSE_COMPRESSION_MIN_LENGTH:
+            encoding = choose_encoding(
+                request.META.get('HTTP_ACCEPT_ENCODING', ''),
+                allow_brotli=shared,
+            )
+
+        response.content = optimize_content(
+            response.content,
+            response.charset,
+            is_html=content_type == 'text/html',
+            encoding=encoding,
+            shared=shared,
+        )
+        response['Content-Length'] = str(len(response.content))
+        if encoding:
+            response['Content-Encoding'] = encoding
+            # Un ETag fort ne correspond plus aux octets compressés
+            etag = response.get('ETag')
+            if etag and etag.startswith('"'):
+                response['ETag'] = 'W/' + etag
+        return response
+
+    def _optimize_stream(self, request, response, content_type):
+        """Réponse en flux (calendrier) : minifiée et compressée morceau par morceau."""
+        patch_vary_headers(response, ('Accept-Encoding',))
+        shared = getattr(request, 'league_proxy_cacheable', False)
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), allow_brotli=shared)
+        response.streaming_content = optimize_stream(
+            response.streaming_content,
+            response.charset,
+            is_html=content_type == 'text/html',
+            encoding=encoding,
+            shared=shared,
+        )
+        if encoding:
+            response['Content-Encoding'] = encoding
+            response.headers.pop('Content-Length', None)
+        return response
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, verbose_name='Tâche')),
+                ('kwargs', models.JSONField(blank=True, default=dict, verbose_name='Paramètres')),
+                ('dedup_key', models.CharField(db_index=True, max_length=40, verbose_name='Clé de dédoublonnage')),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('running', 'En cours'), ('done', 'Terminée'), ('failed', 'Échouée')], default='pending', max_length=10, verbose_name='Statut')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Tentatives')),
+                ('max_attempts', models.PositiveIntegerField(default=3, verbose_name='Tentatives max')),
+                ('run_after', models.DateTimeField(verbose_name='Exécuter après')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Début')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Fin')),
+                ('duration_ms', models.FloatField(blank=True, null=True, verbose_name='Durée (ms)')),
+                ('last_error', models.TextField(blank=True, verbose_name='Dernière erreur')),
+            ],
+            options={
+                'verbose_name': 'Tâche de fond',
+                'verbose_name_plural': 'Tâches de fond',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='league_job_queue_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:52
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def backfill_events(apps, schema_editor):
+    """Journal initial : un événement par résultat existant, à sa dernière modification."""
+    Result = apps.get_model('league', 'Result')
+    ResultEvent = apps.get_model('league', 'ResultEvent')
+    results = Result.objects.order_by('updated_at', 'pk').values_list(
+        'match_id', 'match__home_team_id', 'match__away_team_id',
+        'home_score', 'away_score', 'validated', 'validated_by_id', 'updated_at',
+    )
+    ResultEvent.objects.bulk_create(
+        [
+            ResultEvent(
+                match_id=match_id,
+                home_team_id=home_id,
+                away_team_id=away_id,
+                action='save',
+                home_score=home_score,
+                away_score=away_score,
+                validated=validated,
+                validated_by_id=validated_by_id,
+                created_at=updated_at,
+            )
+            for (match_id, home_id, away_id, home_score, away_score,
+                 validated, validated_by_id, updated_at) in results.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0002_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResultEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('match_id', models.BigIntegerField(db_index=True, verbose_name='Match')),
+                ('home_team_id', models.BigIntegerField(null=True, verbose_name='Équipe domicile')),
+                ('away_team_id', models.BigIntegerField(null=True, verbose_name='Équipe extérieur')),
+                ('action', models.CharField(choices=[('save', 'Enregistrement'), ('delete', 'Suppression')], max_length=10, verbose_name='Action')),
+                ('home_score', models.PositiveIntegerField(default=0, verbose_name='Score domicile')),
+                ('away_score', models.PositiveIntegerField(default=0, verbose_name='Score extérieur')),
+                ('validated', models.BooleanField(default=False, verbose_name='Validé')),
+                ('validated_by_id', models.IntegerField(blank=True, null=True, verbose_name='Validé par')),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name="Date de l'événement")),
+            ],
+            options={
+                'verbose_name': 'Événement de résultat',
+                'verbose_name_plural': 'Journal des résultats',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.RunPython(backfill_events, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0003_resultevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamRating',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.FloatField(default=1500, verbose_name='Elo')),
+                ('matches', models.PositiveIntegerField(default=0, verbose_name='Matchs comptés')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Dernière modification')),
+                ('team', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='rating', to='league.team', verbose_name='Équipe')),
+            ],
+            options={
+                'verbose_name': 'Classement Elo',
+                'verbose_name_plural': 'Classements Elo',
+                'ordering': ['-rating'],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:20
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0004_teamrating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('team', 'Équipe'), ('match', 'Match'), ('result', 'Résultat'), ('playoff', 'Match phase finale'), ('standing', 'Classement'), ('reset', 'Réinitialisation')], max_length=10, verbose_name='Type')),
+                ('object_id', models.BigIntegerField(blank=True, null=True, verbose_name='Objet')),
+                ('action', models.CharField(choices=[('save', 'Enregistrement'), ('delete', 'Suppression'), ('reset', 'Réinitialisation')], max_length=10, verbose_name='Action')),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Date de la modification')),
+            ],
+            options={
+                'verbose_name': 'Modification',
+                'verbose_name_plural': 'Journal des modifications',
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+"""
+Table du cache partagé (settings.CACHES, DatabaseCache) créée par migrate,
+pour que chaque déploiement l'ait sans étape supplémentaire.
+"""
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_table(apps, schema_editor):
+    # Sans effet si le cache n'est pas en base (Redis) ou si la table existe
+    call_command('createcachetable', database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0005_changelogentry'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_table, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-19 16:27
+
+from django.db import migrations, models
+
+
+def fail_duplicate_pending_jobs(apps, schema_editor):
+    """Tâches en attente en double (ajouts simultanés) : seule la plus ancienne reste."""
+    Job = apps.get_model('league', 'Job')
+    seen = set()
+    duplicates = []
+    for pk, key in Job.objects.filter(status='pending').order_by('pk').values_list('pk', 'dedup_key'):
+        if key in seen:
+            duplicates.append(pk)
+        seen.add(key)
+    Job.objects.filter(pk__in=duplicates).update(status='failed', last_error="Doublon d'une tâche en attente.")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0006_cache_table'),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_duplicate_pending_jobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='job',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'pending')), fields=('dedup_key',), name='league_job_pending_dedup'),
+        ),
+    ]
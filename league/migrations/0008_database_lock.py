@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-19 16:40
+
+from django.db import migrations, models
+
+# Verrous de league.locking.database_lock utilisés par l'application
+LOCK_NAMES = ['league-jobs', 'league-standings', 'league-ratings']
+
+
+def create_locks(apps, schema_editor):
+    """Lignes créées d'avance : le premier usage n'a pas à les insérer."""
+    DatabaseLock = apps.get_model('league', 'DatabaseLock')
+    DatabaseLock.objects.bulk_create([DatabaseLock(name=name) for name in LOCK_NAMES])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league', '0007_job_pending_dedup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DatabaseLock',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='Nom')),
+            ],
+            options={
+                'verbose_name': 'Verrou',
+                'verbose_name_plural': 'Verrous',
+            },
+        ),
+        migrations.RunPython(create_locks, migrations.RunPython.noop),
+    ]
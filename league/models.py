@@ -1,11 +1,13 @@
 """
 Modèles de données pour GOMA-Efootball League.
-Définit les tables : Team, Match, Result, Standing, AdminProfile, PlayoffMatch.
+Définit les tables : Team, Match, Result, ResultEvent, Standing, TeamRating,
+AdminProfile, PlayoffMatch, Job.
 """
 
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
+from django.utils import timezone
 
 
 class AdminProfile(models.Model):
@@ -205,6 +207,65 @@ class Result(models.Model):
         return None
 
 
+class ResultEvent(models.Model):
+    """
+    Modèle Événement de résultat (journal en ajout seul).
+    Chaque enregistrement, correction ou suppression d'un résultat ajoute
+    une ligne avec l'état complet du résultat : le classement à n'importe
+    quelle date se reconstruit en rejouant le journal (voir league.replay).
+    Les identifiants sont copiés sans clé étrangère pour survivre aux suppressions.
+    """
+    ACTION_CHOICES = [
+        ('save', 'Enregistrement'),
+        ('delete', 'Suppression'),
+    ]
+
+    match_id = models.BigIntegerField(db_index=True, verbose_name="Match")
+    home_team_id = models.BigIntegerField(null=True, verbose_name="Équipe domicile")
+    away_team_id = models.BigIntegerField(null=True, verbose_name="Équipe extérieur")
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES, verbose_name="Action")
+    home_score = models.PositiveIntegerField(default=0, verbose_name="Score domicile")
+    away_score = models.PositiveIntegerField(default=0, verbose_name="Score extérieur")
+    validated = models.BooleanField(default=False, verbose_name="Validé")
+    validated_by_id = models.IntegerField(null=True, blank=True, verbose_name="Validé par")
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        db_index=True,
+        verbose_name="Date de l'événement"
+    )
+
+    class Meta:
+        verbose_name = "Événement de résultat"
+        verbose_name_plural = "Journal des résultats"
+        ordering = ['id']
+
+    def __str__(self):
+        return f"#{self.pk} {self.get_action_display()} match {self.match_id} : {self.home_score}-{self.away_score}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Le journal des résultats est en ajout seul.")
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_result(cls, result, action='save'):
+        """Événement décrivant l'état actuel d'un résultat."""
+        try:
+            match = result.match
+        except Match.DoesNotExist:  # supprimé en cascade avec son match
+            match = None
+        return cls(
+            match_id=result.match_id,
+            home_team_id=match.home_team_id if match else None,
+            away_team_id=match.away_team_id if match else None,
+            action=action,
+            home_score=result.home_score,
+            away_score=result.away_score,
+            validated=result.validated and action == 'save',
+            validated_by_id=result.validated_by_id,
+        )
+
+
 class Standing(models.Model):
     """
     Modèle Classement.
@@ -287,6 +348,34 @@ class Standing(models.Model):
         self.save()
 
 
+class TeamRating(models.Model):
+    """
+    Modèle Classement Elo.
+    Niveau de chaque équipe tenant compte de la force des adversaires,
+    mis à jour à chaque résultat validé (voir league.ratings).
+    """
+    team = models.OneToOneField(
+        Team,
+        on_delete=models.CASCADE,
+        related_name='rating',
+        verbose_name="Équipe"
+    )
+    rating = models.FloatField(default=1500, verbose_name="Elo")
+    matches = models.PositiveIntegerField(default=0, verbose_name="Matchs comptés")
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Dernière modification"
+    )
+
+    class Meta:
+        verbose_name = "Classement Elo"
+        verbose_name_plural = "Classements Elo"
+        ordering = ['-rating']
+
+    def __str__(self):
+        return f"{self.team} - {self.rating:.0f}"
+
+
 class PlayoffMatch(models.Model):
     """
     Modèle Match de Phase Finale.
@@ -376,4 +465,117 @@ class PlayoffMatch(models.Model):
             return self.home_team
         elif self.away_score > self.home_score:
             return self.away_team
-        return None
\ No newline at end of file
+        return None
+
+
+class Job(models.Model):
+    """
+    Modèle Tâche de fond.
+    File d'attente en base des traitements lourds (recalcul du classement,
+    génération du calendrier, logos, publication), exécutés par run_worker.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'En attente'),
+        ('running', 'En cours'),
+        ('done', 'Terminée'),
+        ('failed', 'Échouée'),
+    ]
+
+    name = models.CharField(max_length=50, verbose_name="Tâche")
+    kwargs = models.JSONField(default=dict, blank=True, verbose_name="Paramètres")
+    dedup_key = models.CharField(
+        max_length=40,
+        db_index=True,
+        verbose_name="Clé de dédoublonnage"
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default='pending',
+        verbose_name="Statut"
+    )
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Tentatives")
+    max_attempts = models.PositiveIntegerField(default=3, verbose_name="Tentatives max")
+    run_after = models.DateTimeField(verbose_name="Exécuter après")
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Date de création"
+    )
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Début")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Fin")
+    duration_ms = models.FloatField(null=True, blank=True, verbose_name="Durée (ms)")
+    last_error = models.TextField(blank=True, verbose_name="Dernière erreur")
+
+    class Meta:
+        verbose_name = "Tâche de fond"
+        verbose_name_plural = "Tâches de fond"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='league_job_queue_idx'),
+        ]
+        constraints = [
+            # Une seule tâche en attente par clé (dédoublonnage de jobs.enqueue)
+            models.UniqueConstraint(
+                fields=['dedup_key'],
+                condition=models.Q(status='pending'),
+                name='league_job_pending_dedup',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.get_status_display()})"
+
+
+class DatabaseLock(models.Model):
+    """
+    Modèle Verrou nommé.
+    Une ligne par verrou de league.locking.database_lock, verrouillée par
+    SELECT ... FOR UPDATE sur les bases sans verrou consultatif (MySQL).
+    """
+    name = models.CharField(max_length=50, primary_key=True, verbose_name="Nom")
+
+    class Meta:
+        verbose_name = "Verrou"
+        verbose_name_plural = "Verrous"
+
+    def __str__(self):
+        return self.name
+
+
+class ChangeLogEntry(models.Model):
+    """
+    Modèle Journal des modifications (synchronisation différentielle).
+    Une ligne par objet modifié ou supprimé ; l'identifiant, croissant,
+    sert de version aux clients de api/changes/ (voir league.changes).
+    Une ligne 'reset' signale une modification en masse : resynchronisation complète.
+    """
+    KIND_CHOICES = [
+        ('team', 'Équipe'),
+        ('match', 'Match'),
+        ('result', 'Résultat'),
+        ('playoff', 'Match phase finale'),
+        ('standing', 'Classement'),
+        ('reset', 'Réinitialisation'),
+    ]
+    ACTION_CHOICES = [
+        ('save', 'Enregistrement'),
+        ('delete', 'Suppression'),
+        ('reset', 'Réinitialisation'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, verbose_name="Type")
+    object_id = models.BigIntegerField(null=True, blank=True, verbose_name="Objet")
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES, verbose_name="Action")
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        db_index=True,
+        verbose_name="Date de la modification"
+    )
+
+    class Meta:
+        verbose_name = "Modification"
+        verbose_name_plural = "Journal des modifications"
+        ordering = ['id']
+
+    def __str__(self):
+        return f"#{self.pk} {self.get_action_display()} {self.kind} {self.object_id or ''}".rstrip()
@@ -0,0 +1,212 @@
+"""
+Pré-rendu statique du site public de GOMA-Efootball League.
+Les pages publiques et l'API JSON sont rendues dans PUBLISH_ROOT
+(avec variantes .gz et .br) et servies par WhiteNoise aux visiteurs
+anonymes (league.middleware.PublishedPagesMiddleware), sans vue ni base.
+Après chaque modification validée, seules les pages concernées sont
+régénérées, jamais dans la requête qui a fait la modification : par la
+file de tâches, ou sans elle par un thread de publication.
+"""
+
+import gzip
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import connections, transaction
+from django.http import Http404
+from django.test import RequestFactory
+from django.urls import Resolver404, resolve, reverse
+
+from .compression import brotli, minify_html
+from .jobs import enqueue
+from .models import Match, PlayoffMatch, Result, Team
+
+# Pages dépendant des résultats et du calendrier
+LEAGUE_PAGES = [
+    'league:home',
+    'league:standings',
+    'league:ratings',
+    'league:match_list',
+    'league:result_list',
+    'league:playoffs',
+    'league:api_standings',
+    'league:api_ratings',
+    'league:api_goals_stats',
+    'league:api_snapshot',
+]
+# Pages ne dépendant que des équipes
+TEAM_PAGES = ['league:team_list', 'league:rules']
+
+# En-tête des requêtes de publication : jamais servies depuis les fichiers
+# publiés ni la réplique, pour rendre l'état qui vient d'être validé
+PUBLISH_REQUEST_HEADER = 'HTTP_X_LEAGUE_PUBLISH'
+
+logger = logging.getLogger(__name__)
+
+
+def published_path(url):
+    """Fichier publié d'une URL : index.html, ou index.json pour l'API."""
+    name = 'index.json' if url.startswith('/api/') else 'index.html'
+    return Path(settings.PUBLISH_ROOT) / url.lstrip('/') / name
+
+
+def league_pages():
+    """URL des pages dépendant des résultats et du classement."""
+    return [reverse(name) for name in LEAGUE_PAGES]
+
+
+def team_pages(team_ids):
+    """URL des fiches équipe (position, points et rang Elo y sont affichés)."""
+    return [reverse('league:team_detail', args=[pk]) for pk in team_ids if pk]
+
+
+def all_pages():
+    """Toutes les URL publiées : pages de la ligue, équipes et fiches équipe."""
+    urls = league_pages() + [reverse(name) for name in TEAM_PAGES]
+    return urls + team_pages(Team.objects.values_list('pk', flat=True))
+
+
+def pages_for(instance):
+    """URL à régénérer après la modification d'un objet."""
+    team_ids = []
+    urls = league_pages()
+    if isinstance(instance, Team):
+        urls += [reverse(name) for name in TEAM_PAGES]
+        team_ids = [instance.pk]
+    elif isinstance(instance, Match):
+        team_ids = [instance.home_team_id, instance.away_team_id]
+    elif isinstance(instance, Result):
+        try:
+            match = instance.match
+        except Match.DoesNotExist:  # supprimé en cascade avec son match
+            match = None
+        if match is not None:
+            team_ids = [match.home_team_id, match.away_team_id]
+    elif isinstance(instance, PlayoffMatch):
+        urls = [reverse('league:playoffs'), reverse('league:home')]
+    # Les autres équipes dont la position ou le rang Elo change sont
+    # ajoutées par le recalcul du classement et des Elo
+    return urls + team_pages(team_ids)
+
+
+def _write_atomic(path, content):
+    """Écrit via un fichier temporaire : un lecteur ne voit jamais de fichier partiel."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    with os.fdopen(fd, 'wb') as handle:
+        handle.write(content)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+
+
+def _remove(path):
+    for candidate in (path, path.with_name(path.name + '.gz'), path.with_name(path.name + '.br')):
+        candidate.unlink(missing_ok=True)
+
+
+def _render(factory, url):
+    """
+    Appelle directement la vue de l'URL comme un visiteur anonyme, sans
+    middleware : ni fichiers publiés ni réplique, l'état validé est rendu.
+    Retourne le contenu minifié, ou None si la page n'existe plus.
+    """
+    try:
+        match = resolve(url)
+    except Resolver404:
+        return None
+    request = factory.get(url, **{PUBLISH_REQUEST_HEADER: '1'})
+    request.user = AnonymousUser()
+    request.resolver_match = match
+    try:
+        response = match.func(request, *match.args, **match.kwargs)
+    except Http404:
+        return None
+    if response.status_code == 404:
+        return None
+    if response.status_code != 200:
+        raise ValueError(f"{url} : statut {response.status_code}")
+
+    if response.streaming:
+        content = b''.join(response.streaming_content)
+    else:
+        content = response.content
+    if response.get('Content-Type', '').startswith('text/html'):
+        content = minify_html(content.decode(response.charset)).encode(response.charset)
+    return content
+
+
+def publish(urls):
+    """
+    Rend chaque URL comme un visiteur anonyme et écrit le fichier publié
+    avec ses variantes compressées. Une page disparue (404) est supprimée,
+    une page en erreur garde sa version précédente.
+    Retourne le nombre de pages écrites.
+    """
+    factory = RequestFactory(HTTP_HOST=settings.PUBLISH_HOST)
+    written = 0
+    for url in dict.fromkeys(urls):
+        path = published_path(url)
+        try:
+            content = _render(factory, url)
+        except Exception:
+            logger.exception("Publication de %s échouée", url)
+            continue
+        if content is None:
+            _remove(path)
+            continue
+
+        _write_atomic(path, content)
+        _write_atomic(path.with_name(path.name + '.gz'), gzip.compress(content, mtime=0))
+        if brotli is not None:
+            _write_atomic(path.with_name(path.name + '.br'), brotli.compress(content))
+        written += 1
+    return written
+
+
+# Pages en attente de régénération dans la transaction en cours
+_pending = threading.local()
+
+
+def schedule_publish(urls):
+    """
+    Regroupe les pages à régénérer jusqu'à la fin de la transaction :
+    une génération de calendrier (des centaines de matchs) ne publie qu'une fois.
+    """
+    if getattr(_pending, 'urls', None) is None:
+        _pending.urls = {}
+    _pending.urls.update(dict.fromkeys(urls))
+    # Le premier rappel exécuté publie tout, les suivants ne trouvent plus rien
+    transaction.on_commit(_flush)
+
+
+def _flush():
+    urls = getattr(_pending, 'urls', None)
+    _pending.urls = {}
+    if not urls:
+        return
+    if settings.LEAGUE_ASYNC_JOBS:
+        enqueue('publish_pages', urls=list(urls))
+    else:
+        # Sans worker : publier hors de la requête, qui répond sans attendre.
+        # Thread non « daemon » : une commande attend la fin de la publication
+        threading.Thread(target=_publish_in_background, args=(list(urls),), name='league-publish').start()
+
+
+# Une publication à la fois : une page rendue plus tôt n'écrase jamais un rendu plus récent
+_publish_lock = threading.Lock()
+
+
+def _publish_in_background(urls):
+    try:
+        with _publish_lock:
+            publish(urls)
+    except Exception:
+        logger.exception("Publication en arrière-plan échouée")
+    finally:
+        # Connexions propres à ce thread
+        connections.close_all()
@@ -0,0 +1,174 @@
+"""
+Classement Elo des équipes de GOMA-Efootball League.
+Elo avec multiplicateur d'écart de buts (méthode du World Football Elo) :
+battre une équipe forte rapporte plus que battre une équipe faible.
+Un nouveau résultat validé met à jour deux lignes (O(1)) ;
+une correction ou une suppression relance la reconstruction complète,
+qui rejoue tous les résultats dans l'ordre chronologique en un seul passage.
+"""
+
+import bisect
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .cache import bump_data_version
+from .locking import database_lock
+from .models import Result, Team, TeamRating
+from .publishing import league_pages, schedule_publish, team_pages
+
+
+def goal_multiplier(goal_difference):
+    """Multiplicateur selon l'écart de buts : 1, 1.5, puis (11 + écart) / 8."""
+    goal_difference = abs(goal_difference)
+    if goal_difference <= 1:
+        return 1.0
+    if goal_difference == 2:
+        return 1.5
+    return (11 + goal_difference) / 8
+
+
+def expected_score(rating, opponent_rating):
+    """Probabilité de victoire attendue (un nul compte pour 0,5)."""
+    return 1 / (1 + 10 ** ((opponent_rating - rating) / 400))
+
+
+def rating_change(home_rating, away_rating, home_score, away_score):
+    """Points Elo gagnés par l'équipe à domicile (perdus par l'équipe à l'extérieur)."""
+    if home_score > away_score:
+        actual = 1.0
+    elif home_score == away_score:
+        actual = 0.5
+    else:
+        actual = 0.0
+    expected = expected_score(home_rating + settings.ELO_HOME_ADVANTAGE, away_rating)
+    return settings.ELO_K * goal_multiplier(home_score - away_score) * (actual - expected)
+
+
+def compute_ratings(results):
+    """
+    Replie des résultats (home_id, away_id, home_score, away_score) triés
+    chronologiquement en {team_id: [elo, matchs]}.
+    """
+    initial = settings.ELO_INITIAL_RATING
+    ratings = {}
+    for home_id, away_id, home_score, away_score in results:
+        home = ratings.setdefault(home_id, [initial, 0])
+        away = ratings.setdefault(away_id, [initial, 0])
+        delta = rating_change(home[0], away[0], home_score, away_score)
+        home[0] += delta
+        away[0] -= delta
+        home[1] += 1
+        away[1] += 1
+    return ratings
+
+
+def rating_ranks():
+    """
+    {team_id: (rang, elo, matchs)} tel qu'affiché sur les fiches équipe :
+    rang = nombre d'équipes actives au-dessus + 1.
+    """
+    rows = list(TeamRating.objects.values_list('team_id', 'rating', 'matches', 'team__is_active'))
+    active = sorted(rating for _team_id, rating, _matches, is_active in rows if is_active)
+    return {
+        team_id: (len(active) - bisect.bisect_right(active, rating) + 1, rating, matches)
+        for team_id, rating, matches, _is_active in rows
+    }
+
+
+def _publish_changed_teams(before):
+    """Fiches des équipes dont l'Elo ou le rang a changé depuis `before`."""
+    after = rating_ranks()
+    schedule_publish(team_pages(
+        team_id for team_id, state in after.items() if before.get(team_id) != state
+    ))
+
+
+def apply_result(result):
+    """Mise à jour O(1) : les deux équipes d'un nouveau résultat validé."""
+    match = result.match
+    with transaction.atomic(), database_lock('league-ratings', TeamRating):
+        # Pages publiées : le rang Elo d'autres équipes peut aussi changer
+        before = rating_ranks() if settings.PUBLISH_STATIC_PAGES else None
+        ratings = {}
+        for team_id in (match.home_team_id, match.away_team_id):
+            ratings[team_id], _ = TeamRating.objects.get_or_create(
+                team_id=team_id,
+                defaults={'rating': settings.ELO_INITIAL_RATING},
+            )
+        home, away = ratings[match.home_team_id], ratings[match.away_team_id]
+        delta = rating_change(home.rating, away.rating, result.home_score, result.away_score)
+        # update() ne touche pas updated_at (auto_now) : date fixée ici
+        now = timezone.now()
+        TeamRating.objects.filter(pk=home.pk).update(
+            rating=F('rating') + delta, matches=F('matches') + 1, updated_at=now
+        )
+        TeamRating.objects.filter(pk=away.pk).update(
+            rating=F('rating') - delta, matches=F('matches') + 1, updated_at=now
+        )
+        if before is not None:
+            _publish_changed_teams(before)
+
+
+def rebuild_ratings():
+    """
+    Reconstruit tous les Elo en rejouant les résultats validés dans l'ordre
+    des matchs (date du match, sinon date d'enregistrement), en flux.
+    Retourne le nombre d'équipes classées.
+    """
+    with transaction.atomic(), database_lock('league-ratings', TeamRating):
+        # Lecture après le verrou : deux reconstructions simultanées ne
+        # peuvent pas enregistrer des Elo calculés sans le dernier résultat
+        results = (
+            Result.objects.filter(validated=True)
+            .annotate(played_at=Coalesce('match__date_played', 'created_at'))
+            .order_by('played_at', 'pk')
+            .values_list('match__home_team_id', 'match__away_team_id', 'home_score', 'away_score')
+            .iterator(chunk_size=2000)
+        )
+        ratings = compute_ratings(results)
+        before = rating_ranks() if settings.PUBLISH_STATIC_PAGES else None
+
+        existing = {rating.team_id: rating for rating in TeamRating.objects.all()}
+        now = timezone.now()
+        to_update = []
+        to_create = []
+        for team_id in Team.objects.values_list('pk', flat=True):
+            elo, matches = ratings.get(team_id, (settings.ELO_INITIAL_RATING, 0))
+            rating = existing.get(team_id)
+            if rating is None:
+                to_create.append(TeamRating(team_id=team_id, rating=elo, matches=matches))
+            elif rating.rating != elo or rating.matches != matches:
+                rating.rating = elo
+                rating.matches = matches
+                rating.updated_at = now
+                to_update.append(rating)
+        TeamRating.objects.bulk_create(to_create)
+        TeamRating.objects.bulk_update(to_update, ['rating', 'matches', 'updated_at'], batch_size=500)
+        transaction.on_commit(bump_data_version)
+        if before is not None:
+            schedule_publish(league_pages())
+            _publish_changed_teams(before)
+    return len(ratings)
+
+
+def ratings_table():
+    """Équipes actives par Elo décroissant : liste de dictionnaires avec le rang."""
+    rows = (
+        TeamRating.objects.filter(team__is_active=True)
+        .order_by('-rating', 'team__name')
+        .values('team_id', 'team__name', 'rating', 'matches')
+    )
+    return [
+        {
+            'rank': rank,
+            'team_id': row['team_id'],
+            'team': row['team__name'],
+            'rating': round(row['rating'], 1),
+            'matches': row['matches'],
+        }
+        for rank, row in enumerate(rows, 1)
+    ]
@@ -0,0 +1,56 @@
+"""
+Rejeu du journal des résultats pour GOMA-Efootball League.
+Reconstruit le classement à n'importe quelle date ou à n'importe quel
+événement en repliant le journal ResultEvent en un seul passage :
+chaque événement remplace l'état du résultat de son match.
+"""
+
+from .models import ResultEvent, Team
+from .tables import build_table
+
+EVENT_FIELDS = (
+    'id', 'match_id', 'home_team_id', 'away_team_id',
+    'action', 'home_score', 'away_score', 'validated',
+)
+CHUNK_SIZE = 5000
+
+
+def fold_events(events):
+    """
+    Replie des événements (tuples dans l'ordre de EVENT_FIELDS, triés par id)
+    en l'état final des résultats validés.
+    Retourne ({match_id: (home_id, away_id, home_score, away_score)}, dernier id, nombre).
+    """
+    state = {}
+    last_id = None
+    count = 0
+    for event_id, match_id, home_id, away_id, action, home_score, away_score, validated in events:
+        count += 1
+        last_id = event_id
+        if action == 'save' and validated:
+            state[match_id] = (home_id, away_id, home_score, away_score)
+        else:
+            # Suppression ou résultat dévalidé : le match ne compte plus
+            state.pop(match_id, None)
+    return state, last_id, count
+
+
+def iter_events(at=None, event_id=None):
+    """Parcourt le journal en flux (par blocs), jusqu'à une date ou un événement inclus."""
+    events = ResultEvent.objects.all()
+    if at is not None:
+        events = events.filter(created_at__lte=at)
+    if event_id is not None:
+        events = events.filter(pk__lte=event_id)
+    return events.order_by('id').values_list(*EVENT_FIELDS).iterator(chunk_size=CHUNK_SIZE)
+
+
+def standings_as_of(at=None, event_id=None):
+    """
+    Classement des équipes actives tel qu'il était à la date `at`
+    ou juste après l'événement `event_id` (état actuel sans paramètre).
+    Retourne (classement, dernier événement rejoué, nombre d'événements).
+    """
+    state, last_id, count = fold_events(iter_events(at=at, event_id=event_id))
+    teams = Team.objects.filter(is_active=True).order_by('name').values_list('id', 'name')
+    return build_table(teams, state.values()), last_id, count
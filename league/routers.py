@@ -0,0 +1,69 @@
+"""
+Routeur de base de données pour GOMA-Efootball League.
+Envoie les lectures des pages publiques et de l'API vers la réplique,
+tout le reste (écritures, admin, sessions) vers la base principale.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+PRIMARY_DB = 'default'
+REPLICA_DB = 'replica'
+
+
+@dataclass
+class RoutingState:
+    """État de routage de la requête en cours."""
+    use_replica: bool = False
+    wrote: bool = False
+
+
+routing_state = ContextVar('league_routing_state', default=None)
+
+
+@contextmanager
+def primary_reads():
+    """
+    Lectures sur la base principale dans ce bloc, même pendant une page
+    publique : pour les valeurs enregistrées sous la version courante
+    des données, qu'une réplique en retard ne doit pas fournir.
+    """
+    token = routing_state.set(RoutingState())
+    try:
+        yield
+    finally:
+        routing_state.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Les lectures des modèles de la ligue vont vers la réplique uniquement
+    si la requête en cours l'autorise et n'a encore rien écrit
+    (lecture de ses propres écritures).
+    """
+
+    def db_for_read(self, model, **hints):
+        state = routing_state.get()
+        if (
+            state is not None
+            and state.use_replica
+            and not state.wrote
+            and model._meta.app_label == 'league'
+        ):
+            return REPLICA_DB
+        return PRIMARY_DB
+
+    def db_for_write(self, model, **hints):
+        state = routing_state.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Les deux alias pointent vers les mêmes données
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # La réplique reçoit son schéma par réplication, jamais par migrate
+        return db == PRIMARY_DB
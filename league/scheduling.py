@@ -0,0 +1,220 @@
+"""
+Programmation des dates de match pour GOMA-Efootball League.
+Attribue à chaque match non joué un créneau concret (Match.date_played)
+à partir des soirées disponibles et des heures de créneau, en respectant :
+une équipe joue au plus une fois par soirée, un repos minimum entre deux
+matchs, et l'alternance domicile/extérieur (série maximale au même lieu).
+Algorithme glouton soirée par soirée, dans l'ordre des journées :
+quelques secondes pour plusieurs milliers de matchs.
+"""
+
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from operator import itemgetter
+
+from django.db import transaction
+from django.utils import timezone
+
+from .changes import notify_bulk_change
+from .models import Match
+from .publishing import league_pages
+
+PHASE_ORDER = {'aller': 0, 'retour': 1}
+WEEKDAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+
+
+class SchedulingError(Exception):
+    """Le calendrier ne tient pas dans les soirées disponibles."""
+
+
+def evenings(start, weekdays=None, end=None):
+    """
+    Soirées disponibles à partir de `start` (jours de semaine 0 = lundi), jusqu'à `end` inclus.
+    Sans aucun jour valide, lève ValueError tout de suite : sans `end`,
+    la recherche de la prochaine soirée ne finirait jamais.
+    """
+    if weekdays is not None:
+        weekdays = set(weekdays) & set(range(7))
+        if not weekdays:
+            raise ValueError("Aucun jour de la semaine disponible pour programmer les matchs.")
+    return _evenings(start, weekdays, end)
+
+
+def _evenings(start, weekdays, end):
+    day = start
+    while end is None or day <= end:
+        if weekdays is None or day.weekday() in weekdays:
+            yield day
+        day += timedelta(days=1)
+
+
+class _TeamState:
+    """Dernière soirée jouée et série en cours au même lieu ('H' ou 'A')."""
+    __slots__ = ('last_day', 'venue', 'streak')
+
+    def __init__(self):
+        self.last_day = None
+        self.venue = None
+        self.streak = 0
+
+    def rested(self, day, min_rest):
+        return self.last_day is None or (day - self.last_day).days > min_rest
+
+    def streak_after(self, venue):
+        return self.streak + 1 if venue == self.venue else 1
+
+    def play(self, day, venue):
+        self.streak = self.streak_after(venue)
+        self.venue = venue
+        self.last_day = day
+
+
+def plan_schedule(fixtures, days, slot_times, min_rest_days=0, max_venue_streak=2, kept=()):
+    """
+    Calcule les créneaux sans écrire en base.
+    fixtures : liste de (match_id, home_id, away_id), dans l'ordre souhaité ;
+    days : itérable de dates ; slot_times : heures des créneaux d'une soirée ;
+    kept : matchs déjà programmés conservés, (date, home_id, away_id) : ils occupent
+    leurs équipes ce soir-là et comptent pour le repos et les séries au même lieu.
+    Retourne ({match_id: (date, heure)}, nombre de séries dépassées).
+    La série domicile/extérieur est d'abord respectée strictement, puis relâchée
+    pour remplir les créneaux restants : le calcul progresse toujours.
+    """
+    if not slot_times:
+        raise SchedulingError("Aucun créneau par soirée.")
+    kept = sorted(kept, key=itemgetter(0))
+    busy = {}
+    kept_days = {}
+    for kept_day, home_id, away_id in kept:
+        busy.setdefault(kept_day, set()).update((home_id, away_id))
+        for team_id in (home_id, away_id):
+            kept_days.setdefault(team_id, []).append(kept_day)
+    next_kept = 0
+    states = {}
+    pending = list(fixtures)
+    assignment = {}
+    streak_violations = 0
+    slots = len(slot_times)
+
+    def state(team_id):
+        team_state = states.get(team_id)
+        if team_state is None:
+            team_state = states[team_id] = _TeamState()
+        return team_state
+
+    def rested(team_id, day):
+        if not state(team_id).rested(day, min_rest_days):
+            return False
+        # Repos aussi avant le prochain match conservé de l'équipe
+        team_days = kept_days.get(team_id)
+        if not min_rest_days or not team_days:
+            return True
+        index = bisect_right(team_days, day)
+        return index == len(team_days) or (team_days[index] - day).days > min_rest_days
+
+    for day in days:
+        if not pending:
+            break
+        # Matchs conservés des soirées précédentes, dans l'ordre chronologique
+        while next_kept < len(kept) and kept[next_kept][0] < day:
+            kept_day, home_id, away_id = kept[next_kept]
+            state(home_id).play(kept_day, 'H')
+            state(away_id).play(kept_day, 'A')
+            next_kept += 1
+        playing = set(busy.get(day, ()))
+        chosen = []
+
+        for strict in (True, False):
+            if len(chosen) >= slots:
+                break
+            remaining = []
+            for index, fixture in enumerate(pending):
+                if len(chosen) >= slots:
+                    remaining.extend(pending[index:])
+                    break
+                _match_id, home_id, away_id = fixture
+                home, away = state(home_id), state(away_id)
+                available = (
+                    home_id not in playing and away_id not in playing
+                    and rested(home_id, day) and rested(away_id, day)
+                )
+                if available and strict and max_venue_streak and (
+                    home.streak_after('H') > max_venue_streak
+                    or away.streak_after('A') > max_venue_streak
+                ):
+                    available = False
+                if not available:
+                    remaining.append(fixture)
+                    continue
+                if max_venue_streak and (
+                    home.streak_after('H') > max_venue_streak
+                    or away.streak_after('A') > max_venue_streak
+                ):
+                    streak_violations += 1
+                chosen.append(fixture)
+                playing.update((home_id, away_id))
+            pending = remaining
+
+        for slot, (match_id, home_id, away_id) in enumerate(chosen):
+            assignment[match_id] = (day, slot_times[slot])
+            state(home_id).play(day, 'H')
+            state(away_id).play(day, 'A')
+
+    if pending:
+        raise SchedulingError(
+            f"{len(pending)} match(s) sans créneau : ajoutez des soirées ou des créneaux."
+        )
+    return assignment, streak_violations
+
+
+def schedule_matches(start, slot_times, weekdays=None, end=None, min_rest_days=0,
+                     max_venue_streak=2, reschedule=False, dry_run=False):
+    """
+    Programme les matchs non joués et écrit Match.date_played avec bulk_update.
+    Sans `reschedule`, les matchs déjà datés gardent leur date et occupent leurs équipes.
+    Retourne un dictionnaire de statistiques.
+    """
+    # Un match avec un résultat (validé ou déclaré) est joué, même si is_played n'est pas coché
+    matches = Match.objects.filter(is_played=False, result__isnull=True)
+    if not reschedule:
+        matches = matches.filter(date_played__isnull=True)
+    matches = list(matches.only('id', 'home_team_id', 'away_team_id', 'matchday', 'phase'))
+    matches.sort(key=lambda m: (PHASE_ORDER.get(m.phase, 0), m.matchday, m.pk))
+
+    # Matchs conservés : occupent leurs équipes, comptent pour le repos et les séries
+    kept = [
+        (timezone.localtime(date_played).date(), home_id, away_id)
+        for date_played, home_id, away_id in Match.objects.exclude(
+            pk__in=[m.pk for m in matches]
+        ).filter(date_played__isnull=False).values_list('date_played', 'home_team_id', 'away_team_id')
+    ]
+
+    fixtures = [(m.pk, m.home_team_id, m.away_team_id) for m in matches]
+    assignment, violations = plan_schedule(
+        fixtures,
+        evenings(start, weekdays, end),
+        slot_times,
+        min_rest_days=min_rest_days,
+        max_venue_streak=max_venue_streak,
+        kept=kept,
+    )
+
+    for match in matches:
+        day, slot_time = assignment[match.pk]
+        match.date_played = timezone.make_aware(datetime.combine(day, slot_time))
+
+    if not dry_run and matches:
+        with transaction.atomic():
+            # bulk_update ne déclenche pas les signals : invalidation faite ici
+            Match.objects.bulk_update(matches, ['date_played'], batch_size=500)
+            notify_bulk_change(Match, [match.pk for match in matches], league_pages())
+
+    dates = [match.date_played for match in matches]
+    return {
+        'scheduled': len(matches),
+        'evenings': len({date.date() for date in dates}),
+        'first': min(dates) if dates else None,
+        'last': max(dates) if dates else None,
+        'streak_violations': violations,
+    }
+
@@ -0,0 +1,129 @@
+"""
+Recherche rapide d'équipes pour GOMA-Efootball League.
+Index en mémoire des préfixes normalisés (minuscules, sans accents)
+des champs name, player_name et gamer_pseudo, reconstruit après
+toute modification d'une équipe (voir league.signals).
+Chaque processus garde son index ; seule la version est commune, dans
+le cache par défaut, qui doit donc être partagé (settings.CACHES) pour
+qu'une équipe créée dans un worker apparaisse dans les autres.
+"""
+
+import bisect
+import re
+import threading
+import unicodedata
+
+from .cache import bump_version, get_version
+from .models import Team
+
+TEAMS_VERSION_KEY = 'league:teams_version'
+SEARCH_FIELDS = ('name', 'player_name', 'gamer_pseudo')
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+_WORD_SPLIT = re.compile(r'[^0-9a-z]+')
+
+
+def normalize(text):
+    """Minuscules, sans accents, ponctuation remplacée par des espaces."""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(_WORD_SPLIT.split(stripped.casefold())).strip()
+
+
+def bump_teams_version():
+    """Invalide l'index de recherche de tous les processus partageant le cache."""
+    bump_version(TEAMS_VERSION_KEY)
+
+
+class TeamSearchIndex:
+    """
+    Liste triée de (clé normalisée, rang du champ, team_id) :
+    une recherche par préfixe est une dichotomie suivie d'un parcours
+    des seules clés correspondantes.
+    """
+
+    def __init__(self, teams):
+        self.teams = {}
+        self.sort_names = {}
+        entries = []
+        for team in teams:
+            self.teams[team['id']] = team
+            self.sort_names[team['id']] = normalize(team['name'])
+            for rank, field in enumerate(SEARCH_FIELDS):
+                value = normalize(team[field])
+                if not value:
+                    continue
+                # Valeur complète et chaque mot : "fc goma" trouvé par "fc" ou "goma"
+                keys = {value, *value.split()}
+                for key in keys:
+                    entries.append((key, rank, team['id']))
+        entries.sort()
+        self.keys = [entry[0] for entry in entries]
+        self.entries = entries
+
+    def search(self, query, limit=DEFAULT_LIMIT, active_only=True):
+        """Retourne les équipes dont un champ commence par la requête."""
+        query = normalize(query)
+        if not query:
+            return []
+        words = query.split()
+
+        # Meilleur rang de champ par équipe (le nom avant le pseudo)
+        best = {}
+        for key, rank, team_id in self._prefixed(query):
+            if rank < best.get(team_id, len(SEARCH_FIELDS)):
+                best[team_id] = rank
+
+        # Requête de plusieurs mots ne correspondant à aucune valeur complète
+        if not best and len(words) > 1:
+            for team_id in self._search_words(words):
+                best[team_id] = len(SEARCH_FIELDS)
+
+        matches = [
+            self.teams[team_id] for team_id in best
+            if not active_only or self.teams[team_id]['is_active']
+        ]
+        matches.sort(key=lambda team: (best[team['id']], self.sort_names[team['id']]))
+        return matches[:limit]
+
+    def _prefixed(self, prefix):
+        """Parcourt les entrées dont la clé commence par le préfixe."""
+        for i in range(bisect.bisect_left(self.keys, prefix), len(self.entries)):
+            entry = self.entries[i]
+            if not entry[0].startswith(prefix):
+                break
+            yield entry
+
+    def _search_words(self, words):
+        """Équipes dont chaque mot de la requête préfixe un mot indexé."""
+        candidates = None
+        for word in words:
+            found = {team_id for _key, _rank, team_id in self._prefixed(word)}
+            candidates = found if candidates is None else candidates & found
+            if not candidates:
+                return set()
+        return candidates
+
+
+_index = None
+_index_version = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Index du processus, reconstruit si une équipe a changé."""
+    global _index, _index_version
+    version = get_version(TEAMS_VERSION_KEY)
+    if _index is None or _index_version != version:
+        with _index_lock:
+            if _index is None or _index_version != version:
+                teams = Team.objects.values('id', 'is_active', *SEARCH_FIELDS)
+                _index = TeamSearchIndex(teams)
+                _index_version = version
+    return _index
+
+
+def search_teams(query, limit=DEFAULT_LIMIT, active_only=True):
+    """Recherche d'équipes par préfixe sur nom, joueur et pseudo."""
+    return get_index().search(query, limit=limit, active_only=active_only)
@@ -3,48 +3,247 @@ Signals Django pour GOMA-Efootball League.
 Gère le recalcul automatique du classement après chaque modification de résultat.
 """
 
-from django.db.models.signals import post_save, post_delete
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
-from .models import Result, Standing, Team
+from .cache import bump_data_version
+from .changes import record_change, record_changes
+from .jobs import enqueue
+from .locking import Coalescer, database_lock
+from .logos import delete_if_orphaned
+from .models import Match, PlayoffMatch, Result, ResultEvent, Standing, Team
+from .publishing import league_pages, pages_for, schedule_publish, team_pages
+from .ratings import apply_result
+from .search import bump_teams_version
+from .tables import build_table
+
+
+# Regroupement des recalculs (voir defer_standings_recalculation)
+_deferred = threading.local()
+
+
+@contextmanager
+def defer_standings_recalculation():
+    """
+    Regroupe les recalculs du classement déclenchés par les signals :
+    les sauvegardes du bloc ne font que marquer le classement à recalculer,
+    et un seul recalcul est lancé à la sortie (si le bloc réussit).
+    Vaut aussi pour la reconstruction des Elo.
+    """
+    if getattr(_deferred, 'active', False):
+        yield
+        return
+
+    _deferred.active = True
+    _deferred.pending = set()
+    try:
+        yield
+        pending = _deferred.pending
+    finally:
+        _deferred.active = False
+        _deferred.pending = set()
+    for task in sorted(pending):
+        enqueue(task)
+
+
+def _defer_if_batched(task='recompute_standings'):
+    """Marque la tâche comme en attente si un regroupement est actif."""
+    if getattr(_deferred, 'active', False):
+        _deferred.pending.add(task)
+        return True
+    return False
+
+
+def _rebuild_ratings():
+    if not _defer_if_batched('rebuild_ratings'):
+        enqueue('rebuild_ratings')
+
+
+STANDING_FIELDS = [
+    'played', 'won', 'drawn', 'lost', 'goals_for', 'goals_against',
+    'goal_difference', 'points', 'position',
+]
+
+# Recalculs demandés pendant un recalcul en cours : un seul recalcul de plus
+standings_coalescer = Coalescer()
 
 
 def recalculate_all_standings():
     """
     Recalcule le classement de TOUTES les équipes.
     Appelé après chaque sauvegarde ou suppression de résultat.
+    Les recalculs sont sérialisés par un verrou de base de données : deux
+    admins simultanés ne peuvent plus enregistrer un classement périmé.
     """
-    # S'assurer que chaque équipe a une entrée dans Standing
-    for team in Team.objects.filter(is_active=True):
-        standing, created = Standing.objects.get_or_create(team=team)
-        standing.calculate()
+    if connection.in_atomic_block:
+        # Les écritures de l'appelant ne sont pas encore validées :
+        # aucun autre recalcul ne peut les voir, pas de regroupement
+        _recalculate_standings_locked()
+    else:
+        standings_coalescer.run(_recalculate_standings_locked)
 
-    # Mettre à jour les positions
-    standings = Standing.objects.all().order_by(
-        '-points', '-goal_difference', '-goals_for'
+
+def _recalculate_standings_locked():
+    with transaction.atomic(), database_lock('league-standings', Standing):
+        _recalculate_standings()
+
+
+def _recalculate_standings():
+    """Une requête pour les résultats, une écriture groupée pour les lignes modifiées."""
+    teams = dict(Team.objects.values_list('pk', 'is_active'))
+    scores = Result.objects.filter(validated=True).values_list(
+        'match__home_team_id', 'match__away_team_id', 'home_score', 'away_score'
     )
+    # Mêmes règles que Standing.calculate()
+    table = {row.team_id: row for row in build_table(((pk, '') for pk in teams), scores)}
+
+    # S'assurer que chaque équipe active a une entrée dans Standing
+    standings = list(Standing.objects.order_by('pk'))
+    existing = {standing.team_id for standing in standings}
+    for team_id, is_active in teams.items():
+        if is_active and team_id not in existing:
+            standings.append(Standing.objects.create(team_id=team_id))
+
+    before = {}
+    for standing in standings:
+        before[standing.pk] = tuple(getattr(standing, name) for name in STANDING_FIELDS)
+        if teams.get(standing.team_id):
+            row = table[standing.team_id]
+            standing.played = row.played
+            standing.won = row.won
+            standing.drawn = row.drawn
+            standing.lost = row.lost
+            standing.goals_for = row.goals_for
+            standing.goals_against = row.goals_against
+            standing.goal_difference = row.goal_difference
+            standing.points = row.points
+
+    # Mettre à jour les positions
+    standings.sort(key=lambda s: (-s.points, -s.goal_difference, -s.goals_for))
     for index, standing in enumerate(standings, 1):
-        if standing.position != index:
-            standing.position = index
-            standing.save(update_fields=['position'])
+        standing.position = index
+
+    changed = [
+        standing for standing in standings
+        if tuple(getattr(standing, name) for name in STANDING_FIELDS) != before[standing.pk]
+    ]
+    Standing.objects.bulk_update(changed, STANDING_FIELDS, batch_size=500)
+    record_changes(Standing, [standing.pk for standing in changed])
+
+    # Exécuté en tâche de fond, le recalcul finit après la modification :
+    # caches et pages publiées ne sont à jour qu'à partir d'ici
+    transaction.on_commit(bump_data_version)
+    if settings.PUBLISH_STATIC_PAGES:
+        # Fiches de toutes les équipes dont la position ou les points changent
+        schedule_publish(league_pages() + team_pages(standing.team_id for standing in changed))
+    if settings.LEAGUE_ASYNC_JOBS:
+        # Simulations précalculées par le worker, jamais dans une requête ;
+        # sans file, la première requête simule (une seule à la fois)
+        transaction.on_commit(lambda: enqueue('compute_playoff_odds'))
 
 
 @receiver(post_save, sender=Result)
 def update_standings_on_result_save(sender, instance, **kwargs):
     """
     Signal déclenché après la sauvegarde d'un résultat.
-    Recalcule automatiquement le classement.
+    Recalcule automatiquement le classement (via la file de tâches).
     """
-    if instance.validated:
-        recalculate_all_standings()
+    if instance.validated and not _defer_if_batched():
+        enqueue('recompute_standings')
 
 
 @receiver(post_delete, sender=Result)
 def update_standings_on_result_delete(sender, instance, **kwargs):
     """
     Signal déclenché après la suppression d'un résultat.
-    Recalcule automatiquement le classement.
+    Recalcule automatiquement le classement (via la file de tâches).
     """
-    recalculate_all_standings()
+    if not _defer_if_batched():
+        enqueue('recompute_standings')
+
+
+@receiver(pre_save, sender=Result)
+def remember_previous_result(sender, instance, **kwargs):
+    """Garde l'état enregistré du résultat pour la mise à jour des Elo."""
+    instance._previous_state = None
+    if instance.pk:
+        instance._previous_state = Result.objects.filter(pk=instance.pk).values_list(
+            'validated', 'home_score', 'away_score'
+        ).first()
+
+
+@receiver(post_save, sender=Result)
+def update_ratings_on_result_save(sender, instance, **kwargs):
+    """
+    Nouveau résultat validé : mise à jour O(1) des deux équipes.
+    Résultat validé corrigé ou dévalidé : reconstruction complète.
+    """
+    previous = getattr(instance, '_previous_state', None)
+    was_validated = previous is not None and previous[0]
+    if instance.validated and not was_validated:
+        apply_result(instance)
+    elif was_validated and previous != (instance.validated, instance.home_score, instance.away_score):
+        _rebuild_ratings()
+
+
+@receiver(post_delete, sender=Result)
+def update_ratings_on_result_delete(sender, instance, **kwargs):
+    """Suppression d'un résultat validé : reconstruction complète des Elo."""
+    if instance.validated:
+        _rebuild_ratings()
+
+
+@receiver(post_save, sender=Result)
+def log_result_save(sender, instance, **kwargs):
+    """Ajoute l'état du résultat au journal (league.replay)."""
+    ResultEvent.from_result(instance).save()
+
+
+@receiver(post_delete, sender=Result)
+def log_result_delete(sender, instance, **kwargs):
+    """Ajoute la suppression du résultat au journal (league.replay)."""
+    ResultEvent.from_result(instance, action='delete').save()
+
+
+@receiver([post_save, post_delete], sender=Team)
+@receiver([post_save, post_delete], sender=Match)
+@receiver([post_save, post_delete], sender=Result)
+@receiver([post_save, post_delete], sender=PlayoffMatch)
+@receiver([post_save, post_delete], sender=Standing)
+def log_change(sender, instance, **kwargs):
+    """Ajoute la modification au journal de synchronisation (league.changes)."""
+    record_change(instance, action='delete' if kwargs.get('signal') is post_delete else 'save')
+
+
+@receiver(pre_save, sender=Team)
+def remember_previous_logo(sender, instance, **kwargs):
+    """Garde le nom du logo enregistré pour supprimer l'ancien fichier s'il change."""
+    instance._previous_logo = None
+    if instance.pk:
+        instance._previous_logo = Team.objects.filter(pk=instance.pk).values_list(
+            'logo', flat=True
+        ).first()
+
+
+@receiver(post_save, sender=Team)
+def delete_replaced_logo(sender, instance, **kwargs):
+    """Logo remplacé ou retiré : supprime l'ancien fichier s'il n'est plus utilisé."""
+    previous = getattr(instance, '_previous_logo', None)
+    if previous and previous != instance.logo.name:
+        transaction.on_commit(lambda: delete_if_orphaned(previous))
+
+
+@receiver(post_delete, sender=Team)
+def delete_logo_of_deleted_team(sender, instance, **kwargs):
+    """Équipe supprimée : supprime son logo s'il n'est plus utilisé."""
+    if instance.logo:
+        name = instance.logo.name
+        transaction.on_commit(lambda: delete_if_orphaned(name))
 
 
 @receiver(post_save, sender=Team)
@@ -53,4 +252,53 @@ def create_standing_for_new_team(sender, instance, created, **kwargs):
     Crée automatiquement une entrée Standing pour chaque nouvelle équipe.
     """
     if created:
-        Standing.objects.get_or_create(team=instance)
\ No newline at end of file
+        Standing.objects.get_or_create(team=instance)
+
+
+@receiver([post_save, post_delete], sender=Team)
+def rebuild_search_index_on_team_change(sender, **kwargs):
+    """
+    Invalide l'index de recherche des équipes dans tous les processus
+    (version dans le cache partagé, voir settings.CACHES).
+    Chaque processus le reconstruit à sa prochaine recherche.
+    """
+    transaction.on_commit(bump_teams_version)
+
+
+@receiver([post_save, post_delete], sender=Team)
+@receiver([post_save, post_delete], sender=Match)
+@receiver([post_save, post_delete], sender=Result)
+@receiver([post_save, post_delete], sender=PlayoffMatch)
+def bump_version_on_change(sender, **kwargs):
+    """
+    Change la version des données de la ligue après toute modification.
+    Les entrées de cache dérivées (ex : chances de qualification) sont ainsi invalidées.
+    """
+    transaction.on_commit(bump_data_version)
+
+
+@receiver([post_save, post_delete], sender=Team)
+@receiver([post_save, post_delete], sender=Match)
+@receiver([post_save, post_delete], sender=Result)
+@receiver([post_save, post_delete], sender=PlayoffMatch)
+def republish_pages_on_change(sender, instance, **kwargs):
+    """
+    Régénère après validation les seules pages pré-rendues
+    touchées par la modification (voir league.publishing).
+    """
+    if settings.PUBLISH_STATIC_PAGES:
+        schedule_publish(pages_for(instance))
+
+
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """
+    Applique les PRAGMA de production à chaque nouvelle connexion SQLite :
+    WAL pour que les lectures ne bloquent pas pendant une écriture,
+    busy_timeout pour attendre le verrou au lieu d'échouer.
+    """
+    if connection.vendor != 'sqlite' or not settings.SQLITE_TUNING:
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {pragma} = {value}')
@@ -0,0 +1,246 @@
+"""
+Simulation Monte Carlo des chances de qualification en phase finale.
+Part du classement actuel, tire au sort les scores des matchs restants
+et applique le même ordre de départage que le classement
+(points, différence de buts, buts marqués).
+Les saisons sont simulées par lots de BATCH_RUNS pour borner la mémoire.
+Les requêtes publiques restent dans leur processus ; le pool de processus
+n'est utilisé que par la tâche de fond compute_playoff_odds.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .cache import get_or_refresh, refresh_value
+from .models import Match, Standing
+
+# Nombre de qualifiés pour generate_playoffs
+PLAYOFF_SPOTS = 4
+
+MODEL_UNIFORM = 'uniform'
+MODEL_RATING = 'rating'
+MODELS = (MODEL_UNIFORM, MODEL_RATING)
+
+DEFAULT_RUNS = 20000
+# Nombres de simulations proposés par l'API publique (précalculés en tâche de fond)
+RUN_CHOICES = (5000, DEFAULT_RUNS)
+MAX_RUNS = 200000
+# Saisons simulées à la fois : tableaux de BATCH_RUNS x matchs restants
+BATCH_RUNS = 2000
+# En dessous de ce nombre de simulations par processus, le pool coûte plus qu'il ne rapporte
+MIN_RUNS_PER_WORKER = 5000
+# Score maximum tiré par équipe dans le modèle uniforme
+UNIFORM_MAX_GOALS = 5
+# Poids (en matchs) de la moyenne de la ligue dans le modèle par niveau
+RATING_PRIOR_MATCHES = 3
+CACHE_TIMEOUT = 60 * 60
+
+
+def load_league_state():
+    """
+    Charge le classement actuel et les matchs restants.
+    Un match est restant tant qu'il n'a pas de résultat validé.
+    """
+    standings = list(
+        Standing.objects.select_related('team').order_by(
+            '-points', '-goal_difference', '-goals_for'
+        )
+    )
+    index = {s.team_id: i for i, s in enumerate(standings)}
+
+    fixtures = []
+    remaining = Match.objects.exclude(result__validated=True).values_list(
+        'home_team_id', 'away_team_id'
+    )
+    for home_id, away_id in remaining:
+        if home_id in index and away_id in index:
+            fixtures.append((index[home_id], index[away_id]))
+
+    return standings, fixtures
+
+
+def _goal_rates(standings, fixtures):
+    """
+    Espérance de buts (domicile, extérieur) pour chaque match restant.
+    Attaque et défense de chaque équipe sont rapportées à la moyenne de la ligue,
+    lissées vers cette moyenne tant que peu de matchs ont été joués.
+    """
+    played = np.array([s.played for s in standings], dtype=float)
+    goals_for = np.array([s.goals_for for s in standings], dtype=float)
+    goals_against = np.array([s.goals_against for s in standings], dtype=float)
+
+    total_played = played.sum()
+    league_avg = goals_for.sum() / total_played if total_played else 1.5
+    league_avg = max(league_avg, 0.1)
+
+    prior = RATING_PRIOR_MATCHES * league_avg
+    attack = (goals_for + prior) / ((played + RATING_PRIOR_MATCHES) * league_avg)
+    defense = (goals_against + prior) / ((played + RATING_PRIOR_MATCHES) * league_avg)
+
+    home_idx = np.array([f[0] for f in fixtures], dtype=np.intp)
+    away_idx = np.array([f[1] for f in fixtures], dtype=np.intp)
+    home_rate = league_avg * attack[home_idx] * defense[away_idx]
+    away_rate = league_avg * attack[away_idx] * defense[home_idx]
+    return home_rate, away_rate
+
+
+def _simulate_chunk(args):
+    """
+    Simule une part des saisons, BATCH_RUNS à la fois, et compte
+    les positions finales de chaque équipe.
+    Fonction de module (et non méthode) pour pouvoir être envoyée au pool de processus.
+    """
+    (seed, runs, model, base_points, base_gd, base_gf,
+     home_idx, away_idx, home_rate, away_rate) = args
+    rng = np.random.default_rng(seed)
+    num_teams = base_points.shape[0]
+    counts = np.zeros((num_teams, num_teams), dtype=np.int64)
+    for start in range(0, runs, BATCH_RUNS):
+        counts += _simulate_batch(
+            rng, min(BATCH_RUNS, runs - start), model, base_points, base_gd, base_gf,
+            home_idx, away_idx, home_rate, away_rate,
+        )
+    return counts
+
+
+def _simulate_batch(rng, runs, model, base_points, base_gd, base_gf,
+                    home_idx, away_idx, home_rate, away_rate):
+    """Simule `runs` saisons d'un coup (tableaux runs x matchs restants)."""
+    num_teams = base_points.shape[0]
+    num_fixtures = home_idx.shape[0]
+
+    if num_fixtures:
+        if model == MODEL_RATING:
+            home_goals = rng.poisson(home_rate, size=(runs, num_fixtures))
+            away_goals = rng.poisson(away_rate, size=(runs, num_fixtures))
+        else:
+            home_goals = rng.integers(0, UNIFORM_MAX_GOALS + 1, size=(runs, num_fixtures))
+            away_goals = rng.integers(0, UNIFORM_MAX_GOALS + 1, size=(runs, num_fixtures))
+
+        home_points = np.where(home_goals > away_goals, 3, np.where(home_goals == away_goals, 1, 0))
+        away_points = np.where(away_goals > home_goals, 3, np.where(home_goals == away_goals, 1, 0))
+
+        # Matrices d'incidence match -> équipe pour accumuler sans boucle Python
+        home_matrix = np.zeros((num_fixtures, num_teams), dtype=np.int64)
+        away_matrix = np.zeros((num_fixtures, num_teams), dtype=np.int64)
+        home_matrix[np.arange(num_fixtures), home_idx] = 1
+        away_matrix[np.arange(num_fixtures), away_idx] = 1
+
+        points = base_points + home_points @ home_matrix + away_points @ away_matrix
+        goals_for = base_gf + home_goals @ home_matrix + away_goals @ away_matrix
+        goals_against = away_goals @ home_matrix + home_goals @ away_matrix
+        goal_diff = base_gd + goals_for - base_gf - goals_against
+    else:
+        points = np.tile(base_points, (runs, 1))
+        goals_for = np.tile(base_gf, (runs, 1))
+        goal_diff = np.tile(base_gd, (runs, 1))
+
+    # Clé de tri unique : points, puis différence de buts, puis buts marqués
+    span = int(max(np.abs(goal_diff).max(), goals_for.max())) + 1
+    key = (points * (2 * span + 1) + (goal_diff + span)) * (span + 1) + goals_for
+
+    # Tri stable : à égalité parfaite, l'ordre du classement actuel est conservé
+    order = np.argsort(-key, axis=1, kind='stable')
+    positions = np.empty_like(order)
+    rows = np.arange(runs)[:, None]
+    positions[rows, order] = np.arange(num_teams)
+
+    counts = np.bincount(
+        (np.arange(num_teams) * num_teams + positions).ravel(),
+        minlength=num_teams * num_teams,
+    )
+    return counts.reshape(num_teams, num_teams)
+
+
+def simulate_playoff_odds(runs=DEFAULT_RUNS, model=MODEL_UNIFORM, workers=1, seed=None):
+    """
+    Simule la fin de saison et retourne, pour chaque équipe,
+    la probabilité de chaque position finale et de qualification.
+    workers > 1 (None : un par CPU) répartit les simulations sur un pool
+    de processus, à réserver aux tâches de fond.
+    """
+    if model not in MODELS:
+        raise ValueError(f"Modèle inconnu : {model}")
+    runs = max(1, min(int(runs), MAX_RUNS))
+
+    standings, fixtures = load_league_state()
+    num_teams = len(standings)
+    if num_teams == 0:
+        return {'runs': runs, 'model': model, 'playoff_spots': PLAYOFF_SPOTS,
+                'remaining_matches': 0, 'teams': []}
+
+    base_points = np.array([s.points for s in standings], dtype=np.int64)
+    base_gd = np.array([s.goal_difference for s in standings], dtype=np.int64)
+    base_gf = np.array([s.goals_for for s in standings], dtype=np.int64)
+    home_idx = np.array([f[0] for f in fixtures], dtype=np.intp)
+    away_idx = np.array([f[1] for f in fixtures], dtype=np.intp)
+    if fixtures and model == MODEL_RATING:
+        home_rate, away_rate = _goal_rates(standings, fixtures)
+    else:
+        home_rate = away_rate = None
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, runs // MIN_RUNS_PER_WORKER))
+
+    # Un flux aléatoire indépendant par lot
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    sizes = [runs // workers + (1 if i < runs % workers else 0) for i in range(workers)]
+    chunks = [
+        (seeds[i], sizes[i], model, base_points, base_gd, base_gf,
+         home_idx, away_idx, home_rate, away_rate)
+        for i in range(workers)
+    ]
+
+    if workers == 1:
+        counts = _simulate_chunk(chunks[0])
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            counts = sum(executor.map(_simulate_chunk, chunks))
+
+    probabilities = counts / runs
+    teams = []
+    for i, standing in enumerate(standings):
+        teams.append({
+            'team_id': standing.team_id,
+            'team': standing.team.name,
+            'current_position': i + 1,
+            'points': standing.points,
+            'position_probabilities': [round(float(p), 4) for p in probabilities[i]],
+            'qualification_probability': round(float(probabilities[i, :PLAYOFF_SPOTS].sum()), 4),
+        })
+
+    return {
+        'runs': runs,
+        'model': model,
+        'playoff_spots': PLAYOFF_SPOTS,
+        'remaining_matches': len(fixtures),
+        'teams': teams,
+    }
+
+
+def get_playoff_odds(runs=DEFAULT_RUNS, model=MODEL_UNIFORM):
+    """
+    Retourne les chances de qualification, en général précalculées par
+    compute_playoff_odds ; sinon une seule simulation à la fois par modèle
+    et nombre de tirages, dans le processus de la requête.
+    """
+    return get_or_refresh(
+        'playoff_odds', lambda: simulate_playoff_odds(runs=runs, model=model),
+        model, runs, timeout=CACHE_TIMEOUT,
+    )
+
+
+def compute_playoff_odds(workers=None):
+    """
+    Tâche de fond (league.jobs) : précalcule les chances de qualification
+    de chaque modèle pour chaque nombre de simulations public.
+    """
+    for model in MODELS:
+        for runs in RUN_CHOICES:
+            refresh_value(
+                'playoff_odds', lambda: simulate_playoff_odds(runs=runs, model=model, workers=workers),
+                model, runs, timeout=CACHE_TIMEOUT,
+            )
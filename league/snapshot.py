@@ -0,0 +1,177 @@
+"""
+Instantané de la ligue pour les clients mobiles (application, bot WhatsApp).
+Un seul appel à api/snapshot/ remplace les pages et API séparées :
+classement, derniers résultats, prochains matchs, phase finale, attaques
+et Elo. Chaque section coûte au plus une requête et est mise en cache par
+version des données ; les équipes ne sont envoyées qu'une fois (table `teams`),
+les sections n'y font référence que par identifiant.
+"""
+
+from django.core.cache import cache
+from django.db.models import F
+
+from .cache import get_data_version, versioned_key
+from .models import Match, PlayoffMatch, Result, Standing, Team
+from .ratings import ratings_table
+
+RECENT_RESULTS = 10
+UPCOMING_MATCHES = 10
+TOP_SCORERS = 10
+CACHE_TIMEOUT = 60 * 60
+
+
+def _standings():
+    rows = Standing.objects.order_by('-points', '-goal_difference', '-goals_for').values_list(
+        'team_id', 'played', 'won', 'drawn', 'lost',
+        'goals_for', 'goals_against', 'goal_difference', 'points',
+    )
+    return [
+        {
+            'position': position,
+            'team': team_id,
+            'played': played,
+            'won': won,
+            'drawn': drawn,
+            'lost': lost,
+            'goals_for': goals_for,
+            'goals_against': goals_against,
+            'goal_difference': goal_difference,
+            'points': points,
+        }
+        for position, (team_id, played, won, drawn, lost, goals_for, goals_against,
+                       goal_difference, points) in enumerate(rows, 1)
+    ]
+
+
+def _results():
+    rows = Result.objects.filter(validated=True).order_by(
+        F('match__date_played').desc(nulls_last=True), '-updated_at'
+    ).values_list(
+        'match_id', 'match__home_team_id', 'match__away_team_id',
+        'home_score', 'away_score', 'match__matchday', 'match__phase', 'match__date_played',
+    )[:RECENT_RESULTS]
+    return [
+        {
+            'match': match_id,
+            'home': home_id,
+            'away': away_id,
+            'score': [home_score, away_score],
+            'matchday': matchday,
+            'phase': phase,
+            'date': date_played,
+        }
+        for match_id, home_id, away_id, home_score, away_score, matchday, phase, date_played in rows
+    ]
+
+
+def _fixtures():
+    rows = Match.objects.filter(is_played=False).order_by(
+        F('date_played').asc(nulls_last=True), '-phase', 'matchday', 'pk'
+    ).values_list('pk', 'home_team_id', 'away_team_id', 'matchday', 'phase', 'date_played')[:UPCOMING_MATCHES]
+    return [
+        {
+            'match': match_id,
+            'home': home_id,
+            'away': away_id,
+            'matchday': matchday,
+            'phase': phase,
+            'date': date_played,
+        }
+        for match_id, home_id, away_id, matchday, phase, date_played in rows
+    ]
+
+
+def _playoffs():
+    rows = PlayoffMatch.objects.order_by('round_type').values_list(
+        'round_type', 'home_team_id', 'away_team_id', 'home_score', 'away_score',
+        'is_played', 'has_penalties', 'penalty_winner_id',
+    )
+    return [
+        {
+            'round': round_type,
+            'home': home_id,
+            'away': away_id,
+            'score': [home_score, away_score] if is_played else None,
+            'penalty_winner': penalty_winner_id if has_penalties else None,
+        }
+        for round_type, home_id, away_id, home_score, away_score, is_played,
+        has_penalties, penalty_winner_id in rows
+    ]
+
+
+def _goals():
+    rows = Standing.objects.order_by('-goals_for', 'goals_against').values_list(
+        'team_id', 'goals_for', 'goals_against'
+    )[:TOP_SCORERS]
+    return [
+        {'team': team_id, 'goals_for': goals_for, 'goals_against': goals_against}
+        for team_id, goals_for, goals_against in rows
+    ]
+
+
+def _ratings():
+    return [
+        {'team': row['team_id'], 'rating': row['rating'], 'matches': row['matches']}
+        for row in ratings_table()
+    ]
+
+
+def _teams():
+    storage = Team._meta.get_field('logo').storage
+    return {
+        team_id: {'name': name, 'logo': storage.url(logo) if logo else None}
+        for team_id, name, logo in Team.objects.values_list('pk', 'name', 'logo')
+    }
+
+
+# Section -> fonction de calcul (une requête chacune)
+SECTIONS = {
+    'standings': _standings,
+    'results': _results,
+    'fixtures': _fixtures,
+    'playoffs': _playoffs,
+    'goals': _goals,
+    'ratings': _ratings,
+    'teams': _teams,
+}
+
+
+def parse_fields(raw):
+    """
+    Lit ?fields=standings,results. Vide : toutes les sections.
+    `teams` est ajoutée dès qu'une section fait référence à des équipes.
+    """
+    if not raw:
+        return list(SECTIONS)
+    fields = []
+    for name in filter(None, (part.strip() for part in raw.split(','))):
+        if name not in SECTIONS:
+            raise ValueError(f"Section inconnue : '{name}' (disponibles : {', '.join(SECTIONS)}).")
+        if name not in fields:
+            fields.append(name)
+    if fields and 'teams' not in fields:
+        fields.append('teams')
+    return fields
+
+
+def build_snapshot(fields):
+    """
+    Construit l'instantané des sections demandées.
+    Les sections déjà en cache pour la version courante sont lues
+    en un seul appel au cache ; seules les manquantes sont recalculées.
+    """
+    version = get_data_version()
+    keys = {name: versioned_key('snapshot', name) for name in fields}
+    cached = cache.get_many(keys.values())
+
+    snapshot = {'version': version}
+    missing = {}
+    for name in fields:
+        key = keys[name]
+        if key in cached:
+            snapshot[name] = cached[key]
+        else:
+            snapshot[name] = missing[key] = SECTIONS[name]()
+    if missing:
+        cache.set_many(missing, CACHE_TIMEOUT)
+    return snapshot
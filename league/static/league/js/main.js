@@ -56,6 +56,56 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
 
+    // ========================
+    // CASES "TOUT SÉLECTIONNER"
+    // ========================
+    const checkAllBoxes = document.querySelectorAll('[data-check-all]');
+    checkAllBoxes.forEach(box => {
+        box.addEventListener('change', function() {
+            const name = this.getAttribute('data-check-all');
+            document.querySelectorAll(`input[type="checkbox"][name="${name}"]`).forEach(cb => {
+                cb.checked = box.checked;
+            });
+        });
+    });
+
+    // ========================
+    // AUTOCOMPLÉTION ÉQUIPES
+    // ========================
+    // Champ texte + <datalist> alimenté par l'API de recherche ;
+    // l'identifiant de l'équipe choisie va dans le champ caché voisin.
+    const teamInputs = document.querySelectorAll('[data-team-autocomplete]');
+    teamInputs.forEach(input => {
+        const url = input.getAttribute('data-team-autocomplete');
+        const hidden = input.parentNode.querySelector('input[type="hidden"]');
+        const datalist = document.getElementById(input.getAttribute('list'));
+        let suggestions = {};
+        let timer = null;
+
+        input.addEventListener('input', function() {
+            const query = input.value.trim();
+            hidden.value = suggestions[query] || '';
+            clearTimeout(timer);
+            if (!query || hidden.value) return;
+            timer = setTimeout(() => {
+                fetch(`${url}?q=${encodeURIComponent(query)}`)
+                    .then(response => response.json())
+                    .then(data => {
+                        suggestions = {};
+                        datalist.innerHTML = '';
+                        data.results.forEach(team => {
+                            suggestions[team.name] = team.id;
+                            const option = document.createElement('option');
+                            option.value = team.name;
+                            option.label = `${team.player_name} (${team.gamer_pseudo})`;
+                            datalist.appendChild(option);
+                        });
+                        hidden.value = suggestions[input.value.trim()] || '';
+                    });
+            }, 150);
+        });
+    });
+
     // ========================
     // TOOLTIP BOOTSTRAP
     // ========================
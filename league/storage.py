@@ -0,0 +1,55 @@
+"""
+Stockage des fichiers envoyés (logos) pour GOMA-Efootball League.
+Chaque fichier est enregistré sous l'empreinte de son contenu
+(teams/3f2a9c0d1e4b5a67.png) : deux envois identiques partagent le même
+fichier, et un logo remplacé change d'URL. Les navigateurs peuvent donc
+garder les fichiers indéfiniment (voir middleware.MediaFilesMiddleware).
+"""
+
+import hashlib
+import posixpath
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+HASH_LENGTH = 16
+HASHED_NAME = re.compile(rf'^[0-9a-f]{{{HASH_LENGTH}}}\.\w+$')
+
+
+def is_hashed_name(name):
+    """Vérifie si le nom de fichier (sans dossier) est une empreinte de contenu."""
+    return bool(HASHED_NAME.match(posixpath.basename(name)))
+
+
+def content_hash(content):
+    """Empreinte SHA-256 (tronquée) du contenu, lu morceau par morceau."""
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+class HashedMediaStorage(FileSystemStorage):
+    """Stockage sur disque sous des noms dérivés du contenu, sans doublon."""
+
+    def hashed_name(self, name, content):
+        directory, filename = posixpath.split(name)
+        extension = posixpath.splitext(filename)[1].lower()
+        return posixpath.join(directory, content_hash(content) + extension)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        if self.exists(name):
+            # Même contenu déjà enregistré : réutiliser le fichier
+            return name
+        return super().save(name, content, max_length=max_length)
+
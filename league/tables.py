@@ -0,0 +1,83 @@
+"""
+Calcul du classement en mémoire pour GOMA-Efootball League.
+Mêmes règles que Standing.calculate() (3 pts victoire, 1 pt nul)
+et même ordre de départage que le classement
+(points, différence de buts, buts marqués), sans aucune écriture en base.
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass
+class TableRow:
+    """Ligne de classement calculée en mémoire."""
+    team_id: int
+    team: str
+    played: int = 0
+    won: int = 0
+    drawn: int = 0
+    lost: int = 0
+    goals_for: int = 0
+    goals_against: int = 0
+    position: int = 0
+
+    @property
+    def goal_difference(self):
+        return self.goals_for - self.goals_against
+
+    @property
+    def points(self):
+        return self.won * 3 + self.drawn
+
+    def add(self, scored, conceded):
+        """Ajoute un match joué à la ligne."""
+        self.played += 1
+        self.goals_for += scored
+        self.goals_against += conceded
+        if scored > conceded:
+            self.won += 1
+        elif scored == conceded:
+            self.drawn += 1
+        else:
+            self.lost += 1
+
+    def as_dict(self):
+        return {
+            'position': self.position,
+            'team_id': self.team_id,
+            'team': self.team,
+            'points': self.points,
+            'played': self.played,
+            'won': self.won,
+            'drawn': self.drawn,
+            'lost': self.lost,
+            'goals_for': self.goals_for,
+            'goals_against': self.goals_against,
+            'goal_difference': self.goal_difference,
+        }
+
+
+def build_table(teams, scores):
+    """
+    Construit le classement trié.
+    teams : itérable de (team_id, nom) ; scores : itérable de
+    (home_id, away_id, home_score, away_score). Les matchs impliquant
+    une équipe absente du classement sont ignorés.
+    """
+    rows = {team_id: TableRow(team_id=team_id, team=name) for team_id, name in teams}
+    for home_id, away_id, home_score, away_score in scores:
+        home = rows.get(home_id)
+        away = rows.get(away_id)
+        if home is None or away is None:
+            continue
+        home.add(home_score, away_score)
+        away.add(away_score, home_score)
+
+    # Tri stable : à égalité parfaite, l'ordre d'entrée des équipes est conservé
+    table = sorted(
+        rows.values(),
+        key=lambda row: (-row.points, -row.goal_difference, -row.goals_for),
+    )
+    for position, row in enumerate(table, 1):
+        row.position = position
+    return table
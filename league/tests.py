@@ -1,3 +1,793 @@
-from django.test import TestCase
+"""
+Tests de GOMA-Efootball League.
+"""
 
-# Create your tests here.
+import itertools
+import tempfile
+import threading
+import zipfile
+import time
+from datetime import date, time as clock, timedelta
+from io import BytesIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, connections, transaction
+from django.db.models import Max, Q
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from .cache import bump_data_version, get_data_version, get_or_refresh
+from .calendars import extend_calendar, generate_calendar
+from .changes import changes_since, notify_bulk_change
+from . import jobs
+from .importing import import_teams
+from .locking import _lock_row
+from .logos import process_team_logo
+from .models import ChangeLogEntry, DatabaseLock, Job, Match, Result, ResultEvent, Standing, Team, TeamRating
+from .ratings import compute_ratings, rebuild_ratings
+from .replay import fold_events, standings_as_of
+from .routers import PRIMARY_DB, REPLICA_DB, ReplicaRouter, RoutingState, routing_state
+from .scheduling import evenings, plan_schedule, schedule_matches
+from .signals import standings_coalescer
+from .tables import build_table
+
+
+def create_teams(count, start=1):
+    """Crée `count` équipes (et leur classement, via les signals)."""
+    return [
+        Team.objects.create(name=f"Équipe {i:02d}", player_name=f"Joueur {i}", gamer_pseudo=f"gamer{i}")
+        for i in range(start, start + count)
+    ]
+
+
+def play(home, away, home_score, away_score, matchday=1, validated=True):
+    """Crée un match et son résultat."""
+    match = Match.objects.create(home_team=home, away_team=away, matchday=matchday)
+    return Result.objects.create(
+        match=match, home_score=home_score, away_score=away_score, validated=validated
+    )
+
+
+def standing_rows():
+    """Classement enregistré : {team_id: (joués, V, N, D, bp, bc, diff, points)}."""
+    return {
+        s.team_id: (s.played, s.won, s.drawn, s.lost, s.goals_for, s.goals_against,
+                    s.goal_difference, s.points)
+        for s in Standing.objects.all()
+    }
+
+
+def table_rows(table):
+    """Même forme que standing_rows() pour un classement calculé en mémoire."""
+    return {
+        row.team_id: (row.played, row.won, row.drawn, row.lost, row.goals_for, row.goals_against,
+                      row.goal_difference, row.points)
+        for row in table
+    }
+
+
+def validated_scores():
+    return Result.objects.filter(validated=True).values_list(
+        'match__home_team_id', 'match__away_team_id', 'home_score', 'away_score'
+    )
+
+
+class BuildTableTests(TestCase):
+    """league.tables.build_table : mêmes chiffres et même ordre que le classement en base."""
+
+    def test_matches_standing_calculate(self):
+        a, b, c, d = create_teams(4)
+        play(a, b, 3, 1)
+        play(c, d, 2, 2)
+        play(b, c, 0, 1, matchday=2)
+        play(d, a, 4, 0, matchday=2)
+        play(a, c, 1, 1, matchday=3)
+        play(b, d, 5, 0, matchday=3, validated=False)  # non validé : ignoré
+
+        for standing in Standing.objects.all():
+            standing.calculate()
+        teams = Team.objects.values_list('pk', 'name')
+
+        self.assertEqual(table_rows(build_table(teams, validated_scores())), standing_rows())
+
+    def test_tie_break_order(self):
+        teams = [(1, 'A'), (2, 'B'), (3, 'C'), (4, 'D'), (5, 'E')]
+        scores = [
+            (1, 5, 1, 0),  # A : 3 pts, +1, 1 but
+            (2, 5, 3, 2),  # B : 3 pts, +1, 3 buts
+            (3, 5, 2, 0),  # C : 3 pts, +2
+            (4, 5, 1, 0),  # D : identique à A
+        ]
+        table = build_table(teams, scores)
+
+        # Points, puis différence de buts, puis buts marqués,
+        # puis ordre d'entrée à égalité parfaite (A avant D)
+        self.assertEqual([row.team for row in table], ['C', 'B', 'A', 'D', 'E'])
+        self.assertEqual([row.position for row in table], [1, 2, 3, 4, 5])
+
+    def test_ignores_unknown_teams(self):
+        table = build_table([(1, 'A'), (2, 'B')], [(1, 2, 2, 0), (1, 99, 5, 0)])
+
+        self.assertEqual(table_rows(table), {
+            1: (1, 1, 0, 0, 2, 0, 2, 3),
+            2: (1, 0, 0, 1, 0, 2, -2, 0),
+        })
+
+
+class ReplayTests(TestCase):
+    """league.replay : le rejeu du journal redonne le classement en base."""
+
+    def test_fold_events_keeps_last_validated_state(self):
+        events = [
+            (1, 10, 1, 2, 'save', 1, 0, True),
+            (2, 11, 3, 4, 'save', 2, 2, True),
+            (3, 10, 1, 2, 'save', 0, 3, True),   # correction du match 10
+            (4, 11, 3, 4, 'save', 2, 2, False),  # match 11 dévalidé
+            (5, 12, 1, 3, 'save', 1, 1, True),
+            (6, 12, 1, 3, 'delete', 1, 1, True),
+        ]
+        state, last_id, count = fold_events(events)
+
+        self.assertEqual(state, {10: (1, 2, 0, 3)})
+        self.assertEqual((last_id, count), (6, 6))
+
+    def test_replay_equals_live_standings(self):
+        a, b, c, d = create_teams(4)
+        first = play(a, b, 2, 0)
+        second = play(c, d, 1, 1)
+        play(a, c, 0, 2, matchday=2)
+        play(b, d, 3, 1, matchday=2)
+        first.home_score, first.away_score = 1, 4
+        first.save()
+        second.validated = False
+        second.save()
+        play(d, a, 2, 2, matchday=3).delete()
+
+        table, _last_id, count = standings_as_of()
+
+        self.assertEqual(count, ResultEvent.objects.count())
+        self.assertEqual(table_rows(table), standing_rows())
+        self.assertEqual(
+            [row.team_id for row in table],
+            list(Standing.objects.order_by('position').values_list('team_id', flat=True)),
+        )
+
+    def test_replay_at_earlier_event(self):
+        a, b = create_teams(2)
+        result = play(a, b, 2, 0)
+        before_correction = ResultEvent.objects.latest('id').pk
+        result.home_score = 0
+        result.save()
+
+        table, last_id, _count = standings_as_of(event_id=before_correction)
+
+        self.assertEqual(last_id, before_correction)
+        self.assertEqual([(row.team_id, row.points) for row in table], [(a.pk, 3), (b.pk, 0)])
+
+
+def rating_rows():
+    return {
+        rating.team_id: (round(rating.rating, 6), rating.matches)
+        for rating in TeamRating.objects.all()
+    }
+
+
+class RatingTests(TestCase):
+    """league.ratings : la mise à jour incrémentale égale la reconstruction complète."""
+
+    def test_compute_ratings_is_zero_sum(self):
+        ratings = compute_ratings([(1, 2, 3, 0), (2, 3, 1, 1), (3, 1, 2, 1)])
+
+        initial = settings.ELO_INITIAL_RATING
+        self.assertAlmostEqual(sum(elo for elo, _matches in ratings.values()), 3 * initial)
+        self.assertEqual({team_id: matches for team_id, (_elo, matches) in ratings.items()},
+                         {1: 2, 2: 2, 3: 2})
+
+    def test_bigger_win_gains_more(self):
+        narrow = compute_ratings([(1, 2, 1, 0)])[1][0]
+        wide = compute_ratings([(1, 2, 4, 0)])[1][0]
+
+        self.assertGreater(narrow, settings.ELO_INITIAL_RATING)
+        self.assertGreater(wide, narrow)
+
+    def test_incremental_equals_rebuild(self):
+        a, b, c, d = create_teams(4)
+        play(a, b, 2, 1)
+        play(c, d, 0, 0)
+        play(a, c, 1, 3, matchday=2)
+        play(b, d, 4, 0, matchday=2)
+        play(d, a, 1, 2, matchday=3)
+        incremental = rating_rows()
+
+        rebuild_ratings()
+
+        self.assertEqual(rating_rows(), incremental)
+
+    def test_correction_rebuilds(self):
+        a, b = create_teams(2)
+        result = play(a, b, 3, 0)
+        result.home_score, result.away_score = 0, 3
+        result.save()
+
+        expected = compute_ratings([(a.pk, b.pk, 0, 3)])
+        self.assertEqual(rating_rows(), {
+            team_id: (round(elo, 6), matches) for team_id, (elo, matches) in expected.items()
+        })
+
+
+class CacheTests(TestCase):
+    """league.cache.get_or_refresh : valeurs enregistrées sous la version courante."""
+
+    def test_fill_reads_the_primary_during_a_public_read(self):
+        router = ReplicaRouter()
+        token = routing_state.set(RoutingState(use_replica=True))
+        self.addCleanup(routing_state.reset, token)
+        self.assertEqual(router.db_for_read(Team), REPLICA_DB)
+        bump_data_version()
+
+        databases = []
+
+        def compute():
+            databases.append(router.db_for_read(Team))
+            return len(databases)
+
+        self.assertEqual(get_or_refresh('routing-test', compute), 1)
+        self.assertEqual(get_or_refresh('routing-test', compute), 1)
+        self.assertEqual(databases, [PRIMARY_DB])
+        # La requête continue de lire la réplique
+        self.assertEqual(router.db_for_read(Team), REPLICA_DB)
+
+
+def last_version():
+    return ChangeLogEntry.objects.latest('pk').pk
+
+
+class ChangeLogTests(TestCase):
+    """league.changes : api/changes/ et invalidation des modifications en masse."""
+
+    def test_up_to_date_client_gets_nothing(self):
+        create_teams(1)
+        version = last_version()
+
+        self.assertEqual(changes_since(version), {
+            'version': version, 'resync': False, 'changes': {}, 'deleted': {},
+        })
+
+    def test_unknown_versions_resync(self):
+        self.assertTrue(changes_since(None)['resync'])
+        # Journal vide, même avec une version négative
+        self.assertTrue(changes_since(-5)['resync'])
+        create_teams(1)
+        self.assertTrue(changes_since(last_version() + 1)['resync'])
+
+    def test_changes_are_collapsed_per_object(self):
+        a, b = create_teams(2)
+        version = last_version()
+        a.name = "Renommée"
+        a.save()
+        a.save()
+        deleted_pk = b.pk
+        b.delete()
+
+        response = changes_since(version)
+
+        self.assertFalse(response['resync'])
+        self.assertEqual(response['version'], last_version())
+        self.assertEqual([team['name'] for team in response['changes']['teams']], ["Renommée"])
+        self.assertEqual(response['deleted']['teams'], [deleted_pk])
+
+    def test_reset_entry_resyncs(self):
+        create_teams(1)
+        version = last_version()
+        notify_bulk_change(Match, None)
+
+        self.assertTrue(changes_since(version)['resync'])
+
+    def test_purged_entries_resync(self):
+        create_teams(3)
+        first = ChangeLogEntry.objects.order_by('pk').first().pk
+        ChangeLogEntry.objects.filter(pk__lte=first + 1).delete()
+
+        self.assertTrue(changes_since(first - 1)['resync'])
+        self.assertFalse(changes_since(first + 1)['resync'])
+
+    def test_recent_gap_stops_before_it(self):
+        a, b, c = create_teams(3)
+        version = last_version()
+        a.save()
+        b.save()
+        c.save()
+        gap = ChangeLogEntry.objects.get(kind='team', object_id=b.pk, pk__gt=version)
+        gap.delete()
+
+        # Trou récent : une transaction plus ancienne peut encore le combler
+        response = changes_since(version)
+        self.assertEqual(response['version'], version + 1)
+        self.assertEqual([team['id'] for team in response['changes']['teams']], [a.pk])
+
+        # Trou ancien : transaction annulée, ignoré
+        old = timezone.now() - timedelta(seconds=settings.CHANGELOG_SETTLE_SECONDS + 1)
+        ChangeLogEntry.objects.filter(pk__gt=version).update(created_at=old)
+        response = changes_since(version)
+        self.assertEqual(response['version'], last_version())
+        self.assertEqual({team['id'] for team in response['changes']['teams']}, {a.pk, c.pk})
+
+    @override_settings(CHANGELOG_MAX_ROWS=2)
+    def test_too_many_rows_resync(self):
+        create_teams(1)
+        version = last_version()
+        create_teams(2, start=2)
+
+        self.assertTrue(changes_since(version)['resync'])
+
+    @override_settings(PUBLISH_STATIC_PAGES=True)
+    def test_notify_bulk_change(self):
+        a, b = create_teams(2)
+        version = last_version()
+        data_version = get_data_version()
+
+        with mock.patch('league.changes.schedule_publish') as schedule_publish, \
+                self.captureOnCommitCallbacks(execute=True):
+            notify_bulk_change(Team, [a.pk, b.pk], ['/equipes/'])
+            # Version des données changée seulement à la validation
+            self.assertEqual(get_data_version(), data_version)
+
+        self.assertGreater(get_data_version(), data_version)
+        schedule_publish.assert_called_once_with(['/equipes/'])
+        self.assertEqual(
+            list(ChangeLogEntry.objects.filter(pk__gt=version).values_list('kind', 'object_id')),
+            [('team', a.pk), ('team', b.pk)],
+        )
+        self.assertEqual(len(changes_since(version)['changes']['teams']), 2)
+
+
+class BulkValidateTests(TestCase):
+    """views.validate_results_bulk : résultats validés en une requête, matchs joués."""
+
+    def test_validates_results_and_marks_matches_played(self):
+        a, b, c = create_teams(3)
+        first = play(a, b, 2, 0, validated=False)
+        second = play(b, c, 1, 1, validated=False)
+        other = play(c, a, 0, 1, matchday=2, validated=False)
+        version = last_version()
+        admin = User.objects.create_user('admin', password='secret', is_staff=True)
+        self.client.force_login(admin)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('league:validate_results_bulk'), {'matchday': 1})
+
+        self.assertRedirects(response, reverse('league:admin_dashboard'), fetch_redirect_response=False)
+        self.assertEqual(
+            set(Result.objects.filter(validated=True).values_list('pk', flat=True)),
+            {first.pk, second.pk},
+        )
+        self.assertEqual(
+            set(Match.objects.filter(is_played=True).values_list('pk', flat=True)),
+            {first.match_id, second.match_id},
+        )
+        self.assertFalse(Match.objects.get(pk=other.match_id).is_played)
+        self.assertEqual(standing_rows()[a.pk][-1], 3)
+
+        changes = changes_since(version)['changes']
+        self.assertEqual({row['id'] for row in changes['results']}, {first.pk, second.pk})
+        self.assertEqual(
+            {row['id']: row['is_played'] for row in changes['matches']},
+            {first.match_id: True, second.match_id: True},
+        )
+
+
+class CalendarTests(TestCase):
+    """league.calendars et league.scheduling : les matchs joués ne sont jamais touchés."""
+
+    def test_extend_keeps_matches_with_a_result(self):
+        c = create_teams(3)[2]
+        generate_calendar(shuffle=False)
+        matches = Match.objects.filter(home_team=c)
+        # Validé sans is_played (validate_result) et déclaré en attente
+        validated = Result.objects.create(match=matches[0], home_score=1, away_score=0, validated=True)
+        reported = Result.objects.create(match=matches[1], home_score=2, away_score=2)
+        c.is_active = False
+        c.save()
+
+        stats = extend_calendar()
+
+        self.assertEqual(stats['withdrawn'], 2)
+        self.assertTrue(Result.objects.filter(pk=validated.pk).exists())
+        self.assertTrue(Result.objects.filter(pk=reported.pk).exists())
+        self.assertEqual(
+            set(Match.objects.filter(Q(home_team=c) | Q(away_team=c)).values_list('pk', flat=True)),
+            {validated.match_id, reported.match_id},
+        )
+        self.assertEqual(Match.objects.count(), 4)
+
+    def test_reschedule_keeps_played_dates(self):
+        create_teams(3)
+        generate_calendar(shuffle=False)
+        schedule_matches(date(2026, 1, 5), [clock(20)])
+        match = Match.objects.order_by('pk').first()
+        play_date = match.date_played
+        Result.objects.create(match=match, home_score=1, away_score=0, validated=True)
+
+        stats = schedule_matches(date(2026, 3, 2), [clock(20)], reschedule=True)
+
+        self.assertEqual(stats['scheduled'], 5)
+        match.refresh_from_db()
+        self.assertEqual(match.date_played, play_date)
+        self.assertFalse(
+            Match.objects.exclude(pk=match.pk).filter(date_played__date__lt=date(2026, 3, 2)).exists()
+        )
+
+
+class PlanScheduleTests(TestCase):
+    """league.scheduling.plan_schedule : les matchs conservés comptent pour le repos et les séries."""
+
+    start = date(2026, 1, 5)
+
+    def days(self, count=30):
+        return evenings(self.start, end=self.start + timedelta(days=count))
+
+    def test_rest_after_kept_match(self):
+        assignment, _violations = plan_schedule(
+            [(10, 1, 2)], self.days(), [clock(20)], min_rest_days=2, kept=[(self.start, 1, 3)],
+        )
+
+        self.assertEqual(assignment[10][0], self.start + timedelta(days=3))
+
+    def test_rest_before_kept_match(self):
+        kept_day = self.start + timedelta(days=2)
+        assignment, _violations = plan_schedule(
+            [(10, 1, 2)], self.days(), [clock(20)], min_rest_days=2, kept=[(kept_day, 3, 1)],
+        )
+
+        self.assertEqual(assignment[10][0], kept_day + timedelta(days=3))
+
+    def test_venue_streak_counts_kept_matches(self):
+        kept = [(self.start, 1, 3), (self.start + timedelta(days=1), 1, 4)]
+        assignment, violations = plan_schedule(
+            [(10, 1, 2), (11, 3, 1)], self.days(), [clock(20)], max_venue_streak=2, kept=kept,
+        )
+
+        # Troisième match de suite à domicile refusé : l'équipe 1 joue d'abord à l'extérieur
+        self.assertEqual(violations, 0)
+        self.assertEqual(assignment[11][0], self.start + timedelta(days=2))
+        self.assertEqual(assignment[10][0], self.start + timedelta(days=3))
+
+
+def use_temporary_media(testcase):
+    """MEDIA_ROOT dans un dossier temporaire, supprimé après le test."""
+    media = tempfile.TemporaryDirectory()
+    testcase.addCleanup(media.cleanup)
+    media_root = override_settings(MEDIA_ROOT=media.name)
+    media_root.enable()
+    testcase.addCleanup(media_root.disable)
+
+
+def png_bytes(size):
+    buffer = BytesIO()
+    Image.new('RGB', (size, size), 'red').save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class LogoTests(TestCase):
+    """league.logos : un logo réduit change d'URL, tout ce qui pointait vers l'ancien est invalidé."""
+
+    def setUp(self):
+        use_temporary_media(self)
+
+    @override_settings(PUBLISH_STATIC_PAGES=True)
+    def test_resized_logo_invalidates_before_deleting(self):
+        team, = create_teams(1)
+        original = default_storage.save('teams/logo.png', ContentFile(png_bytes(settings.LOGO_MAX_SIZE * 2)))
+        Team.objects.filter(pk=team.pk).update(logo=original)
+        version = last_version()
+        data_version = get_data_version()
+
+        with mock.patch('league.changes.schedule_publish') as schedule_publish, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(process_team_logo(team.pk))
+            # Ancien fichier gardé jusqu'à la validation
+            self.assertTrue(default_storage.exists(original))
+
+        team.refresh_from_db()
+        self.assertNotEqual(team.logo.name, original)
+        self.assertFalse(default_storage.exists(original))
+        with Image.open(default_storage.open(team.logo.name)) as image:
+            self.assertEqual(image.size, (settings.LOGO_MAX_SIZE, settings.LOGO_MAX_SIZE))
+        self.assertGreater(get_data_version(), data_version)
+        self.assertIn(reverse('league:team_detail', args=[team.pk]), schedule_publish.call_args.args[0])
+        self.assertEqual(changes_since(version)['changes']['teams'][0]['logo'], team.logo.url)
+
+    def test_small_logo_is_kept(self):
+        team, = create_teams(1)
+        name = default_storage.save('teams/logo.png', ContentFile(png_bytes(32)))
+        Team.objects.filter(pk=team.pk).update(logo=name)
+
+        self.assertFalse(process_team_logo(team.pk))
+        self.assertTrue(default_storage.exists(name))
+
+
+def logos_zip(files):
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, content in files.items():
+            archive.writestr(name, content)
+    buffer.seek(0)
+    return buffer
+
+
+class ImportTeamsTests(TestCase):
+    """league.importing.import_teams : tout ou rien, simulation et invalidations faites à la main."""
+
+    csv = (
+        "Équipe;Joueur;Pseudo;logo\n"
+        "Lions de Goma;Amani;amani243;\n"
+        "Volcans FC;Baraka;baraka;volcans.png\n"
+    )
+
+    def setUp(self):
+        use_temporary_media(self)
+
+    def test_import_creates_teams_standings_and_changes(self):
+        version = ChangeLogEntry.objects.aggregate(version=Max('pk'))['version'] or 0
+        data_version = get_data_version()
+
+        with mock.patch('league.importing.enqueue') as enqueue, \
+                self.captureOnCommitCallbacks(execute=True):
+            report = import_teams(self.csv.encode(), logos_zip({'logos/volcans.png': png_bytes(64)}))
+
+        self.assertTrue(report.ok, report.errors)
+        self.assertEqual((len(report.teams), report.logos), (2, 1))
+        lions = Team.objects.get(name="Lions de Goma")
+        volcans = Team.objects.get(name="Volcans FC")
+        self.assertEqual(volcans.gamer_pseudo, "baraka")
+        self.assertFalse(lions.logo)
+        self.assertTrue(default_storage.exists(volcans.logo.name))
+        self.assertEqual(set(Standing.objects.values_list('team_id', flat=True)), {lions.pk, volcans.pk})
+
+        entries = set(ChangeLogEntry.objects.filter(pk__gt=version).values_list('kind', 'object_id'))
+        standing_ids = Standing.objects.values_list('pk', flat=True)
+        self.assertEqual(entries, {('team', lions.pk), ('team', volcans.pk)} | {
+            ('standing', pk) for pk in standing_ids
+        })
+        self.assertGreater(get_data_version(), data_version)
+        enqueue.assert_called_once_with('process_team_logos', team_ids=[volcans.pk])
+
+    def test_one_invalid_row_writes_nothing(self):
+        create_teams(1)
+        csv = self.csv + "équipe 01;Doublon;doublon;\nX;;;\n"
+
+        report = import_teams(csv, logos_zip({'volcans.png': b"pas une image"}))
+
+        self.assertFalse(report.ok)
+        self.assertEqual([line for line, _message in report.errors], [3, 4, 5])
+        self.assertIn("invalide", report.errors[0][1])
+        self.assertIn("existe déjà", report.errors[1][1])
+        self.assertIn("'player_name' est obligatoire", report.errors[2][1])
+        self.assertEqual(Team.objects.count(), 1)
+        self.assertEqual(Standing.objects.count(), 1)
+
+    def test_dry_run_writes_nothing(self):
+        entries = ChangeLogEntry.objects.count()
+
+        report = import_teams(self.csv, logos_zip({'volcans.png': png_bytes(64)}), dry_run=True)
+
+        self.assertTrue(report.ok, report.errors)
+        self.assertEqual([team.name for team in report.teams], ["Lions de Goma", "Volcans FC"])
+        self.assertEqual(report.logos, 1)
+        self.assertFalse(Team.objects.exists())
+        self.assertEqual(ChangeLogEntry.objects.count(), entries)
+        self.assertFalse(default_storage.exists('teams'))
+
+    def test_failed_write_removes_saved_logos(self):
+        with mock.patch('league.importing.notify_bulk_change', side_effect=RuntimeError("panne")), \
+                self.assertRaises(RuntimeError):
+            import_teams(self.csv, logos_zip({'volcans.png': png_bytes(64)}))
+
+        self.assertFalse(Team.objects.exists())
+        self.assertEqual(default_storage.listdir('teams')[1], [])
+
+
+@override_settings(LEAGUE_ASYNC_JOBS=True, JOB_MAX_ATTEMPTS=3, JOB_RETRY_DELAY=30)
+class JobTests(TestCase):
+    """league.jobs : dédoublonnage, nouveaux essais et reprise des tâches abandonnées."""
+
+    def claim_and_fail(self):
+        job = jobs.claim_next_job()
+        with mock.patch('league.jobs.run_task', side_effect=RuntimeError("échec")), \
+                self.assertLogs('league.jobs', 'ERROR'):
+            return jobs.run_job(job)
+
+    def test_enqueue_deduplicates_pending_jobs(self):
+        first = jobs.enqueue('publish_pages', urls=['/'])
+
+        self.assertEqual(jobs.enqueue('publish_pages', urls=['/']), first)
+        self.assertNotEqual(jobs.enqueue('publish_pages', urls=['/classement/']), first)
+        # Une tâche en cours n'absorbe pas un nouvel ajout : les données ont pu changer depuis
+        Job.objects.filter(pk=first.pk).update(status='running')
+        self.assertNotEqual(jobs.enqueue('publish_pages', urls=['/']), first)
+
+    def test_enqueue_unknown_task(self):
+        with self.assertRaises(ValueError):
+            jobs.enqueue('inconnue')
+
+    def test_concurrent_enqueue_reuses_the_winner(self):
+        create_job = jobs._create_job
+        winner = []
+
+        def racing(name, kwargs, key):
+            # Une autre requête ajoute la même tâche entre la recherche et l'insertion
+            winner.append(Job.objects.create(
+                name=name, kwargs=kwargs, dedup_key=key, run_after=timezone.now(),
+            ))
+            return create_job(name, kwargs, key)
+
+        with mock.patch('league.jobs._create_job', side_effect=racing):
+            job = jobs.enqueue('rebuild_ratings')
+
+        self.assertEqual(job, winner[0])
+        self.assertEqual(Job.objects.filter(name='rebuild_ratings').count(), 1)
+
+    def test_pending_dedup_constraint(self):
+        job = jobs.enqueue('rebuild_ratings')
+
+        with self.assertRaises(IntegrityError):
+            Job.objects.create(name=job.name, dedup_key=job.dedup_key, run_after=timezone.now())
+
+    def test_failed_job_is_retried_with_backoff(self):
+        jobs.enqueue('rebuild_ratings')
+
+        delays = []
+        for _attempt in range(2):
+            before = timezone.now()
+            job = self.claim_and_fail()
+            self.assertEqual(job.status, 'pending')
+            self.assertIn("échec", job.last_error)
+            delays.append((job.run_after - before).total_seconds())
+            # Nouvel essai prêt tout de suite
+            Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+
+        self.assertAlmostEqual(delays[0], 30, delta=5)
+        self.assertAlmostEqual(delays[1], 60, delta=5)
+        job = self.claim_and_fail()
+        self.assertEqual((job.status, job.attempts), ('failed', 3))
+        self.assertIsNone(jobs.claim_next_job())
+
+    def test_retry_yields_to_an_identical_pending_job(self):
+        jobs.enqueue('rebuild_ratings')
+        job = jobs.claim_next_job()
+        newer = jobs.enqueue('rebuild_ratings')
+
+        with mock.patch('league.jobs.run_task', side_effect=RuntimeError("échec")), \
+                self.assertLogs('league.jobs', 'ERROR'):
+            job = jobs.run_job(job)
+
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(list(Job.objects.filter(status='pending')), [newer])
+
+    def test_requeue_stale_jobs(self):
+        stale = jobs.enqueue('rebuild_ratings')
+        duplicated = jobs.enqueue('publish_pages', urls=['/'])
+        long_ago = timezone.now() - timedelta(seconds=settings.JOB_TIMEOUT + 1)
+        Job.objects.filter(pk__in=[stale.pk, duplicated.pk]).update(status='running', started_at=long_ago)
+        recent = jobs.enqueue('extend_calendar')
+        Job.objects.filter(pk=recent.pk).update(status='running', started_at=timezone.now())
+        pending = jobs.enqueue('publish_pages', urls=['/'])
+
+        self.assertEqual(jobs.requeue_stale_jobs(), 1)
+
+        statuses = dict(Job.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[stale.pk], 'pending')
+        # Une tâche identique attend déjà : l'abandonnée passe en échec
+        self.assertEqual(statuses[duplicated.pk], 'failed')
+        self.assertEqual(statuses[pending.pk], 'pending')
+        self.assertEqual(statuses[recent.pk], 'running')
+
+    def test_lock_row_is_created_on_first_use(self):
+        self.assertTrue(DatabaseLock.objects.filter(name='league-jobs').exists())
+
+        with transaction.atomic():
+            _lock_row('league-test')
+            _lock_row('league-test')
+
+        self.assertTrue(DatabaseLock.objects.filter(name='league-test').exists())
+
+
+class ConcurrentStandingsTests(TransactionTestCase):
+    """
+    Recalculs concurrents du classement (league.locking) : plusieurs threads,
+    chacun avec sa connexion, comme plusieurs admins en même temps.
+    """
+
+    def run_threads(self, target, args_list):
+        """Lance un thread par jeu d'arguments ; les erreurs des threads sont collectées dans `errors`."""
+        errors = []
+
+        def run(*args):
+            try:
+                target(*args)
+            except Exception as exc:  # remontée dans le thread principal
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=run, args=args) for args in args_list]
+        for thread in threads:
+            thread.start()
+        return threads, errors
+
+    def assert_standings_exact(self):
+        teams = Team.objects.values_list('pk', 'name')
+        self.assertEqual(standing_rows(), table_rows(build_table(teams, validated_scores())))
+        positions = sorted(Standing.objects.values_list('position', flat=True))
+        self.assertEqual(positions, list(range(1, len(positions) + 1)))
+
+    def test_concurrent_writes_lose_no_update(self):
+        teams = create_teams(6)
+        matches = [
+            Match.objects.create(home_team=home, away_team=away, matchday=1)
+            for home, away in itertools.permutations(teams, 2)
+        ]
+        shares = [matches[index::5] for index in range(5)]
+        barrier = threading.Barrier(len(shares))
+
+        def admin(share):
+            barrier.wait()
+            for number, match in enumerate(share):
+                Result.objects.create(
+                    match=match, home_score=number % 4, away_score=(number * 3) % 5, validated=True
+                )
+
+        threads, errors = self.run_threads(admin, [(share,) for share in shares])
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(Result.objects.count(), len(matches))
+        self.assert_standings_exact()
+
+    def test_requests_during_a_recalculation_are_coalesced(self):
+        teams = create_teams(4)
+        matches = [
+            Match.objects.create(home_team=home, away_team=away, matchday=1)
+            for home, away in itertools.permutations(teams, 2)
+        ][:6]
+
+        # Un recalcul en cours bloque le regroupement jusqu'à `release`
+        running = threading.Event()
+        release = threading.Event()
+
+        def blocking_recalculation():
+            running.set()
+            release.wait(10)
+
+        holder = threading.Thread(target=standings_coalescer.run, args=(blocking_recalculation,))
+        holder.start()
+        self.assertTrue(running.wait(10))
+        before = standings_coalescer.stats()
+
+        def admin(match):
+            Result.objects.create(match=match, home_score=2, away_score=1, validated=True)
+
+        threads, errors = self.run_threads(admin, [(match,) for match in matches])
+        # Chaque admin a validé son résultat et attend le recalcul en cours
+        deadline = time.monotonic() + 10
+        while standings_coalescer.stats()['requested'] - before['requested'] < len(matches):
+            self.assertLess(time.monotonic(), deadline, "les recalculs n'ont pas été demandés")
+            time.sleep(0.01)
+        release.set()
+        holder.join()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        stats = standings_coalescer.stats()
+        # Le recalcul bloquant, puis un seul recalcul pour les six demandes
+        self.assertEqual(stats['requested'] - before['requested'], len(matches))
+        self.assertEqual(stats['runs'] - before['runs'], 2)
+        self.assert_standings_exact()
@@ -17,6 +17,7 @@ urlpatterns = [
     path('calendrier/', views.match_list, name='match_list'),
     path('resultats/', views.result_list, name='result_list'),
     path('classement/', views.standings, name='standings'),
+    path('classement-elo/', views.ratings, name='ratings'),
     path('phase-finale/', views.playoffs, name='playoffs'),
     path('reglement/', views.rules, name='rules'),
 
@@ -36,6 +37,7 @@ urlpatterns = [
     # ADMIN - ÉQUIPES CRUD
     # ========================
     path('admin-panel/equipe/ajouter/', views.team_create, name='team_create'),
+    path('admin-panel/equipes/importer/', views.team_import, name='team_import'),
     path('admin-panel/equipe/<int:pk>/modifier/', views.team_edit, name='team_edit'),
     path('admin-panel/equipe/<int:pk>/supprimer/', views.team_delete, name='team_delete'),
 
@@ -49,6 +51,7 @@ urlpatterns = [
     # ========================
     path('admin-panel/match/<int:match_id>/resultat/', views.add_result, name='add_result'),
     path('admin-panel/resultat/<int:result_id>/valider/', views.validate_result, name='validate_result'),
+    path('admin-panel/resultats/valider/', views.validate_results_bulk, name='validate_results_bulk'),
 
     # ========================
     # ADMIN - PHASE FINALE
@@ -69,5 +72,12 @@ urlpatterns = [
     # API JSON
     # ========================
     path('api/standings/', views.api_standings, name='api_standings'),
+    path('api/ratings/', views.api_ratings, name='api_ratings'),
+    path('api/snapshot/', views.api_snapshot, name='api_snapshot'),
+    path('api/changes/', views.api_changes, name='api_changes'),
     path('api/goals-stats/', views.api_goals_stats, name='api_goals_stats'),
+    path('api/playoff-odds/', views.api_playoff_odds, name='api_playoff_odds'),
+    path('api/what-if/', views.api_what_if, name='api_what_if'),
+    path('api/standings/history/', views.api_standings_history, name='api_standings_history'),
+    path('api/teams/search/', views.api_team_search, name='api_team_search'),
 ]
\ No newline at end of file
@@ -3,22 +3,49 @@ Vues pour GOMA-Efootball League.
 Gère toutes les pages et la logique métier.
 """
 
-import random
-from itertools import combinations
+import time
+from itertools import combinations, groupby
 
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, authenticate, logout, update_session_auth_hash
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.db.models import Sum, Q, Count
-from django.http import JsonResponse
-
-from .models import Team, Match, Result, Standing, AdminProfile, PlayoffMatch
+from django.core.paginator import Paginator
+from django.db import router, transaction
+from django.db.models import Sum, Q, Count, F
+from django.http import JsonResponse, StreamingHttpResponse
+from django.template.loader import get_template, render_to_string
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.safestring import mark_safe
+
+from .cache import get_or_refresh
+from .changes import changes_since, notify_bulk_change, record_changes
+from .importing import import_teams
+from .jobs import enqueue
+from .models import (
+    Team, Match, Result, ResultEvent, Standing, TeamRating, AdminProfile, PlayoffMatch
+)
 from .forms import (
     TeamForm, ResultForm, PlayoffResultForm,
-    AdminUserForm, CustomPasswordChangeForm, GenerateCalendarForm
+    AdminUserForm, CustomPasswordChangeForm, GenerateCalendarForm,
+    BulkValidateResultsForm, TeamImportForm
 )
-from .signals import recalculate_all_standings
+from .ratings import apply_result, ratings_table
+from .replay import standings_as_of
+from .snapshot import build_snapshot, parse_fields
+from .simulation import DEFAULT_RUNS, MODEL_UNIFORM, MODELS, RUN_CHOICES, get_playoff_odds
+from .search import DEFAULT_LIMIT, MAX_LIMIT, search_teams
+from .tables import build_table
+
+
+# Résultats en attente affichés par page sur le dashboard admin
+PENDING_RESULTS_PER_PAGE = 25
+
+# Calendrier en flux : matchs lus par lots, journée insérée à la place du marqueur
+MATCH_LIST_CHUNK_SIZE = 200
+MATCHES_PLACEHOLDER = mark_safe('<!-- league:matches -->')
 
 
 def is_admin(request):
@@ -30,31 +57,35 @@ def is_admin(request):
 # VUES PUBLIQUES
 # ========================
 
-def home(request):
-    """Page d'accueil - Dashboard avec statistiques générales."""
+def _home_stats():
+    """Statistiques de la page d'accueil (mises en cache par get_or_refresh)."""
     teams = Team.objects.filter(is_active=True)
     total_teams = teams.count()
     total_matches = Match.objects.count()
     matches_played = Match.objects.filter(is_played=True).count()
     matches_remaining = total_matches - matches_played
 
-    results = Result.objects.filter(validated=True)
-    total_goals = 0
-    for r in results:
-        total_goals += r.home_score + r.away_score
+    total_goals = Result.objects.filter(validated=True).aggregate(
+        total=Sum(F('home_score') + F('away_score'))
+    )['total'] or 0
 
     avg_goals = round(total_goals / matches_played, 2) if matches_played > 0 else 0
 
-    top_standings = Standing.objects.all().order_by(
+    # Listes évaluées ici : la valeur mise en cache ne fait plus de requête
+    top_standings = list(Standing.objects.select_related('team').order_by(
         '-points', '-goal_difference', '-goals_for'
-    )[:5]
-
-    last_results = Result.objects.filter(validated=True).order_by('-created_at')[:5]
-    next_matches = Match.objects.filter(is_played=False).order_by('matchday')[:5]
-    best_attack = Standing.objects.order_by('-goals_for').first()
-    best_defense = Standing.objects.order_by('goals_against').first()
-
-    context = {
+    )[:5])
+
+    last_results = list(Result.objects.filter(validated=True).select_related(
+        'match__home_team', 'match__away_team'
+    ).order_by('-created_at')[:5])
+    next_matches = list(Match.objects.filter(is_played=False).select_related(
+        'home_team', 'away_team'
+    ).order_by('matchday')[:5])
+    best_attack = Standing.objects.select_related('team').order_by('-goals_for').first()
+    best_defense = Standing.objects.select_related('team').order_by('goals_against').first()
+
+    return {
         'total_teams': total_teams,
         'total_matches': total_matches,
         'matches_played': matches_played,
@@ -68,6 +99,11 @@ def home(request):
         'best_defense': best_defense,
         'progress': round((matches_played / total_matches * 100), 1) if total_matches > 0 else 0,
     }
+
+
+def home(request):
+    """Page d'accueil - Dashboard avec statistiques générales."""
+    context = get_or_refresh('home', _home_stats)
     return render(request, 'league/home.html', context)
 
 
@@ -110,21 +146,39 @@ def team_detail(request, pk):
             else:
                 form_results.append('D')
 
+    rating = TeamRating.objects.filter(team=team).first()
+    rating_rank = None
+    if rating is not None:
+        rating_rank = TeamRating.objects.filter(
+            team__is_active=True, rating__gt=rating.rating
+        ).count() + 1
+
     context = {
         'team': team,
         'matches': matches,
         'standing': standing,
         'results': results,
         'form_results': form_results,
+        'rating': rating,
+        'rating_rank': rating_rank,
     }
     return render(request, 'league/teams/team_detail.html', context)
 
 
 def match_list(request):
-    """Calendrier des matchs avec filtres."""
-    matches = Match.objects.all().order_by('phase', 'matchday')
+    """
+    Calendrier des matchs avec filtres.
+    La page est envoyée en flux : l'en-tête tout de suite, puis chaque
+    journée dès qu'elle est rendue. Les matchs sont lus par lots
+    (.iterator()), la mémoire ne dépend pas de la taille du calendrier.
+    """
+    matches = Match.objects.select_related(
+        'home_team', 'away_team', 'result'
+    ).order_by('phase', 'matchday', 'pk')
 
     team_filter = request.GET.get('team')
+    if team_filter and not team_filter.isdigit():
+        team_filter = None
     if team_filter:
         matches = matches.filter(
             Q(home_team_id=team_filter) | Q(away_team_id=team_filter)
@@ -147,32 +201,56 @@ def match_list(request):
 
     matchdays = Match.objects.values_list('matchday', flat=True).distinct().order_by('matchday')
 
-    grouped_matches = {}
-    for match in matches:
-        key = f"{match.get_phase_display()} - Journée {match.matchday}"
-        if key not in grouped_matches:
-            grouped_matches[key] = []
-        grouped_matches[key].append(match)
-
-    teams = Team.objects.filter(is_active=True).order_by('name')
+    # Le filtre équipe utilise l'autocomplétion : seul le nom de l'équipe choisie est chargé
+    team_filter_name = ''
+    if team_filter:
+        team_filter_name = Team.objects.filter(pk=team_filter).values_list(
+            'name', flat=True
+        ).first() or ''
 
     context = {
-        'grouped_matches': grouped_matches,
-        'teams': teams,
+        'matches_placeholder': MATCHES_PLACEHOLDER,
         'matchdays': matchdays,
         'team_filter': team_filter,
+        'team_filter_name': team_filter_name,
         'matchday_filter': matchday_filter,
         'phase_filter': phase_filter,
         'status_filter': status_filter,
     }
-    return render(request, 'league/matches/match_list.html', context)
+    page = render_to_string('league/matches/match_list.html', context, request=request)
+    head, tail = page.split(MATCHES_PLACEHOLDER, 1)
+
+    # Base choisie maintenant : le flux est lu après la sortie des middlewares (routage)
+    matches = matches.using(router.db_for_read(Match))
+    return StreamingHttpResponse(_stream_match_list(head, tail, matches, is_admin(request)))
+
+
+def _stream_match_list(head, tail, matches, can_edit):
+    """Génère la page du calendrier morceau par morceau, une journée à la fois."""
+    yield head
+    matchday_template = get_template('league/matches/_matchday.html')
+    empty = True
+    for (_phase, matchday), group in groupby(
+        matches.iterator(chunk_size=MATCH_LIST_CHUNK_SIZE),
+        key=lambda match: (match.phase, match.matchday),
+    ):
+        group = list(group)
+        empty = False
+        yield matchday_template.render({
+            'group_name': f"{group[0].get_phase_display()} - Journée {matchday}",
+            'matches': group,
+            'can_edit': can_edit,
+        })
+    if empty:
+        yield get_template('league/matches/_no_matches.html').render({'can_edit': can_edit})
+    yield tail
 
 
-def result_list(request):
-    """Liste des résultats."""
-    results = Result.objects.filter(validated=True).order_by(
-        '-match__phase', '-match__matchday'
-    )
+def _grouped_results():
+    """Résultats validés groupés par phase et journée."""
+    results = Result.objects.filter(validated=True).select_related(
+        'match__home_team', 'match__away_team'
+    ).order_by('-match__phase', '-match__matchday')
 
     grouped_results = {}
     for result in results:
@@ -180,32 +258,37 @@ def result_list(request):
         if key not in grouped_results:
             grouped_results[key] = []
         grouped_results[key].append(result)
+    return grouped_results
 
+
+def result_list(request):
+    """Liste des résultats."""
     context = {
-        'grouped_results': grouped_results,
+        'grouped_results': get_or_refresh('results', _grouped_results),
     }
     return render(request, 'league/results/result_list.html', context)
 
 
 def standings(request):
     """Page classement."""
-    standings_list = Standing.objects.all().order_by(
-        '-points', '-goal_difference', '-goals_for'
-    )
+    # Les positions sont tenues à jour par signals.recalculate_all_standings
+    context = {
+        'standings': get_or_refresh('standings', lambda: list(
+            Standing.objects.select_related('team').order_by(
+                '-points', '-goal_difference', '-goals_for'
+            )
+        )),
+    }
+    return render(request, 'league/standings/standings.html', context)
 
-    for index, standing in enumerate(standings_list, 1):
-        if standing.position != index:
-            standing.position = index
-            standing.save(update_fields=['position'])
-
-    standings_list = Standing.objects.all().order_by(
-        '-points', '-goal_difference', '-goals_for'
-    )
 
+def ratings(request):
+    """Page classement Elo."""
     context = {
-        'standings': standings_list,
+        'ratings': get_or_refresh('ratings', ratings_table),
+        'initial_rating': settings.ELO_INITIAL_RATING,
     }
-    return render(request, 'league/standings/standings.html', context)
+    return render(request, 'league/standings/ratings.html', context)
 
 
 def playoffs(request):
@@ -322,29 +405,43 @@ def admin_dashboard(request):
         messages.warning(request, "Veuillez vous connecter en tant qu'admin.")
         return redirect('league:login')
 
-    teams = Team.objects.filter(is_active=True)
-    total_teams = teams.count()
-    total_matches = Match.objects.count()
-    matches_played = Match.objects.filter(is_played=True).count()
-    matches_not_played = Match.objects.filter(is_played=False).count()
-    unvalidated_results = Result.objects.filter(validated=False).count()
+    total_teams = Team.objects.filter(is_active=True).count()
 
-    pending_results = Result.objects.filter(validated=False).order_by('-created_at')
+    # Une requête d'agrégats conditionnels par table
+    match_stats = Match.objects.aggregate(
+        total=Count('id'),
+        played=Count('id', filter=Q(is_played=True)),
+    )
+    result_stats = Result.objects.aggregate(
+        unvalidated=Count('id', filter=Q(validated=False)),
+        total_goals=Sum(F('home_score') + F('away_score'), filter=Q(validated=True)),
+    )
+    total_matches = match_stats['total']
+    matches_played = match_stats['played']
+    unvalidated_results = result_stats['unvalidated']
 
-    results = Result.objects.filter(validated=True)
-    total_goals = sum(r.home_score + r.away_score for r in results)
+    # File de validation paginée
+    pending_queryset = Result.objects.filter(validated=False).select_related(
+        'match__home_team', 'match__away_team'
+    ).order_by('-created_at')
+    paginator = Paginator(pending_queryset, PENDING_RESULTS_PER_PAGE)
+    paginator.count = unvalidated_results  # déjà compté ci-dessus
+    pending_page = paginator.get_page(request.GET.get('page'))
 
     # Matchs non joués pour ajout rapide de résultats
-    unplayed_matches = Match.objects.filter(is_played=False).order_by('phase', 'matchday')[:10]
+    unplayed_matches = Match.objects.filter(is_played=False).select_related(
+        'home_team', 'away_team'
+    ).order_by('phase', 'matchday')[:10]
 
     context = {
         'total_teams': total_teams,
         'total_matches': total_matches,
         'matches_played': matches_played,
-        'matches_not_played': matches_not_played,
+        'matches_not_played': total_matches - matches_played,
         'unvalidated_results': unvalidated_results,
-        'pending_results': pending_results,
-        'total_goals': total_goals,
+        'pending_page': pending_page,
+        'pending_results': pending_page.object_list,
+        'total_goals': result_stats['total_goals'] or 0,
         'calendar_generated': total_matches > 0,
         'unplayed_matches': unplayed_matches,
     }
@@ -362,7 +459,9 @@ def team_create(request):
     if request.method == 'POST':
         form = TeamForm(request.POST, request.FILES)
         if form.is_valid():
-            form.save()
+            team = form.save()
+            if team.logo:
+                enqueue('process_team_logo', team_id=team.pk)
             messages.success(request, "Équipe créée avec succès !")
             return redirect('league:team_list')
         else:
@@ -378,6 +477,47 @@ def team_create(request):
     return render(request, 'league/teams/team_form.html', context)
 
 
+def team_import(request):
+    """Importer des équipes en masse depuis un CSV et une archive de logos."""
+    if not is_admin(request):
+        messages.warning(request, "Veuillez vous connecter en tant qu'admin.")
+        return redirect('league:login')
+
+    report = None
+    if request.method == 'POST':
+        form = TeamImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            started = time.perf_counter()
+            report = import_teams(
+                form.cleaned_data['csv_file'].read(),
+                logos_zip=form.cleaned_data['logos'],
+                dry_run=form.cleaned_data['dry_run'],
+            )
+            elapsed = (time.perf_counter() - started) * 1000
+            if not report.ok:
+                messages.error(request, f"{len(report.errors)} ligne(s) invalide(s) : aucune équipe importée.")
+            elif report.dry_run:
+                messages.info(
+                    request,
+                    f"Vérification réussie : {len(report.teams)} équipe(s) et {report.logos} logo(s) prêts."
+                )
+            else:
+                messages.success(
+                    request,
+                    f"{len(report.teams)} équipe(s) importée(s) avec {report.logos} logo(s) "
+                    f"en {elapsed:.0f} ms."
+                )
+                return redirect('league:team_list')
+    else:
+        form = TeamImportForm()
+
+    context = {
+        'form': form,
+        'report': report,
+    }
+    return render(request, 'league/teams/team_import.html', context)
+
+
 def team_edit(request, pk):
     """Modifier une équipe existante."""
     if not is_admin(request):
@@ -389,6 +529,8 @@ def team_edit(request, pk):
         form = TeamForm(request.POST, request.FILES, instance=team)
         if form.is_valid():
             form.save()
+            if 'logo' in form.changed_data and team.logo:
+                enqueue('process_team_logo', team_id=team.pk)
             messages.success(request, f"Équipe '{team.name}' modifiée avec succès !")
             return redirect('league:team_list')
         else:
@@ -432,61 +574,28 @@ def generate_calendar(request):
     if request.method == 'POST':
         form = GenerateCalendarForm(request.POST)
         if form.is_valid():
-            Match.objects.all().delete()
-            Result.objects.all().delete()
-
-            teams = list(Team.objects.filter(is_active=True))
-            num_teams = len(teams)
-
-            if num_teams < 2:
+            if Team.objects.filter(is_active=True).count() < 2:
                 messages.error(request, "Il faut au moins 2 équipes.")
                 return redirect('league:generate_calendar')
 
-            if form.cleaned_data.get('shuffle', True):
-                random.shuffle(teams)
-
-            if num_teams % 2 != 0:
-                teams.append(None)
-                num_teams += 1
-
-            num_matchdays = num_teams - 1
-            matches_per_day = num_teams // 2
-
-            schedule = list(teams)
-            for matchday in range(1, num_matchdays + 1):
-                for i in range(matches_per_day):
-                    home = schedule[i]
-                    away = schedule[num_teams - 1 - i]
-
-                    if home is not None and away is not None:
-                        Match.objects.create(
-                            home_team=home,
-                            away_team=away,
-                            matchday=matchday,
-                            phase='aller'
-                        )
-
-                schedule = [schedule[0]] + [schedule[-1]] + schedule[1:-1]
-
-            aller_matches = Match.objects.filter(phase='aller')
-            for match in aller_matches:
-                Match.objects.create(
-                    home_team=match.away_team,
-                    away_team=match.home_team,
-                    matchday=match.matchday,
-                    phase='retour'
+            if form.cleaned_data['mode'] == GenerateCalendarForm.MODE_INCREMENTAL:
+                job = enqueue('extend_calendar')
+                if job is None:
+                    messages.success(request, "Calendrier mis à jour, les matchs joués sont conservés.")
+            else:
+                job = enqueue('generate_calendar', shuffle=form.cleaned_data.get('shuffle', True))
+                if job is None:
+                    total = Match.objects.count()
+                    messages.success(
+                        request,
+                        f"Calendrier généré ! {total} matchs créés."
+                    )
+            if job is not None:
+                messages.info(
+                    request,
+                    "Génération du calendrier lancée : les matchs apparaîtront dans quelques instants."
                 )
 
-            total = Match.objects.count()
-            messages.success(
-                request,
-                f"Calendrier généré ! {total} matchs créés."
-            )
-
-            Standing.objects.all().delete()
-            for team in Team.objects.filter(is_active=True):
-                Standing.objects.create(team=team)
-
             return redirect('league:match_list')
     else:
         form = GenerateCalendarForm()
@@ -496,6 +605,7 @@ def generate_calendar(request):
         'form': form,
         'teams': teams,
         'team_count': teams.count(),
+        'calendar_generated': Match.objects.exists(),
     }
     return render(request, 'league/matches/generate_calendar.html', context)
 
@@ -565,6 +675,63 @@ def validate_result(request, result_id):
     return redirect('league:admin_dashboard')
 
 
+def validate_results_bulk(request):
+    """
+    Valide plusieurs résultats en attente en une seule requête UPDATE
+    (sélection ou journée entière), puis recalcule le classement une seule fois.
+    """
+    if not is_admin(request):
+        return redirect('league:login')
+
+    if request.method != 'POST':
+        return redirect('league:admin_dashboard')
+
+    form = BulkValidateResultsForm(request.POST)
+    if not form.is_valid():
+        messages.error(request, "Sélectionnez des résultats ou une journée à valider.")
+        return redirect('league:admin_dashboard')
+
+    started = time.perf_counter()
+    with transaction.atomic():
+        pending = Result.objects.filter(validated=False)
+        if form.cleaned_data['result_ids']:
+            pending = pending.filter(pk__in=form.cleaned_data['result_ids'])
+        else:
+            pending = pending.filter(match__matchday=form.cleaned_data['matchday'])
+            if form.cleaned_data['phase']:
+                pending = pending.filter(match__phase=form.cleaned_data['phase'])
+
+        # update() ne déclenche pas les signals (un seul recalcul ensuite)
+        # et ne touche pas updated_at (auto_now) : date fixée ici
+        result_ids = list(pending.values_list('pk', flat=True))
+        validated = Result.objects.filter(pk__in=result_ids)
+        validated_count = validated.update(
+            validated=True, validated_by=request.user, updated_at=timezone.now()
+        )
+        if validated_count:
+            # Matchs joués, comme après la saisie d'un résultat (add_result)
+            played = Match.objects.filter(result__pk__in=result_ids, is_played=False)
+            match_ids = list(played.values_list('pk', flat=True))
+            Match.objects.filter(pk__in=match_ids).update(is_played=True)
+            record_changes(Match, match_ids)
+            validated = list(validated.select_related('match').order_by('created_at', 'pk'))
+            ResultEvent.objects.bulk_create(ResultEvent.from_result(result) for result in validated)
+            for result in validated:
+                apply_result(result)
+            enqueue('recompute_standings')
+            notify_bulk_change(Result, result_ids)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    if validated_count:
+        messages.success(
+            request,
+            f"{validated_count} résultat(s) validé(s) en {elapsed:.0f} ms."
+        )
+    else:
+        messages.info(request, "Aucun résultat en attente ne correspond.")
+    return redirect('league:admin_dashboard')
+
+
 # --- Phase Finale ---
 
 def generate_playoffs(request):
@@ -773,9 +940,8 @@ def delete_admin(request, pk):
 # API JSON
 # ========================
 
-def api_standings(request):
-    """Retourne le classement en JSON."""
-    standings_data = Standing.objects.all().order_by(
+def _standings_data():
+    standings_data = Standing.objects.select_related('team').order_by(
         '-points', '-goal_difference', '-goals_for'
     )
     data = []
@@ -791,7 +957,45 @@ def api_standings(request):
             'goals_against': s.goals_against,
             'goal_difference': s.goal_difference,
         })
-    return JsonResponse({'standings': data})
+    return data
+
+
+def api_standings(request):
+    """Retourne le classement en JSON."""
+    return JsonResponse({'standings': get_or_refresh('api_standings', _standings_data)})
+
+
+def api_ratings(request):
+    """Retourne le classement Elo en JSON."""
+    return JsonResponse({'ratings': get_or_refresh('ratings', ratings_table)})
+
+
+def api_snapshot(request):
+    """
+    Retourne en un seul appel classement, derniers résultats, prochains matchs,
+    phase finale, attaques et Elo en JSON (clients mobiles).
+    Paramètre : ?fields=standings,results,... (par défaut : toutes les sections).
+    """
+    try:
+        fields = parse_fields(request.GET.get('fields', ''))
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    return JsonResponse(build_snapshot(fields), json_dumps_params={'separators': (',', ':')})
+
+
+def api_changes(request):
+    """
+    Retourne les modifications depuis une version du journal en JSON :
+    ?since=<version>. Sans version, ou si le client est trop en retard,
+    la réponse indique une resynchronisation complète (resync).
+    """
+    since = request.GET.get('since')
+    if since is not None:
+        try:
+            since = int(since)
+        except ValueError:
+            return JsonResponse({'error': "Le paramètre 'since' doit être un entier."}, status=400)
+    return JsonResponse(changes_since(since), json_dumps_params={'separators': (',', ':')})
 
 
 def api_goals_stats(request):
@@ -802,4 +1006,149 @@ def api_goals_stats(request):
         'goals_for': [s.goals_for for s in standings_data],
         'goals_against': [s.goals_against for s in standings_data],
     }
-    return JsonResponse(data)
\ No newline at end of file
+    return JsonResponse(data)
+
+
+def api_playoff_odds(request):
+    """
+    Retourne les chances de qualification en phase finale en JSON.
+    Paramètres : ?model=uniform|rating et ?runs=5000|20000.
+    """
+    model = request.GET.get('model', MODEL_UNIFORM)
+    if model not in MODELS:
+        return JsonResponse({'error': f"Modèle inconnu : {model}"}, status=400)
+
+    # Nombres de simulations fixés : chaque valeur est précalculée et mise en cache
+    try:
+        runs = int(request.GET.get('runs', DEFAULT_RUNS))
+    except ValueError:
+        runs = None
+    if runs not in RUN_CHOICES:
+        choices = ' ou '.join(str(choice) for choice in RUN_CHOICES)
+        return JsonResponse({'error': f"Le paramètre 'runs' doit valoir {choices}."}, status=400)
+
+    return JsonResponse(get_playoff_odds(runs=runs, model=model))
+
+
+def _parse_hypothetical_scores(raw):
+    """
+    Lit des scores hypothétiques au format "12:2-1,15:0-0"
+    (identifiant du match : score domicile - score extérieur).
+    """
+    scores = {}
+    for item in filter(None, (part.strip() for part in raw.split(','))):
+        try:
+            match_id, score = item.split(':')
+            home_score, away_score = (int(value) for value in score.split('-'))
+            match_id = int(match_id)
+        except ValueError:
+            raise ValueError(f"Score invalide : '{item}' (attendu : id:domicile-extérieur).")
+        if not (0 <= home_score <= 99 and 0 <= away_score <= 99):
+            raise ValueError(f"Score hors limites : '{item}'.")
+        scores[match_id] = (home_score, away_score)
+    return scores
+
+
+def api_what_if(request):
+    """
+    Retourne le classement projeté en JSON avec des scores hypothétiques
+    pour des matchs non joués : ?scores=12:2-1,15:0-0.
+    Calculé en mémoire, sans aucune écriture en base.
+    """
+    started = time.perf_counter()
+    try:
+        hypotheticals = _parse_hypothetical_scores(request.GET.get('scores', ''))
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+
+    fixtures = {}
+    if hypotheticals:
+        fixtures = {
+            match_id: (home_id, away_id)
+            for match_id, home_id, away_id in Match.objects.filter(
+                pk__in=hypotheticals
+            ).exclude(result__validated=True).values_list('pk', 'home_team_id', 'away_team_id')
+        }
+        unknown = sorted(set(hypotheticals) - set(fixtures))
+        if unknown:
+            return JsonResponse(
+                {'error': f"Matchs inconnus ou déjà joués : {unknown}"}, status=400
+            )
+
+    teams = Standing.objects.order_by(
+        '-points', '-goal_difference', '-goals_for'
+    ).values_list('team_id', 'team__name')
+    scores = list(Result.objects.filter(validated=True).values_list(
+        'match__home_team_id', 'match__away_team_id', 'home_score', 'away_score'
+    ))
+    scores += [
+        (*fixtures[match_id], home_score, away_score)
+        for match_id, (home_score, away_score) in hypotheticals.items()
+    ]
+
+    table = build_table(teams, scores)
+    return JsonResponse({
+        'standings': [row.as_dict() for row in table],
+        'hypotheticals': len(hypotheticals),
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 2),
+    })
+
+
+def api_standings_history(request):
+    """
+    Retourne le classement reconstruit depuis le journal des résultats en JSON :
+    ?at=<date ISO> (état à cette date) ou ?event=<id> (état après cet événement).
+    """
+    started = time.perf_counter()
+    at = None
+    event_id = None
+    if request.GET.get('at'):
+        at = parse_datetime(request.GET['at'])
+        if at is None:
+            return JsonResponse({'error': "Le paramètre 'at' doit être une date ISO 8601."}, status=400)
+        if timezone.is_naive(at):
+            at = timezone.make_aware(at)
+    if request.GET.get('event'):
+        try:
+            event_id = int(request.GET['event'])
+        except ValueError:
+            return JsonResponse({'error': "Le paramètre 'event' doit être un entier."}, status=400)
+
+    table, last_event_id, replayed = standings_as_of(at=at, event_id=event_id)
+    return JsonResponse({
+        'standings': [row.as_dict() for row in table],
+        'event_id': last_event_id,
+        'events_replayed': replayed,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 2),
+    })
+
+
+def api_team_search(request):
+    """
+    Recherche d'équipes par préfixe (nom, joueur, pseudo) en JSON.
+    Paramètres : ?q=<texte>&limit=<nombre>&all=1 (inclure les équipes inactives).
+    """
+    started = time.perf_counter()
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        return JsonResponse({'error': "Le paramètre 'limit' doit être un entier."}, status=400)
+    limit = max(1, min(limit, MAX_LIMIT))
+
+    teams = search_teams(
+        request.GET.get('q', ''),
+        limit=limit,
+        active_only=request.GET.get('all') != '1',
+    )
+    return JsonResponse({
+        'results': [
+            {
+                'id': team['id'],
+                'name': team['name'],
+                'player_name': team['player_name'],
+                'gamer_pseudo': team['gamer_pseudo'],
+            }
+            for team in teams
+        ],
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 2),
+    })